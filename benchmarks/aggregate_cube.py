@@ -0,0 +1,56 @@
+# aggregate_cube.py
+"""
+Benchmark the category averages and summary means answered by the
+AggregateCube against the pandas groupbys over the filtered rows.
+
+Run from the project directory:
+
+    python -m benchmarks.aggregate_cube --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.filter_engine import SCENARIOS
+from benchmarks.ranking_index import best_of
+from benchmarks.synthetic import make_synthetic_apps
+from src.data.aggregate_cube import AggregateCube
+from src.data.filter_engine import FilterEngine
+
+
+def pandas_aggregates(filtered_df):
+    """
+    The aggregates of `make_popularity_score` and `get_summary_stats`.
+    """
+    return (filtered_df.groupby("Category", observed=True)["popularity_score"].mean(),
+            [filtered_df[column].mean() for column in ("Rating", "Installs", "Reviews")])
+
+
+def cube_aggregates(cube, state):
+    cells = cube.select(*state)
+    return (cube.category_means(cells, "popularity_score"),
+            [cube.mean(cells, column) for column in ("Rating", "Installs", "Reviews")])
+
+
+def run(sizes):
+    print(f"{'rows':>10} {'cells':>6} {'scenario':<13} {'pandas ms':>10} {'cube ms':>8} {'max rel. diff':>14}")
+    for n_rows in sizes:
+        df = make_synthetic_apps(n_rows)
+        engine, cube = FilterEngine(df), AggregateCube(df)
+        for name, state in SCENARIOS.items():
+            filtered_df = df.take(engine.query(*state))
+            (expected_means, expected_stats), pandas_time = best_of(lambda: pandas_aggregates(filtered_df))
+            (means, stats), cube_time = best_of(lambda: cube_aggregates(cube, state))
+            expected = np.concatenate([expected_means.to_numpy(), expected_stats])
+            actual = np.concatenate([means.to_numpy(), stats])
+            difference = np.max(np.abs(actual - expected) / np.abs(expected))
+            print(f"{n_rows:>10,} {cube.n_cells:>6,} {name:<13} {pandas_time * 1000:>10.2f} "
+                  f"{cube_time * 1000:>8.2f} {difference:>14.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    args = parser.parse_args()
+    run(args.sizes)
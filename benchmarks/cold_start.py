@@ -0,0 +1,159 @@
+# cold_start.py
+"""
+Measure how long a fresh process takes to serve the dashboard, with and
+without the fast-start mode (config.FAST_START) and the layout snapshot
+(config.USE_SNAPSHOT).
+
+Each run starts a new Python process, which times:
+
+- import: `import src.app`, i.e. the imports, the data load (normal mode)
+  and building the layout
+- layout: the first GET of /_dash-layout
+- charts: filling the empty charts of a fast-start layout without a
+  snapshot (the Apply callback as the page load triggers it, and the pie
+  chart); 0 in the other modes, whose layout already holds the charts
+- first apply: the first click on Apply with another filter state, after
+  --delay seconds; the chart libraries a snapshot did not need are loaded
+  in the background meanwhile
+
+"ready" is import + layout + charts: the time until a first visitor sees
+the charts. The fast modes need the metadata sidecar of the dataset, written
+with `python -m src.data.metadata <data>`, and the snapshot modes its layout
+snapshot, written with `python -m src.components.snapshot <data>`.
+
+Run from the project directory:
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --delay 3
+    python -m benchmarks.cold_start --importtime 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = {
+    "normal": {"ADS_FAST_START": "0", "ADS_USE_SNAPSHOT": "0"},
+    "snapshot": {"ADS_FAST_START": "0", "ADS_USE_SNAPSHOT": "1"},
+    "fast": {"ADS_FAST_START": "1", "ADS_USE_SNAPSHOT": "0"},
+    "fast+snapshot": {"ADS_FAST_START": "1", "ADS_USE_SNAPSHOT": "1"},
+}
+
+FILTERS = ("app-type-filter", "rating-slider", "content-rating-filter", "category-filter")
+
+
+def post_apply(client, app, n_clicks, values):
+    """
+    Post the Apply callback as the Dash renderer does, on page load (n_clicks None) or on a click.
+    """
+    output = next(key for key in app.callback_map if "filters-store" in key)
+    payload = {"output": output,
+               "outputs": [dict(zip(("id", "property"), part.rsplit(".", 1)))
+                           for part in output.strip(".").split("...")],
+               "inputs": [{"id": "apply-filters", "property": "n_clicks", "value": n_clicks}],
+               "state": [{"id": id_, "property": "value", "value": value} for id_, value in zip(FILTERS, values)],
+               "changedPropIds": [] if n_clicks is None else ["apply-filters.n_clicks"]}
+    return check(client.post("/_dash-update-component", json=payload))
+
+
+def check(response):
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def run_worker(delay):
+    """
+    Time the startup of this process and print the timings as JSON.
+    """
+    timings = {}
+    start = time.perf_counter()
+    from src import app as app_module
+    timings["import"] = time.perf_counter() - start
+
+    app = app_module.app
+    client = app.server.test_client()
+    start = time.perf_counter()
+    check(client.get("/_dash-layout"))
+    timings["layout"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if app_module.metadata is not None and app_module.snapshot is None:
+        post_apply(client, app, None, (["All"], [1, 5], ["All"], ["All"]))
+        check(client.post("/_dash-update-component", json={
+            "output": "pie-chart.spec", "outputs": {"id": "pie-chart", "property": "spec"},
+            "inputs": [{"id": "pie-chart", "property": "id", "value": "pie-chart"}], "changedPropIds": []}))
+    timings["charts"] = time.perf_counter() - start
+    timings["ready"] = timings["import"] + timings["layout"] + timings["charts"]
+
+    time.sleep(delay)
+    start = time.perf_counter()
+    post_apply(client, app, 1, (["Free"], [3, 5], ["Everyone"], ["GAME", "SOCIAL"]))
+    timings["first apply"] = time.perf_counter() - start
+
+    print(json.dumps({"mode": {"ADS_FAST_START": str(int(app_module.metadata is not None)),
+                               "ADS_USE_SNAPSHOT": str(int(app_module.snapshot is not None))},
+                      **timings}), flush=True)
+
+
+def run_once(mode, delay):
+    """
+    Run a worker process in a mode and return its timings.
+    """
+    result = subprocess.run([sys.executable, "-m", "benchmarks.cold_start", "--worker", "--delay", str(delay)],
+                            env={**os.environ, **MODES[mode]}, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{mode} worker failed:\n{result.stderr[-2000:]}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    if timings.pop("mode") != MODES[mode]:
+        raise RuntimeError(f"{mode} worker did not start in {mode} mode: are the sidecars current?")
+    return timings
+
+
+def import_profile(mode, top):
+    """
+    The `top` direct imports of src.app with the largest cumulative time under `python -X importtime`.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import src.app"],
+                            env={**os.environ, **MODES[mode]}, capture_output=True, text=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        # Names are indented by two spaces per level of nesting; src.app is at level 0
+        name = fields[2]
+        if len(name) - len(name.lstrip()) == 3:
+            entries.append((int(fields[1]), name.strip()))
+    return sorted(entries, reverse=True)[:top]
+
+
+def run(runs, delay, top):
+    print(f"{'mode':<14} " + " ".join(f"{name:>12}" for name in ("import", "layout", "charts", "ready", "first apply"))
+          + "   (median of %d runs, ms)" % runs)
+    for mode in MODES:
+        results = [run_once(mode, delay) for _ in range(runs)]
+        print(f"{mode:<14} " + " ".join(f"{statistics.median(result[name] for result in results) * 1000:>12.0f}"
+                                       for name in ("import", "layout", "charts", "ready", "first apply")), flush=True)
+
+    for mode in MODES if top else ():
+        print(f"\nSlowest imports of src.app, {mode} mode (cumulative ms):")
+        for microseconds, name in import_profile(mode, top):
+            print(f"  {microseconds / 1000:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Processes started per mode")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between ready and the first apply")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also list the N slowest top-level imports of each mode")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args.delay)
+    else:
+        run(args.runs, args.delay, args.importtime)
@@ -0,0 +1,87 @@
+# compare.py
+"""
+Compare two result files of `python -m benchmarks.suite` and flag regressions.
+
+A case regresses when its best time or its peak memory grows by more than
+the threshold. The exit status is 1 when a case regressed, so the comparison
+can gate a CI job. Files are given by path or by commit hash (prefix), looked
+up in benchmarks/results/. Run from the project directory:
+
+    python -m benchmarks.compare 3fc0601 HEAD --threshold 1.2
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.suite import RESULTS_DIR
+
+
+def find_results(name):
+    """
+    Return the path of a results file given by path, commit hash or git revision.
+    """
+    if os.path.exists(name):
+        return name
+    try:
+        name = subprocess.run(["git", "rev-parse", name], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    matches = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{name[:12]}*.json")))
+    if not matches:
+        raise SystemExit(f"No results for {name} in {RESULTS_DIR}")
+    # Prefer the results of the clean tree over those of a dirty one
+    return matches[0]
+
+
+def load_results(path):
+    with open(path) as file:
+        report = json.load(file)
+    return report, {(result["rows"], result["case"]): result for result in report["results"]}
+
+
+def compare(base_path, new_path, threshold):
+    """
+    Print the cases of both files side by side and return the number of regressions.
+    """
+    base_report, base = load_results(base_path)
+    new_report, new = load_results(new_path)
+    print(f"base {base_report['commit'][:12]}{' (dirty)' if base_report['dirty'] else ''}, "
+          f"new {new_report['commit'][:12]}{' (dirty)' if new_report['dirty'] else ''}\n")
+    print(f"{'rows':>10} {'case':<30} {'base ms':>10} {'new ms':>10} {'time':>7} {'memory':>7}")
+
+    regressions = 0
+    for key in sorted(base.keys() & new.keys()):
+        before, after = base[key], new[key]
+        rows, case = key
+        if "error" in before or "error" in after:
+            status = "fixed" if "error" not in after else "error" if "error" not in before else "both fail"
+            regressions += status == "error"
+            print(f"{rows:>10,} {case:<30} {status:>10}")
+            continue
+        time_ratio = after["best_s"] / before["best_s"]
+        memory_ratio = after["peak_bytes"] / max(before["peak_bytes"], 1)
+        flags = [label for label, ratio in (("slower", time_ratio), ("more memory", memory_ratio))
+                 if ratio > threshold]
+        regressions += bool(flags)
+        print(f"{rows:>10,} {case:<30} {before['best_s'] * 1000:>10.1f} {after['best_s'] * 1000:>10.1f} "
+              f"{time_ratio:>6.2f}x {memory_ratio:>6.2f}x  {', '.join(flags)}")
+
+    for rows, case in sorted(base.keys() ^ new.keys()):
+        print(f"{rows:>10,} {case:<30} only in {'base' if (rows, case) in base else 'new'}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="Results file or commit of the baseline")
+    parser.add_argument("new", help="Results file or commit to check")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Ratio of new to base time or memory above which a case regressed")
+    args = parser.parse_args()
+    regressions = compare(find_results(args.base), find_results(args.new), args.threshold)
+    print(f"\n{regressions} regression(s)")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,118 @@
+# export.py
+"""
+Benchmark the streamed app export (GET /export/apps.<format>) against
+writing the whole ranked selection at once, and check that both produce
+the same file.
+
+For each size and format, the table reports the time to the first chunk,
+the total time and the peak memory allocated during the export
+(tracemalloc, in a separate run), for the default state (every app). The
+streamed chunks are written to a temporary file as a client would, so
+they do not count towards the peak.
+
+Run from the project directory:
+
+    python -m benchmarks.export --sizes 100000 1000000
+"""
+import argparse
+import io
+import tempfile
+import time
+import tracemalloc
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from dash import Dash, html
+
+from benchmarks.synthetic import make_synthetic_apps
+from src.callbacks.callbacks import register_callbacks
+from src.data.data_import import DASHBOARD_COLUMNS
+from src.data.export import EXPORT_FORMATS
+
+
+def materialized_export(df, file_format):
+    """
+    The whole export written at once, from a ranked copy of the table.
+    """
+    ranked = df[DASHBOARD_COLUMNS].sort_values("popularity_score", ascending=False, kind="stable")
+    if file_format == "csv":
+        return ranked.to_csv(index=False).encode("utf-8")
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(ranked, preserve_index=False)
+    if file_format == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def streamed_export(client, file_format, file):
+    """
+    The export of the endpoint, written to `file` chunk by chunk; returns the time to the first chunk.
+    """
+    start = time.perf_counter()
+    response = client.get(f"/export/apps.{file_format}", buffered=False)
+    chunks = iter(response.response)
+    file.write(next(chunks))
+    first_chunk = time.perf_counter() - start
+    for chunk in chunks:
+        file.write(chunk)
+    return first_chunk
+
+
+def as_table(content, file_format):
+    if file_format == "csv":
+        return pa_csv.read_csv(io.BytesIO(content))
+    if file_format == "parquet":
+        return pq.read_table(io.BytesIO(content))
+    return pa.ipc.open_stream(content).read_all()
+
+
+def measure(function):
+    """
+    Return the result and wall time in seconds of `function()`, and the peak
+    bytes it allocates in a second, traced run (tracing slows it down).
+    """
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(sizes):
+    print(f"{'rows':>10} {'format':<8} {'first chunk ms':>15} {'streamed ms':>12} {'peak MB':>8} "
+          f"{'materialized ms':>16} {'peak MB':>8} {'same':>5}")
+    for n_rows in sizes:
+        df = make_synthetic_apps(n_rows)
+        app = Dash(__name__)
+        app.layout = html.Div()
+        register_callbacks(app, df)
+        client = app.server.test_client()
+        for file_format in EXPORT_FORMATS:
+            with tempfile.TemporaryFile() as file:
+                def export():
+                    file.seek(0)
+                    file.truncate()
+                    return streamed_export(client, file_format, file)
+
+                first_chunk, streamed_time, streamed_peak = measure(export)
+                file.seek(0)
+                streamed = file.read()
+            materialized, materialized_time, materialized_peak = measure(lambda: materialized_export(df, file_format))
+            same = as_table(streamed, file_format).to_pandas().equals(as_table(materialized, file_format).to_pandas())
+            print(f"{n_rows:>10,} {file_format:<8} {first_chunk * 1000:>15.1f} {streamed_time * 1000:>12.0f} "
+                  f"{streamed_peak / 2**20:>8.1f} {materialized_time * 1000:>16.0f} "
+                  f"{materialized_peak / 2**20:>8.1f} {str(same):>5}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    run(args.sizes)
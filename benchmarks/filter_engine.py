@@ -0,0 +1,82 @@
+# filter_engine.py
+"""
+Benchmark the bitmap FilterEngine against the boolean-mask filter path.
+
+Run from the project directory:
+
+    python -m benchmarks.filter_engine --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_synthetic_apps
+from src.data.filter_engine import FilterEngine
+
+SCENARIOS = {
+    "all": (["All"], [1, 5], ["All"], ["All"]),
+    "one category": (["All"], [1, 5], ["All"], ["GAME"]),
+    "narrow": (["Paid"], [4.5, 5], ["Teen"], ["GAME", "SOCIAL"]),
+    "typical": (["Free"], [3.5, 5], ["Everyone", "Teen"], ["GAME", "SOCIAL", "EDUCATION", "SHOPPING"]),
+    "wide rating": (["All"], [2, 4.5], ["Everyone"], ["All"]),
+}
+
+
+def mask_filter(df, selected_types, rating_range, selected_ratings, selected_categories):
+    """
+    The boolean-mask filter used by `filter_dataframe` before the FilterEngine.
+    """
+    if "All" in selected_types:
+        selected_types = df["Type"].unique()
+    if "All" in selected_ratings:
+        selected_ratings = df["Content Rating"].unique()
+    if "All" in selected_categories:
+        selected_categories = df["Category"].unique()
+
+    min_rating, max_rating = rating_range
+    return df[
+        (df["Type"].isin(selected_types)) &
+        (df["Rating"] >= min_rating) & (df["Rating"] <= max_rating) &
+        (df["Content Rating"].isin(selected_ratings)) &
+        (df["Category"].isin(selected_categories))
+    ]
+
+
+def best_of(func, repeat):
+    """
+    Return the result of `func()` and its best wall-clock time over `repeat` runs, in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(sizes, repeat):
+    print(f"{'rows':>10} {'scenario':<14} {'mask (ms)':>10} {'engine (ms)':>12} "
+          f"{'engine+take (ms)':>17} {'speedup':>8} {'matches':>9}")
+    for n_rows in sizes:
+        df = make_synthetic_apps(n_rows)
+        engine, build_time = best_of(lambda: FilterEngine(df), 1)
+        print(f"{n_rows:>10} {'(build)':<14} {'':>10} {build_time * 1000:>12.1f}")
+
+        for name, filters in SCENARIOS.items():
+            expected, mask_time = best_of(lambda: mask_filter(df, *filters), repeat)
+            positions, engine_time = best_of(lambda: engine.query(*filters), repeat)
+            _, take_time = best_of(lambda: df.take(engine.query(*filters)), repeat)
+
+            matches = np.array_equal(positions, df.index.get_indexer(expected.index))
+            print(f"{n_rows:>10} {name:<14} {mask_time * 1000:>10.2f} {engine_time * 1000:>12.2f} "
+                  f"{take_time * 1000:>17.2f} {mask_time / engine_time:>7.1f}x {str(matches):>9}")
+        del df, engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
@@ -0,0 +1,353 @@
+# load_test.py
+"""
+Load-test the dashboard callbacks through /_dash-update-component.
+
+Virtual users replay filter-change sequences like a person using the
+dashboard: change the app types, change the content ratings (each change
+posts the selection normalizer callback of its dropdown), pick a rating range
+and categories, and click Apply. Filter states are drawn from a pool with
+Zipf-distributed popularity, so popular states repeat as they do in real
+traffic and caches see a realistic hit rate.
+
+A gunicorn server is started locally for each cache profile:
+
+- none:       every cache disabled
+- memory:     in-process result caches only
+- filesystem: in-process caches with the FileSystemCache backend shared by workers
+- warmed:     in-process caches, plus the cache warmer precomputing the most
+              applied filter states every 5 s (the default configuration
+              warms them every 5 minutes)
+
+Cache warming is disabled in the other profiles, so they measure the caches
+alone.
+
+For every profile and concurrency level the test reports, per callback, the
+throughput, p50/p95/p99 latency and error rate. Run from the project directory:
+
+    python -m benchmarks.load_test --profiles none filesystem --concurrency 1 4 16 --workers 4
+    python -m benchmarks.load_test --url http://127.0.0.1:8050 --concurrency 8
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Environment of the server for each cache profile
+PROFILES = {
+    "none": {"ADS_RESULT_CACHE_BYTES": "0", "ADS_SPEC_CACHE_BYTES": "0", "ADS_SHARED_CACHE_TYPE": "NullCache",
+             "ADS_CACHE_WARMING": "0"},
+    "memory": {"ADS_SHARED_CACHE_TYPE": "NullCache", "ADS_CACHE_WARMING": "0"},
+    "filesystem": {"ADS_SHARED_CACHE_TYPE": "FileSystemCache", "ADS_CACHE_WARMING": "0"},
+    "warmed": {"ADS_SHARED_CACHE_TYPE": "NullCache", "ADS_CACHE_WARMING": "1", "ADS_WARM_INTERVAL": "5"},
+}
+
+# Input component of each load-tested callback
+CALLBACKS = {
+    "apply": "apply-filters",
+    "app-type-filter": "app-type-filter",
+    "content-rating-filter": "content-rating-filter",
+}
+
+
+class Client:
+    """
+    Keep-alive HTTP connection to the dashboard, one per virtual user.
+    """
+
+    def __init__(self, url, timeout=60):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        """
+        Send a request and return (status, body), reconnecting after a broken connection.
+        """
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def get_json(self, path):
+        status, body = self.request("GET", path)
+        if status != 200:
+            raise RuntimeError(f"GET {path} returned HTTP {status}")
+        return json.loads(body)
+
+
+def find_props(node, component_id):
+    """
+    Return the props of the component with `component_id` in a serialized Dash layout.
+    """
+    if isinstance(node, dict):
+        props = node.get("props", {})
+        if props.get("id") == component_id:
+            return props
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return None
+    for child in children:
+        found = find_props(child, component_id)
+        if found is not None:
+            return found
+    return None
+
+
+def option_values(props):
+    return [option["value"] if isinstance(option, dict) else option for option in props["options"]]
+
+
+class Session:
+    """
+    What the load generator knows about the app: its callbacks and filter options.
+
+    Parameters:
+    client (Client): Connection used to read /_dash-dependencies and /_dash-layout.
+    """
+
+    def __init__(self, client):
+        self.callbacks = {}
+        for dependency in client.get_json("/_dash-dependencies"):
+            input_ids = {item["id"] for item in dependency["inputs"]}
+            for name, component_id in CALLBACKS.items():
+                # Clientside callbacks never reach the server, so there is nothing to load-test
+                if component_id in input_ids and not dependency.get("clientside_function"):
+                    self.callbacks[name] = dependency
+
+        layout = client.get_json("/_dash-layout")
+        self.types = [value for value in option_values(find_props(layout, "app-type-filter")) if value != "All"]
+        self.content_ratings = [value for value in option_values(find_props(layout, "content-rating-filter"))
+                                if value != "All"]
+        self.categories = [value for value in option_values(find_props(layout, "category-filter")) if value != "All"]
+        slider = find_props(layout, "rating-slider")
+        self.rating_bounds = (slider.get("min", 1), slider.get("max", 5))
+
+    def payload(self, name, values):
+        """
+        Request body of a callback, with `values` mapping component ids to their value.
+        """
+        dependency = self.callbacks[name]
+        output = dependency["output"]
+        if output.startswith(".."):
+            outputs = [dict(zip(("id", "property"), part.rsplit(".", 1)))
+                       for part in output.strip(".").split("...")]
+        else:
+            outputs = dict(zip(("id", "property"), output.rsplit(".", 1)))
+        fill = lambda items: [{**item, "value": values.get(item["id"])} for item in items]
+        return json.dumps({"output": output, "outputs": outputs,
+                           "inputs": fill(dependency["inputs"]), "state": fill(dependency.get("state", [])),
+                           "changedPropIds": [f"{item['id']}.{item['property']}" for item in dependency["inputs"]]})
+
+    def random_state(self, rng):
+        """
+        A filter state a user could build with the dropdowns and the slider.
+        """
+        def pick(values, all_probability):
+            if rng.random() < all_probability:
+                return ["All"]
+            return sorted(rng.choice(values, size=rng.integers(1, min(len(values), 4) + 1), replace=False).tolist())
+
+        low, high = self.rating_bounds
+        min_rating = float(rng.choice(np.arange(low, high, 0.5)))
+        return {"app-type-filter": pick(self.types, 0.6),
+                "rating-slider": [min_rating, float(high)],
+                "content-rating-filter": pick(self.content_ratings, 0.6),
+                "category-filter": pick(self.categories, 0.3)}
+
+
+def virtual_user(session, client, states, weights, seed, think_time, stop, record):
+    """
+    Replay filter-change sequences until `stop` is set, calling `record(callback, seconds, ok)`.
+    """
+    rng = np.random.default_rng(seed)
+    clicks = 0
+    while not stop.is_set():
+        state = states[rng.choice(len(states), p=weights)]
+        clicks += 1
+        steps = []
+        # Adding a selection to the dropdown posts its normalizer with "All" still in the value
+        for name in ("app-type-filter", "content-rating-filter"):
+            if name in session.callbacks:
+                value = state[name] if state[name] == ["All"] else ["All", *state[name]]
+                steps.append((name, {name: value}))
+        if "apply" in session.callbacks:
+            steps.append(("apply", {**state, "apply-filters": clicks}))
+
+        for name, values in steps:
+            if stop.is_set():
+                return
+            body = session.payload(name, values)
+            start = time.perf_counter()
+            try:
+                status, _ = client.request("POST", "/_dash-update-component", body)
+                ok = status == 200
+            except (http.client.HTTPException, OSError):
+                ok = False
+            record(name, time.perf_counter() - start, ok)
+            if think_time:
+                time.sleep(rng.exponential(think_time))
+
+
+def run_load(url, concurrency, duration, warmup, n_states, zipf, think_time, seed=0):
+    """
+    Drive the server at `url` with `concurrency` virtual users for `warmup + duration` seconds.
+
+    Returns:
+    dict: Per callback, the request count, throughput (req/s), error rate and
+          p50/p95/p99 latencies (ms) measured after the warm-up.
+    """
+    session = Session(Client(url))
+    rng = np.random.default_rng(seed)
+    states = [session.random_state(rng) for _ in range(n_states)]
+    weights = 1 / np.arange(1, n_states + 1) ** zipf
+    weights /= weights.sum()
+
+    samples = {name: [] for name in session.callbacks}
+    errors = {name: 0 for name in session.callbacks}
+    measuring = threading.Event()
+    lock = threading.Lock()
+
+    def record(name, seconds, ok):
+        if measuring.is_set():
+            with lock:
+                samples[name].append(seconds)
+                errors[name] += not ok
+
+    stop = threading.Event()
+    users = [threading.Thread(target=virtual_user, daemon=True,
+                              args=(session, Client(url), states, weights, seed + 1 + i, think_time, stop, record))
+             for i in range(concurrency)]
+    for user in users:
+        user.start()
+    time.sleep(warmup)
+    measuring.set()
+    start = time.perf_counter()
+    time.sleep(duration)
+    measuring.clear()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for user in users:
+        user.join()
+
+    report = {}
+    for name, latencies in samples.items():
+        count = len(latencies)
+        p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) * 1000 if count else [float("nan")] * 3)
+        report[name] = {"requests": count, "throughput": count / elapsed,
+                        "error_rate": errors[name] / count if count else 0.0,
+                        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+    return report
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(profile, workers, threads, cache_dir, history_path, log_file, timeout=300):
+    """
+    Start gunicorn serving `src.app:server` with the environment of a cache profile.
+
+    Returns:
+    tuple: The gunicorn process and the URL of the server, once it answers.
+    """
+    port = free_port()
+    env = {**os.environ, **PROFILES[profile], "ADS_SHARED_CACHE_DIR": cache_dir, "ADS_WARM_HISTORY": history_path}
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "--workers", str(workers),
+                               "--threads", str(threads), "--bind", f"127.0.0.1:{port}",
+                               "--timeout", "300", "src.app:server"],
+                              env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {server.returncode}, see {log_file.name}")
+        try:
+            if Client(url, timeout=5).request("GET", "/_dash-layout")[0] == 200:
+                return server, url
+        except OSError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"gunicorn did not answer within {timeout} s, see {log_file.name}")
+
+
+def print_report(profile, concurrency, report):
+    for name, values in report.items():
+        print(f"{profile:<11} {concurrency:>5} {name:<22} {values['requests']:>8} {values['throughput']:>8.1f} "
+              f"{values['p50_ms']:>8.1f} {values['p95_ms']:>8.1f} {values['p99_ms']:>8.1f} "
+              f"{values['error_rate']:>7.1%}", flush=True)
+
+
+def run(args):
+    print(f"{'profile':<11} {'users':>5} {'callback':<22} {'requests':>8} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    load = lambda url, concurrency: run_load(url, concurrency, args.duration, args.warmup,
+                                             args.states, args.zipf, args.think_time)
+    results = []
+    if args.url:
+        for concurrency in args.concurrency:
+            report = load(args.url, concurrency)
+            print_report("external", concurrency, report)
+            results.append({"profile": "external", "concurrency": concurrency, "callbacks": report})
+    else:
+        for profile in args.profiles:
+            with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as state_dir, \
+                    tempfile.NamedTemporaryFile("w", prefix=f"gunicorn-{profile}-", suffix=".log",
+                                                delete=False) as log_file:
+                server, url = start_server(profile, args.workers, args.threads, cache_dir,
+                                           os.path.join(state_dir, "filter_states.json"), log_file)
+                try:
+                    for concurrency in args.concurrency:
+                        report = load(url, concurrency)
+                        print_report(profile, concurrency, report)
+                        results.append({"profile": profile, "concurrency": concurrency, "callbacks": report})
+                finally:
+                    server.terminate()
+                    server.wait()
+            os.remove(log_file.name)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"workers": args.workers, "threads": args.threads, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Load-test a running server instead of starting one per profile")
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=["none", "filesystem"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Numbers of virtual users")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=1, help="Threads per gunicorn worker")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds per concurrency level")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before each measurement")
+    parser.add_argument("--states", type=int, default=200, help="Number of distinct filter states replayed")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Skew of the popularity of filter states")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause of a user between actions, in seconds (0: closed loop at full speed)")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,79 @@
+# ranking_index.py
+"""
+Benchmark the RankingIndex top-N queries against the pandas implementations
+of the bubble chart (top 50 rows by popularity_score) and of the word cloud
+(top 10 apps by total installs), and check that they return the same rows.
+
+Run from the project directory:
+
+    python -m benchmarks.ranking_index --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+
+from benchmarks.filter_engine import SCENARIOS
+from benchmarks.synthetic import make_synthetic_apps
+from src.data.filter_engine import FilterEngine
+from src.data.ranking_index import RankingIndex
+
+
+def pandas_top_rows(filtered_df, k=50):
+    """
+    The top rows of `engagement_chart`, with a stable sort so ties are deterministic.
+    """
+    return filtered_df.sort_values(by="popularity_score", ascending=False, kind="stable").head(k)
+
+
+def pandas_top_apps(filtered_df, k=10):
+    """
+    The top apps of `create_wordcloud`, with a stable sort so ties are deterministic.
+    """
+    totals = filtered_df.groupby("App", observed=True)["Installs"].sum()
+    top = totals.sort_values(ascending=False, kind="stable").head(k)
+    return [(app, int(total)) for app, total in top.items()]
+
+
+def best_of(function, repeat=5):
+    """
+    Return the result and the fastest wall time in seconds of `function()`.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(sizes, unique_apps):
+    print(f"{'rows':>10} {'scenario':<13} {'matched':>9} {'top rows: pandas ms':>20} {'index ms':>9} "
+          f"{'top apps: pandas ms':>20} {'index ms':>9} {'same':>5}")
+    for n_rows in sizes:
+        df = make_synthetic_apps(n_rows, unique_apps=unique_apps)
+        start = time.perf_counter()
+        engine, index = FilterEngine(df), RankingIndex(df)
+        print(f"{n_rows:>10,} indexes built in {time.perf_counter() - start:.2f}s")
+
+        for name, state in SCENARIOS.items():
+            positions = engine.query(*state)
+            categories = engine.normalize(*state)[3]
+            filtered_df = df.take(positions)
+
+            expected_rows, pandas_rows_time = best_of(lambda: pandas_top_rows(filtered_df))
+            rows, index_rows_time = best_of(lambda: index.top_rows(positions, categories, "popularity_score", 50))
+            expected_apps, pandas_apps_time = best_of(lambda: pandas_top_apps(filtered_df))
+            apps, index_apps_time = best_of(lambda: index.top_apps(positions, categories, 10))
+
+            same = expected_rows.index.equals(df.index[rows]) and expected_apps == apps
+            print(f"{n_rows:>10,} {name:<13} {len(positions):>9,} {pandas_rows_time * 1000:>20.2f} "
+                  f"{index_rows_time * 1000:>9.2f} {pandas_apps_time * 1000:>20.2f} "
+                  f"{index_apps_time * 1000:>9.2f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--unique-apps", action="store_true",
+                        help="Give every row its own app name instead of repeating the source apps")
+    args = parser.parse_args()
+    run(args.sizes, args.unique_apps)
@@ -0,0 +1,90 @@
+# scoring.py
+"""
+Benchmark PopularityScorer against the popularity_score formula as it was
+inlined in `clean_and_save_data` (six float64 columns added to the frame),
+and check that both give the same scores.
+
+For each size, the table reports the best wall time and the peak memory
+allocated while scoring (tracemalloc), then the time to score a short list
+of apps against stored statistics.
+
+Run from the project directory:
+
+    python -m benchmarks.scoring --sizes 10000 1000000 10000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.synthetic import make_synthetic_apps
+from src.data.scoring import PopularityScorer
+
+
+def pandas_score(df):
+    """
+    popularity_score as computed by `clean_and_save_data` before PopularityScorer.
+    """
+    df = df[["Rating", "Reviews", "Installs"]].copy()
+    df['Reviews_log'] = np.log1p(df['Reviews'])
+    df['Installs_log'] = np.log1p(df['Installs'])
+    df['Rating_normalized'] = (df['Rating'] - df['Rating'].min()) / (df['Rating'].max() - df['Rating'].min())
+    df['Reviews_normalized'] = (df['Reviews_log'] - df['Reviews_log'].min()) / (df['Reviews_log'].max() - df['Reviews_log'].min())
+    df['Installs_normalized'] = (df['Installs_log'] - df['Installs_log'].min()) / (df['Installs_log'].max() - df['Installs_log'].min())
+    df['popularity_score'] = round((df['Rating_normalized'] + df['Reviews_normalized'] + df['Installs_normalized']) / 3, 5)
+    return df['popularity_score'].to_numpy()
+
+
+def scorer_score(df):
+    """
+    popularity_score from PopularityScorer, fitting the bounds on the same rows.
+    """
+    scorer = PopularityScorer.fit(df["Rating"].to_numpy(), df["Reviews"].to_numpy(), df["Installs"].to_numpy())
+    return scorer.score_frame(df)
+
+
+def measure(function, df, repeat):
+    """
+    Return the result, the fastest wall time in seconds and the peak bytes allocated by `function(df)`.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(df)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run(sizes, repeat, list_size):
+    print(f"{'rows':>10} {'pandas ms':>10} {'peak MB':>8} {'scorer ms':>10} {'peak MB':>8} {'speedup':>8} {'same':>5}")
+    for n_rows in sizes:
+        df = make_synthetic_apps(n_rows)
+        expected, pandas_time, pandas_peak = measure(pandas_score, df, repeat)
+        scores, scorer_time, scorer_peak = measure(scorer_score, df, repeat)
+        same = np.array_equal(expected, scores)
+        print(f"{n_rows:>10,} {pandas_time * 1000:>10.2f} {pandas_peak / 2**20:>8.1f} {scorer_time * 1000:>10.2f} "
+              f"{scorer_peak / 2**20:>8.1f} {pandas_time / scorer_time:>7.1f}x {str(same):>5}")
+
+    df = make_synthetic_apps(list_size, seed=1)
+    scorer = PopularityScorer.fit(df["Rating"].to_numpy(), df["Reviews"].to_numpy(), df["Installs"].to_numpy())
+    rating, reviews, installs = ([4.5] * list_size, df["Reviews"].tolist(), df["Installs"].tolist())
+    runs = 10_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        scorer.score(rating, reviews, installs)
+    print(f"\nScoring a list of {list_size} apps against stored statistics: "
+          f"{(time.perf_counter() - start) / runs * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, the fastest is reported")
+    parser.add_argument("--list-size", type=int, default=10, help="Number of apps of the ad-hoc list")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.list_size)
@@ -0,0 +1,57 @@
+# spec_size.py
+"""
+Measure the serialized Vega spec size of each chart with client-side and
+server-side aggregation.
+
+Run from the project directory:
+
+    python -m benchmarks.spec_size --data data/preprocessed/clean_data_score.parquet
+"""
+import argparse
+import json
+import time
+
+from src.charts.engagement_chart import engagement_chart
+from src.charts.make_density_plot import make_density_plot
+from src.data.data_import import load_data
+
+CHARTS = {
+    "density-plot": make_density_plot,
+    "engagement-chart": engagement_chart,
+}
+
+SELECTIONS = {
+    "All": ["All"],
+    "2 categories": ["GAME", "SOCIAL"],
+}
+
+
+def spec_bytes(chart):
+    """
+    Return the size in bytes of the compiled Vega spec and the time it took to compile.
+    """
+    start = time.perf_counter()
+    spec = chart.to_dict(format="vega")
+    elapsed = time.perf_counter() - start
+    return len(json.dumps(spec).encode("utf-8")), elapsed
+
+
+def run(data_path):
+    df = load_data(data_path)
+    print(f"{len(df)} rows from {data_path}\n")
+    print(f"{'chart':<18} {'categories':<14} {'client-side (B)':>16} {'server-side (B)':>16} "
+          f"{'ratio':>7} {'compile ms before':>18} {'after':>7}")
+    for chart_name, make_chart in CHARTS.items():
+        for selection_name, categories in SELECTIONS.items():
+            data = df if "All" in categories else df[df["Category"].isin(categories)]
+            before, before_time = spec_bytes(make_chart(data, categories, server_side=False))
+            after, after_time = spec_bytes(make_chart(data, categories, server_side=True))
+            print(f"{chart_name:<18} {selection_name:<14} {before:>16,} {after:>16,} "
+                  f"{before / after:>6.1f}x {before_time * 1000:>18.0f} {after_time * 1000:>7.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/preprocessed/clean_data_score.parquet")
+    args = parser.parse_args()
+    run(args.data)
@@ -0,0 +1,268 @@
+# suite.py
+"""
+Benchmark the hot paths of the dashboard on synthetic datasets and store the
+results, so that commits can be compared with `python -m benchmarks.compare`.
+
+For each dataset size the suite times, on Play-Store-shaped rows bootstrapped
+from data/preprocessed/clean_data_score.parquet:
+
+- loading the parquet file and compacting it, as src/app.py does
+- building the FilterEngine, RankingIndex and AggregateCube
+- filtering (FilterEngine query and take)
+- every chart builder of src/charts/, compiled to Vega like the callbacks do
+- get_summary_stats, from the rows and from the aggregate cube
+- create_layout
+- a full `update_charts_on_apply` round trip through the Dash test client
+
+Every case reports its best and median wall-clock time and the peak memory
+allocated while it runs (tracemalloc, in a separate untimed run). Each size
+runs in its own process, whose peak RSS is recorded too. A case that raises,
+or a worker killed when out of memory, is recorded with its error instead of
+stopping the suite.
+
+Results are written to benchmarks/results/<commit>.json (with a "-dirty"
+suffix when the tree has uncommitted changes). Run from the project directory:
+
+    python -m benchmarks.suite --sizes 1000 100000 1000000 10000000
+    python -m benchmarks.compare <base commit> <new commit>
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from dash import Dash
+
+from benchmarks.filter_engine import SCENARIOS
+from benchmarks.synthetic import make_synthetic_apps
+from src import config
+from src.callbacks.callbacks import register_callbacks
+from src.charts.engagement_chart import engagement_chart
+from src.charts.install_chart import installs_chart
+from src.charts.make_density_plot import make_density_plot
+from src.charts.make_popularity_score import make_popularity_score
+from src.charts.make_reviews_histogram import make_reviews_histogram
+from src.charts.pie_chart import create_pie
+from src.charts.ranking_chart import create_wordcloud, render_wordcloud
+from src.components.get_summary_stats import get_summary_stats
+from src.components.layout import create_layout
+from src.data.aggregate_cube import AggregateCube
+from src.data.data_import import DASHBOARD_COLUMNS, compact_dataframe, load_data
+from src.data.filter_engine import FilterEngine
+from src.data.ranking_index import RankingIndex
+
+RESULTS_DIR = "benchmarks/results"
+
+# Filter states of the round trips; the charts are built for the first one
+ROUND_TRIPS = ("all", "typical")
+
+
+def measure(func, repeat, budget):
+    """
+    Time `func()` up to `repeat` times, stopping early once `budget` seconds are spent.
+
+    Returns:
+    dict: The number of runs, best and median times in seconds, and the peak
+          memory allocated by one more run under tracemalloc, in bytes.
+    """
+    times = []
+    while len(times) < repeat and sum(times) < budget:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"runs": len(times), "best_s": min(times), "median_s": statistics.median(times), "peak_bytes": peak}
+
+
+def vega(make_chart):
+    """
+    Build a chart and compile it to a Vega spec, like the callbacks and the layout do.
+    """
+    return lambda: make_chart().to_dict(format="vega")
+
+
+def uncached_wordcloud(df, categories):
+    # Layouts are cached by their words, so clear the cache to time the layout itself
+    render_wordcloud.cache_clear()
+    return create_wordcloud(df, categories).to_json()
+
+
+def apply_payload(app, selected_types, rating_range, selected_ratings, selected_categories):
+    """
+    Request body of a click on Apply, as the Dash renderer posts it.
+    """
+    output = next(key for key in app.callback_map if "filters-store" in key)
+    outputs = [dict(zip(("id", "property"), part.rsplit(".", 1))) for part in output.strip(".").split("...")]
+    states = zip(("app-type-filter", "rating-slider", "content-rating-filter", "category-filter"),
+                 (selected_types, rating_range, selected_ratings, selected_categories))
+    return {"output": output, "outputs": outputs,
+            "inputs": [{"id": "apply-filters", "property": "n_clicks", "value": 1}],
+            "state": [{"id": id_, "property": "value", "value": value} for id_, value in states],
+            "changedPropIds": ["apply-filters.n_clicks"]}
+
+
+def round_trip(client, payload):
+    render_wordcloud.cache_clear()
+    response = client.post("/_dash-update-component", json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def make_cases(path):
+    """
+    Yield (name, function) pairs of the cases of one dataset.
+
+    The functions are created lazily, so that each case can use what the
+    previous ones built (the loaded table, the indexes) without timing it.
+    """
+    load = lambda: compact_dataframe(load_data(path, columns=DASHBOARD_COLUMNS))
+    yield "load_data", lambda: load_data(path)
+    yield "load_data+compact", load
+    df = load()
+
+    yield "index.FilterEngine", lambda: FilterEngine(df)
+    yield "index.RankingIndex", lambda: RankingIndex(df)
+    yield "index.AggregateCube", lambda: AggregateCube(df)
+    engine, cube = FilterEngine(df), AggregateCube(df)
+
+    state = SCENARIOS["typical"]
+    yield "filter", lambda: df.take(engine.query(*state))
+
+    categories = ["All"]
+    filtered_df = df.take(engine.query(*SCENARIOS["all"]))
+    server_side = config.SERVER_SIDE_AGGREGATION
+    yield "chart.engagement_chart", vega(lambda: engagement_chart(filtered_df, categories, server_side))
+    yield "chart.make_density_plot", vega(lambda: make_density_plot(filtered_df, categories, server_side))
+    yield "chart.make_popularity_score", vega(lambda: make_popularity_score(filtered_df, categories))
+    yield "chart.make_reviews_histogram", vega(lambda: make_reviews_histogram(filtered_df, categories))
+    yield "chart.installs_chart", vega(lambda: installs_chart(filtered_df))
+    yield "chart.create_pie", vega(lambda: create_pie(filtered_df, categories))
+    yield "chart.create_wordcloud", lambda: uncached_wordcloud(filtered_df, categories)
+
+    yield "get_summary_stats", lambda: get_summary_stats(filtered_df)
+    yield "get_summary_stats.cube", lambda: get_summary_stats(filtered_df, cube=cube, cells=cube.select(*state))
+    yield "create_layout", lambda: create_layout(df)
+
+    # Without init_app the result caches are disabled, so every round trip renders
+    app = Dash(__name__)
+    app.layout = create_layout(df)
+    register_callbacks(app, df)
+    client = app.server.test_client()
+    for scenario in ROUND_TRIPS:
+        payload = apply_payload(app, *SCENARIOS[scenario])
+        yield f"round_trip.{scenario}", lambda payload=payload: round_trip(client, payload)
+
+
+def git_commit():
+    """
+    Return the current commit hash and whether the tree has uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+def run_worker(n_rows, repeat, budget):
+    """
+    Run the cases of one dataset size, printing each result as a JSON line.
+
+    The last line holds the peak resident memory of the worker.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "apps.parquet")
+        make_synthetic_apps(n_rows).to_parquet(path, index=False)
+        for name, func in make_cases(path):
+            result = {"case": name, "rows": n_rows}
+            try:
+                result.update(measure(func, repeat, budget))
+            except Exception as error:
+                result["error"] = f"{type(error).__name__}: {error}"
+            print(json.dumps(result), flush=True)
+    print(json.dumps({"rows": n_rows, "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}),
+          flush=True)
+
+
+def run(sizes, repeat, budget, output=None):
+    """
+    Run every dataset size in its own worker process and write the results file.
+
+    Separate processes keep the memory of one size from inflating the next,
+    and a worker killed for lack of memory only loses the rest of its size.
+    """
+    commit, dirty = git_commit()
+    results, max_rss_mb = [], {}
+    print(f"{'rows':>10} {'case':<30} {'runs':>5} {'best ms':>10} {'median ms':>10} {'peak MB':>9}")
+    for n_rows in sizes:
+        worker = subprocess.Popen([sys.executable, "-m", "benchmarks.suite", "--worker", str(n_rows),
+                                   "--repeat", str(repeat), "--budget", str(budget)],
+                                  stdout=subprocess.PIPE, text=True)
+        for line in worker.stdout:
+            if not line.startswith("{"):
+                continue
+            result = json.loads(line)
+            if "case" not in result:
+                max_rss_mb[n_rows] = result["max_rss_mb"]
+                continue
+            results.append(result)
+            if "error" in result:
+                print(f"{n_rows:>10,} {result['case']:<30} {result['error'][:60]}", flush=True)
+            else:
+                print(f"{n_rows:>10,} {result['case']:<30} {result['runs']:>5} {result['best_s'] * 1000:>10.1f} "
+                      f"{result['median_s'] * 1000:>10.1f} {result['peak_bytes'] / 2**20:>9.1f}", flush=True)
+        status = worker.wait()
+        if status != 0:
+            error = f"worker exited with status {status} (a negative status is the signal, e.g. -9 when out of memory)"
+            results.append({"case": "worker", "rows": n_rows, "error": error})
+            print(f"{n_rows:>10,} {error}", flush=True)
+
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "max_rss_mb": max_rss_mb,
+        "results": results,
+    }
+    if output is None:
+        output = os.path.join(RESULTS_DIR, f"{commit[:12]}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Maximum number of timed runs per case")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="Stop repeating a case after this many seconds (it always runs once)")
+    parser.add_argument("--output", help=f"Results file (default: {RESULTS_DIR}/<commit>.json)")
+    parser.add_argument("--worker", type=int, metavar="ROWS", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker is not None:
+        run_worker(args.worker, args.repeat, args.budget)
+    else:
+        run(args.sizes, args.repeat, args.budget, args.output)
@@ -0,0 +1,35 @@
+# synthetic.py
+import numpy as np
+import pandas as pd
+
+SOURCE_PATH = "data/preprocessed/clean_data_score.parquet"
+
+
+def make_synthetic_apps(n_rows, seed=0, unique_apps=False, source=SOURCE_PATH):
+    """
+    Build a Play-Store-shaped DataFrame of arbitrary size.
+
+    Rows are bootstrapped from the preprocessed dataset, so the schema and the
+    joint distribution of Category, Type, Content Rating, Rating, Reviews and
+    Installs match what the dashboard sees in production.
+
+    Parameters:
+    n_rows (int): Number of rows to generate.
+    seed (int): Seed for the random generator, so runs are reproducible.
+    unique_apps (bool): If True, suffix every 'App' name with its row number so
+                        app names are unique, as in a multi-store feed.
+                        This costs one Python string per row.
+    source (str): Path of the parquet file to sample from.
+
+    Returns:
+    pd.DataFrame: The synthetic DataFrame with the same columns and dtypes as `source`.
+    """
+    base = pd.read_parquet(source)
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(base), size=n_rows)
+    df = base.take(rows).reset_index(drop=True)
+
+    if unique_apps:
+        df["App"] = df["App"] + " #" + pd.Series(np.arange(n_rows)).astype(str)
+
+    return df
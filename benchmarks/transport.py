@@ -0,0 +1,73 @@
+# transport.py
+"""
+Measure the size of the Apply callback response with and without compact
+spec data (config.COMPACT_SPECS), for client-side and server-side
+aggregation, raw and gzip-compressed.
+
+The response is produced by a full round trip through the Dash test client.
+The last column counts the bytes of inline datasets that appear in more than
+one output of the same response, i.e. what sharing named datasets between
+the charts could save on top.
+
+Run from the project directory:
+
+    python -m benchmarks.transport --data data/preprocessed/clean_data_score.parquet
+"""
+import argparse
+import gzip
+import json
+
+from dash import Dash
+
+from benchmarks.filter_engine import SCENARIOS
+from benchmarks.suite import apply_payload
+from src import config
+from src.callbacks.callbacks import register_callbacks
+from src.components.layout import create_layout
+from src.data.data_import import DASHBOARD_COLUMNS, compact_dataframe, load_data
+
+
+def shared_dataset_bytes(response):
+    """
+    Bytes of the inline datasets repeated across the outputs of a response.
+    """
+    seen, repeated = {}, 0
+    for output in response.values():
+        datasets = {json.dumps(dataset.get("values"), sort_keys=True)
+                    for value in output.values() if isinstance(value, dict)
+                    for dataset in value.get("data", []) if isinstance(dataset, dict) and dataset.get("values")}
+        for values in datasets:
+            repeated += len(values) if values in seen else 0
+            seen[values] = True
+    return repeated
+
+
+def run(data_path):
+    df = compact_dataframe(load_data(data_path, columns=DASHBOARD_COLUMNS))
+    app = Dash(__name__)
+    app.layout = create_layout(df)
+    register_callbacks(app, df)
+    client = app.server.test_client()
+    print(f"{len(df):,} rows from {data_path}\n")
+    print(f"{'scenario':<13} {'aggregation':<12} {'rows JSON (B)':>14} {'compact (B)':>12} {'ratio':>6} "
+          f"{'gzip before':>12} {'gzip after':>11} {'shared (B)':>11}")
+
+    for name, state in SCENARIOS.items():
+        payload = apply_payload(app, *state)
+        for server_side in (False, True):
+            config.SERVER_SIDE_AGGREGATION = server_side
+            sizes = {}
+            for compact in (False, True):
+                config.COMPACT_SPECS = compact
+                body = client.post("/_dash-update-component", json=payload).get_data()
+                sizes[compact] = (len(body), len(gzip.compress(body)), shared_dataset_bytes(json.loads(body)["response"]))
+            (before, gzip_before, _), (after, gzip_after, shared) = sizes[False], sizes[True]
+            print(f"{name:<13} {'server' if server_side else 'client':<12} {before:>14,} {after:>12,} "
+                  f"{before / after:>5.1f}x {gzip_before:>12,} {gzip_after:>11,} {shared:>11,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="data/preprocessed/clean_data_score.parquet")
+    args = parser.parse_args()
+    run(args.data)
@@ -0,0 +1,96 @@
+# worker_memory.py
+"""
+Measure the memory of N dashboard workers holding the dataset, loading it
+from parquet (one private copy per worker) or memory-mapping an Arrow file
+(one copy shared through the page cache).
+
+Each worker is a separate process that loads the table like src/app.py does
+and builds the FilterEngine, then idles while its memory is read from
+/proc/<pid>/smaps_rollup (Linux only). PSS splits shared pages between the
+processes mapping them, so the sum of PSS is the physical memory of the pool.
+
+Run from the project directory:
+
+    python -m benchmarks.worker_memory --rows 2000000 --workers 4
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_synthetic_apps
+from src.data.data_import import compact_dataframe
+from src.data.mapped import write_mapped_dataset
+
+WORKER = """
+import sys, time
+start = time.perf_counter()
+from src.data.data_import import DASHBOARD_COLUMNS, compact_dataframe, load_data
+from src.data.filter_engine import FilterEngine
+path = sys.argv[1]
+if path.endswith(".arrow"):
+    df = load_data(path)
+else:
+    df = compact_dataframe(load_data(path, columns=DASHBOARD_COLUMNS))
+FilterEngine(df)
+print(f"{time.perf_counter() - start:.3f}", flush=True)
+sys.stdin.read()
+"""
+
+
+def memory_kb(pid):
+    """
+    Return the (RSS, PSS) of a process in kB.
+    """
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as file:
+        for line in file:
+            name, _, rest = line.partition(":")
+            if name in ("Rss", "Pss"):
+                values[name] = int(rest.split()[0])
+    return values["Rss"], values["Pss"]
+
+
+def measure(path, n_workers):
+    """
+    Start `n_workers` workers loading `path` and return their load times and memory.
+    """
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, path], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, text=True) for _ in range(n_workers)]
+    try:
+        load_times = [float(worker.stdout.readline()) for worker in workers]
+        memory = [memory_kb(worker.pid) for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+    return load_times, memory
+
+
+def run(n_rows, n_workers):
+    df = compact_dataframe(make_synthetic_apps(n_rows, unique_apps=True))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        parquet_path = os.path.join(tmp_dir, "apps.parquet")
+        arrow_path = os.path.join(tmp_dir, "apps.arrow")
+        df.to_parquet(parquet_path, index=False)
+        write_mapped_dataset(df, arrow_path)
+        del df
+
+        print(f"{n_rows:,} rows, {n_workers} workers\n")
+        print(f"{'source':<10} {'file MB':>8} {'load s (mean)':>14} {'RSS MB (sum)':>13} {'PSS MB (sum)':>13}")
+        for name, path in (("parquet", parquet_path), ("arrow mmap", arrow_path)):
+            load_times, memory = measure(path, n_workers)
+            rss = sum(rss for rss, _ in memory) / 1024
+            pss = sum(pss for _, pss in memory) / 1024
+            print(f"{name:<10} {os.path.getsize(path) / 2**20:>8.1f} {sum(load_times) / n_workers:>14.2f} "
+                  f"{rss:>13.0f} {pss:>13.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    run(args.rows, args.workers)
@@ -2,9 +2,15 @@
 from dash import Dash
 import dash_bootstrap_components as dbc
 
-from src.utils.cache import cache
-from src.data.data_import import load_data
+from src import config
+from src.utils import metrics
+from src.utils.cache import cache, filter_cache, spec_cache
+from src.data.data_import import load_dashboard_data, memory_report
+from src.data.deferred import Deferred
+from src.data.metadata import read_metadata
+from src.data.registry import DatasetRegistry
 from src.components.layout import create_layout
+from src.components.snapshot import read_snapshot
 from src.callbacks.callbacks import register_callbacks
 
 # Initialize the app
@@ -12,24 +18,80 @@ app = Dash(__name__, external_stylesheets=[dbc.themes.UNITED])
 app.title = 'Ads Analytics'
 app._favicon = ("src/assets/favicon.ico")
 
-cache.init_app(
-    app.server,
-    config={
-        'CACHE_TYPE': 'filesystem',
-        'CACHE_DIR': 'tmp'
-    }
-)
+cache.init_app(app.server, config=config.SHARED_CACHE_CONFIG)
+shared_cache_enabled = config.SHARED_CACHE_CONFIG["CACHE_TYPE"] != "NullCache"
+filter_cache.init_app(config.RESULT_CACHE_BYTES, second_tier=cache if shared_cache_enabled else None)
+spec_cache.init_app(config.SPEC_CACHE_BYTES, second_tier=cache if shared_cache_enabled else None)
 
 server = app.server
 
-# Load the data
-df = load_data("data/preprocessed/clean_data_score_1000.parquet")
+# Callback timings, Server-Timing headers and the /metrics endpoint
+if config.METRICS_ENABLED:
+    profiler = (metrics.SlowRequestProfiler(config.PROFILE_DIR, config.PROFILE_SAMPLE_RATE, config.PROFILE_KEEP)
+                if config.PROFILE_SAMPLE_RATE > 0 else None)
+    metrics.init_app(app, caches=(filter_cache, spec_cache), profiler=profiler)
 
-# Create the layout
-app.layout = create_layout(df)
 
-# Register callbacks
-register_callbacks(app, df)
+def load_app_data(data_path=config.DATA_PATH):
+    """
+    Load the dataset at `data_path` as the dashboard uses it.
+    """
+    df = load_dashboard_data(data_path, config.COMPACT_DATA, config.ARROW_STRINGS)
+    print(f"Dataset loaded ({len(df):,} rows) - {memory_report(df)}", flush=True)
+    return df
+
+
+snapshot = read_snapshot(config.DATA_PATH) if config.USE_SNAPSHOT else None
+metadata = read_metadata(config.DATA_PATH) if config.FAST_START else None
+if metadata is not None:
+    # Serve the layout from the sidecars while the data loads in the background;
+    # without a snapshot, the charts are rendered when the page loads
+    app.layout = create_layout(metadata=metadata, snapshot=snapshot)
+    registry = DatasetRegistry(data_path=config.DATA_PATH, load=load_app_data, interval=config.RELOAD_INTERVAL)
+    register_callbacks(app, registry, render_on_load=snapshot is None)
+else:
+    if config.FAST_START:
+        print(f"No current metadata for {config.DATA_PATH}, starting normally "
+              f"(write it with: python -m src.data.metadata {config.DATA_PATH})", flush=True)
+    df = load_app_data()
+    app.layout = create_layout(df, snapshot=snapshot)
+    registry = DatasetRegistry(df, config.DATA_PATH, load=load_app_data, interval=config.RELOAD_INTERVAL)
+    register_callbacks(app, registry)
+
+
+def check_layout_version():
+    """
+    Rebuild the layout from the data if the sidecars it was built from describe
+    another version: they are only matched to the data by file sizes.
+    """
+    current = registry.current()
+    if any(sidecar["version"] != current.version for sidecar in (metadata, snapshot) if sidecar is not None):
+        print(f"The sidecars of {config.DATA_PATH} describe another version of the data "
+              f"(rewrite them with src.data.metadata and src.components.snapshot), "
+              f"rebuilding the layout from the data", flush=True)
+        app.layout = create_layout(current.get().df)
+
+
+if metadata is not None or snapshot is not None:
+    # Once the data is hashed, off the startup path
+    Deferred(check_layout_version, name="check-layout-version")
+
+# Layouts of reloaded dataset versions, built before they are served
+layouts = {}
+
+
+def build_version_layout(new):
+    layouts[new.version] = create_layout(new.get().df,
+                                         snapshot=read_snapshot(config.DATA_PATH, new.version) if config.USE_SNAPSHOT else None)
+
+
+def serve_version_layout(old, new):
+    app.layout = layouts.pop(new.version)
+
+
+registry.on_load(build_version_layout)
+registry.on_swap(serve_version_layout)
+registry.start()
 
 if __name__ == "__main__":
     app.run(debug=False)
@@ -0,0 +1,22 @@
+// export.js
+// Clientside callback of the download button, loaded by Dash from the assets folder.
+// The link is rebuilt in the browser when filters are applied; the file is streamed
+// by the /export route (`export_apps` in src/callbacks/charts_callbacks.py).
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    download: {
+        /**
+         * Link to the CSV export of the apps selected by the applied filters.
+         *
+         * @param {Object} state - The `filters-store` data; null before the first Apply
+         *                         (the link to every app, set when the page loads).
+         * @returns {string} The export URL, with the filter state as JSON.
+         */
+        href: function (state) {
+            // Under the prefix of the requests of Dash, which a proxy may add (requests_pathname_prefix)
+            const config = JSON.parse(document.getElementById("_dash-config").textContent);
+            const url = config.requests_pathname_prefix + "export/apps.csv";
+            return state ? url + "?state=" + encodeURIComponent(JSON.stringify(state)) : url;
+        }
+    }
+});
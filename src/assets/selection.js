@@ -0,0 +1,20 @@
+// selection.js
+// Clientside callbacks of the filter dropdowns, loaded by Dash from the assets folder.
+// They run in the browser, so editing a selection costs no request to the server.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    selection: {
+        /**
+         * Make "All" exclusive in a multi-select dropdown, like `normalize_selection`
+         * in src/callbacks/filters_callbacks.py.
+         *
+         * @param {Array} selected - Selected values; a cleared dropdown may send null.
+         * @returns {Array} The selection without "All" if anything else is selected,
+         *                  otherwise ["All"].
+         */
+        normalize: function (selected) {
+            const values = (selected || []).filter(function (value) { return value !== "All"; });
+            return values.length > 0 ? values : ["All"];
+        }
+    }
+});
@@ -2,13 +2,17 @@ from dash import Dash
 import pandas as pd
 from src.callbacks import register_charts_callbacks, register_filters_callbacks
 
-def register_callbacks(app, df):
+def register_callbacks(app, df, data_path=None, render_on_load=False):
     """
     Register all callbacks for the Dash app.
 
     Parameters:
     app (Dash): The Dash app instance.
-    df (pd.DataFrame): The DataFrame containing the data.
+    df (pd.DataFrame, callable or DatasetRegistry): The DataFrame containing the data,
+                                                    a function loading it, or the
+                                                    registry serving its versions.
+    data_path (str, optional): The file `df` was loaded from, used to version cached results.
+    render_on_load (bool): Render the charts when the page loads (fast-start layout).
     """
-    register_charts_callbacks(app, df)
+    register_charts_callbacks(app, df, data_path, render_on_load)
     register_filters_callbacks(app)
\ No newline at end of file
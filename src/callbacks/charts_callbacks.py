@@ -1,6 +1,13 @@
 # callbacks/charts_callbacks.py
 
-from dash import Input, Output, State
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dash import Input, Output, State, no_update
+from flask import Response, abort, request
+import numpy as np
 import pandas as pd
 
 from src.charts.engagement_chart import engagement_chart
@@ -8,59 +15,346 @@ from src.components.get_summary_stats import get_summary_stats
 from src.charts.make_density_plot import make_density_plot
 from src.charts.ranking_chart import create_wordcloud
 from src.charts.make_popularity_score import make_popularity_score
+from src.charts.pie_chart import create_pie
+from src.charts.transport import compact_vega_spec
+from src import config
+from src.data.data_import import DASHBOARD_COLUMNS, dataset_version, file_fingerprint
+from src.data.deferred import Deferred
+from src.data.export import EXPORT_FORMATS, export_rows
+from src.data.registry import DatasetRegistry
+from src.callbacks.filters_callbacks import normalize_selection
+from src.components.chart_components import vega_spec
+
+from src.utils.cache import filter_cache, spec_cache
+from src.utils.cache_warmer import DEFAULT_STATE, CacheWarmer, FilterStateCounter, load_states
+from src.utils.metrics import stage
+
+def warm_chart_libraries():
+    """
+    Pay the one-off costs of the first render: importing altair, plotly and
+    wordcloud, and loading the Vega-Lite schema and compiler on the first
+    compilation of a chart.
+    """
+    import altair as alt
+    import plotly.graph_objects
+    import wordcloud
+
+    alt.Chart(pd.DataFrame({"x": [0]})).mark_point().encode(x="x").to_dict(format="vega")
 
-from src.utils.cache import cache
 
-def register_charts_callbacks(app, df):
+def register_charts_callbacks(app, df, data_path=None, render_on_load=False):
     """
     Register callbacks related to updating charts and visualizations.
 
     Parameters:
     app (Dash): The Dash app instance.
-    df (pd.DataFrame): The DataFrame containing the data.
+    df (pd.DataFrame, callable or DatasetRegistry): The DataFrame containing the data,
+                                   a function loading it, or the registry serving
+                                   its versions. A loader runs in a background
+                                   thread, with the indexes, and callbacks wait for it.
+    data_path (str, optional): The file `df` was loaded from (ignored for a registry).
+                               Cached results are keyed on its content hash; without
+                               a watching registry, caching is bypassed once the
+                               file on disk no longer matches `df`.
+    render_on_load (bool): Render the charts when the page loads, for a layout
+                           created without them (fast-start layout).
     """
+    # Build the indexes once, at startup, and again for every version the registry loads
+    if isinstance(df, DatasetRegistry):
+        registry = df
+    elif callable(df):
+        registry = DatasetRegistry(data_path=data_path, load=lambda _: df())
+    else:
+        registry = DatasetRegistry(df, data_path)
+    data_path = registry.data_path
 
-    @cache.memoize()
-    def filter_dataframe(selected_types, rating_range, selected_ratings, selected_categories):
+    # Once the data is ready (while the browser loads the page, before it asks for the
+    # charts); a layout from a snapshot rendered no chart, so the libraries may not be loaded yet
+    Deferred(lambda: (registry.current().get(), warm_chart_libraries()), name="warm-charts")
+
+    # Threads building the outputs of one Apply click concurrently (None: one after another)
+    render_pool = (ThreadPoolExecutor(max_workers=config.RENDER_WORKERS, thread_name_prefix="render")
+                   if config.RENDER_WORKERS > 0 else None)
+
+    # State of the file the data came from, when the registry does not follow it
+    data_state = {"fingerprint": registry.current().fingerprint, "current": True}
+
+    def data_is_current():
         """
-        Filter the DataFrame based on the selected filters.
+        Check whether the file on disk still holds the data loaded in memory.
+
+        When it changes, the cache entries of the loaded version are dropped and
+        results are no longer cached, so stale charts are never pinned in a cache.
+        A watching registry loads the new data instead: results stay keyed on the
+        version they were computed from, and those of a replaced version are
+        dropped by `retire_version`.
         """
-        if "All" in selected_types:
-            selected_types = df["Type"].unique()
-        if "All" in selected_ratings:
-            selected_ratings = df["Content Rating"].unique()
-        if "All" in selected_categories:
-            selected_categories = df["Category"].unique()
+        if data_path is None or registry.watching:
+            return True
+        loaded_version = registry.current().version
+        fingerprint = file_fingerprint(data_path)
+        if fingerprint != data_state["fingerprint"]:
+            data_state["fingerprint"] = fingerprint
+            data_state["current"] = fingerprint is not None and dataset_version(data_path) == loaded_version
+            if not data_state["current"]:
+                for result_cache in (filter_cache, spec_cache):
+                    result_cache.purge(lambda key: key[0] == loaded_version)
+        return data_state["current"]
 
+    def limit_categories(selected_categories):
         # Limit to 4 categories for better visualization
-        elif len(selected_categories) > 4:
-            selected_categories = selected_categories[:4]
-
-        min_rating, max_rating = rating_range
-        filtered_df = df[
-            (df["Type"].isin(selected_types)) &
-            (df["Rating"] >= min_rating) & (df["Rating"] <= max_rating) &
-            (df["Content Rating"].isin(selected_ratings)) &
-            (df["Category"].isin(selected_categories))
-        ]
-        return filtered_df
-    
-    def update_category_filter(selected_category):
+        if "All" not in selected_categories and len(selected_categories) > 4:
+            return selected_categories[:4]
+        return selected_categories
+
+    def filter_key(current, selected_types, rating_range, selected_ratings, selected_categories):
         """
-        Ensures that selecting 'All' in Category filter disables other selections and vice versa.
-        
+        Canonical cache key of a filter state, including the dataset version.
+        """
+        selected_categories = limit_categories(selected_categories)
+        return (current.version,
+                current.get().filter_engine.normalize(selected_types, rating_range, selected_ratings, selected_categories))
+
+    def filter_positions(current, selected_types, rating_range, selected_ratings, selected_categories):
+        """
+        Row positions of the DataFrame of a dataset version matching the selected filters.
+
+        The positions are cached per normalized filter state in `filter_cache`,
+        so repeated filters skip the engine query.
+        """
+        selected_categories = limit_categories(selected_categories)
+        compute = lambda: current.get().filter_engine.query(selected_types, rating_range, selected_ratings, selected_categories)
+        with stage("filter"):
+            if data_is_current():
+                key = filter_key(current, selected_types, rating_range, selected_ratings, selected_categories)
+                positions = filter_cache.get_or_compute(key, compute)
+            else:
+                positions = compute()
+        return positions
+
+    def render_outputs(current, positions, selection, rating_range, categories):
+        """
+        Build the serialized chart specs and formatted summary values for a filter result.
+
+        The top apps of the bubble chart and of the word cloud come from the
+        ranking index, and the category averages and summary values are summed
+        from the aggregate cube; only the box plot reads the filtered rows.
+
         Parameters:
-        selected_category (list): Selected categories.
+        current (DatasetVersion): The dataset version `positions` refer to.
+        positions (np.ndarray): Row positions of the filter result, not empty.
+        selection (tuple): The filter state as normalized by the FilterEngine
+                           (types, rating span, content ratings, categories).
+        rating_range (list): The selected [min_rating, max_rating].
+        categories (list): The category selection shown by the charts.
 
         Returns:
-        list: Updated selected categories.
+        tuple: JSON strings of the popularity, engagement and density Vega specs
+               and of the word cloud figure, followed by the mean rating, reviews
+               and installs as display strings.
         """
-        if any(cat != "All" for cat in selected_category):
-            # If any category other than "All" is selected, remove "All"
-            return [cat for cat in selected_category if cat != "All"]
+        selected_types, _, selected_ratings, filtered_categories = selection
+        data = current.get()
+        df, ranking_index, aggregate_cube = data.df, data.ranking_index, data.aggregate_cube
+        with stage("rank"):
+            filtered_df = df.take(positions)
+            top_apps = df.take(ranking_index.top_rows(positions, filtered_categories, "popularity_score", 50))
+            top_installs = ranking_index.top_apps(positions, filtered_categories, 10)
+
+        with stage("aggregate"):
+            if aggregate_cube.exact:
+                cells = aggregate_cube.select(selected_types, rating_range, selected_ratings, filtered_categories)
+                category_avg_popularity = (aggregate_cube.category_means(cells, "popularity_score")
+                                           .reset_index(name="avg_popularity_score"))
+                stats = get_summary_stats(filtered_df, cube=aggregate_cube, cells=cells)
+            else:
+                category_avg_popularity = None
+                stats = get_summary_stats(filtered_df)
+
+        def vega_json(name, make_chart):
+            # Altair chart construction, compilation to Vega, compaction and serialization, timed separately
+            with stage(f"chart.{name}"):
+                chart = make_chart()
+            with stage(f"vega.{name}"):
+                spec = chart.to_dict(format="vega")
+            if config.COMPACT_SPECS:
+                with stage(f"transport.{name}"):
+                    spec = compact_vega_spec(spec)
+            with stage(f"json.{name}"):
+                return json.dumps(spec)
+
+        def wordcloud_json():
+            with stage("chart.wordcloud"):
+                figure = create_wordcloud(filtered_df, categories, top_installs=top_installs)
+            with stage("json.wordcloud"):
+                return figure.to_json()
+
+        # Builders of each output, slowest first so the pool starts them first
+        builders = {
+            "wordcloud": wordcloud_json,
+            "density": lambda: vega_json("density", lambda: make_density_plot(
+                filtered_df, categories, config.SERVER_SIDE_AGGREGATION)),
+            "engagement": lambda: vega_json("engagement", lambda: engagement_chart(
+                filtered_df, categories, config.SERVER_SIDE_AGGREGATION, top_apps=top_apps)),
+            "popularity": lambda: vega_json("popularity", lambda: make_popularity_score(
+                filtered_df, categories, category_avg_popularity=category_avg_popularity)),
+        }
+        outputs = build_outputs(builders)
+
+        return (
+            outputs["popularity"],
+            outputs["engagement"],
+            outputs["density"],
+            outputs["wordcloud"],
+            f"{stats['mean_rating']:.2f}",
+            f"{stats['mean_reviews']:,.0f}",
+            f"{stats['mean_installs']:,.0f}",
+        )
+
+    def build_outputs(builders):
+        """
+        Run the output builders, in the render pool when one is configured.
+
+        With a pool the wall-clock time is about that of the slowest builder
+        rather than the sum of all of them. The time of each builder is printed
+        when `config.LOG_RENDER_TIMINGS` is set.
+
+        Parameters:
+        builders (dict): Mapping of output name to a function building it.
+
+        Returns:
+        dict: Mapping of output name to its result.
+        """
+        def timed(build):
+            start = time.perf_counter()
+            result = build()
+            return result, time.perf_counter() - start
+
+        start = time.perf_counter()
+        if render_pool is None:
+            outcomes = {name: timed(build) for name, build in builders.items()}
         else:
-            # If only "All" is selected, return ["All"]
-            return ["All"]
+            # Each builder runs in a copy of the request context, so its stages are traced
+            futures = {name: render_pool.submit(contextvars.copy_context().run, timed, build)
+                       for name, build in builders.items()}
+            outcomes = {name: future.result() for name, future in futures.items()}
+        elapsed = time.perf_counter() - start
+
+        if config.LOG_RENDER_TIMINGS:
+            timings = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, (_, seconds) in outcomes.items())
+            print(f"Rendered outputs in {elapsed * 1000:.0f} ms "
+                  f"({config.RENDER_WORKERS} threads): {timings}", flush=True)
+        return {name: result for name, (result, _) in outcomes.items()}
+    
+    def spec_key_of(state, current):
+        """
+        Key of the rendered outputs of a filter state in a dataset version, or None if a filter is empty.
+
+        Rendered outputs depend on the filtered rows and on the category selection.
+        """
+        selected_types, rating_range = state["selected_types"], state["rating_range"]
+        selected_ratings, selected_categories = state["selected_ratings"], state["selected_categories"]
+        if not selected_types or not rating_range or not selected_ratings or not selected_categories:
+            return None
+        # The dropdown normalizes "All" in the browser; normalize again for requests sent without it
+        updated_categories = normalize_selection(selected_categories)
+        key = filter_key(current, selected_types, rating_range, selected_ratings, selected_categories)
+        return (*key, tuple(sorted(updated_categories)))
+
+    def cached_outputs(state, serve_stale=False, current=None):
+        """
+        Serialized outputs of a filter state, from the spec cache or rendered and cached.
+
+        Parameters:
+        state (dict): The filter state, as stored in `filters-store`.
+        serve_stale (bool): On a miss, return the result cached for a retired
+                            dataset version if any, and have the cache warmer
+                            render the current one off the request path.
+        current (DatasetVersion, optional): The dataset version to render, by
+                                            default the one currently served.
+
+        Returns:
+        tuple or None: The outputs of `render_outputs`, or None if a filter is
+                       empty or no app matches.
+        """
+        current = current or registry.current()
+        spec_key = spec_key_of(state, current)
+        if spec_key is None:
+            return None
+        selected_types, rating_range = state["selected_types"], state["rating_range"]
+        selected_ratings, selected_categories = state["selected_ratings"], state["selected_categories"]
+
+        cache_enabled = data_is_current()
+        with stage("spec_cache"):
+            rendered = spec_cache.get(spec_key) if cache_enabled else None
+            if rendered is None and serve_stale and cache_enabled:
+                for version, engine in reversed(retired):
+                    stale_key = (version, engine.normalize(selected_types, rating_range, selected_ratings,
+                                                           limit_categories(selected_categories)),
+                                 spec_key[2])
+                    rendered = spec_cache.get(stale_key)
+                    if rendered is not None:
+                        warmer.revalidate(state)
+                        return rendered
+
+        if rendered is None:
+            positions = filter_positions(current, selected_types, rating_range, selected_ratings, selected_categories)
+            if len(positions) == 0:
+                return None
+            rendered = render_outputs(current, positions, spec_key[1], rating_range, list(spec_key[2]))
+            if cache_enabled:
+                spec_cache.set(spec_key, rendered)
+        return rendered
+
+    def warm_state(state, current=None):
+        """
+        Bring the outputs of a filter state into the spec cache; True unless they were there.
+        """
+        current = current or registry.current()
+        spec_key = spec_key_of(state, current)
+        if spec_key is None or spec_key in spec_cache or not data_is_current():
+            return False
+        cached_outputs(state, current=current)
+        return True
+
+    # Observed frequencies of the applied filter states, and the thread precomputing the popular ones
+    counter = FilterStateCounter()
+    warmer = CacheWarmer(warm_state, counter, top_n=config.WARM_TOP_N, states=load_states(config.WARM_STATES_PATH),
+                         interval=config.WARM_INTERVAL, history_path=config.WARM_HISTORY_PATH or None)
+    # Warming is pointless with the spec cache disabled (max_bytes 0, no second tier)
+    warming = config.CACHE_WARMING and (spec_cache.max_bytes > 0 or spec_cache.second_tier is not None)
+    if warming:
+        warmer.start()
+
+    # Dataset versions replaced by a refresh, as (version, filter engine): their cached
+    # results are served until the warmer has rendered the popular states again
+    retired = []
+
+    def retire_version(version, filter_engine):
+        """
+        Serve the results cached for a replaced dataset version while the popular
+        filter states are rendered again, then drop them (right away without warming).
+        """
+        def drop():
+            if (version, filter_engine) in retired:
+                retired.remove((version, filter_engine))
+            for result_cache in (filter_cache, spec_cache):
+                result_cache.purge(lambda key: key[0] == version)
+
+        if not warming:
+            drop()
+            return
+        retired.append((version, filter_engine))
+        warmer.schedule(after_cycle=drop)
+
+    def warm_version(new):
+        # Off the request path, before the new version is served
+        if warming:
+            for state in warmer.popular_states():
+                warm_state(state, new)
+
+    registry.on_load(warm_version)
+    registry.on_swap(lambda old, new: retire_version(old.version, old.get().filter_engine))
 
     @app.callback(
         [Output("filters-store", "data"),  # Store the filter values in dcc.Store
@@ -70,22 +364,22 @@ def register_charts_callbacks(app, df):
          Output("wordcloud", "figure"),
          Output("mean-rating", "children"),
          Output("mean-reviews", "children"),
-         Output("mean-installs", "children"),
-         Output("category-filter", "value")],
+         Output("mean-installs", "children")],
         [Input("apply-filters", "n_clicks")],
         [State("app-type-filter", "value"),
          State("rating-slider", "value"),
          State("content-rating-filter", "value"),
          State("category-filter", "value")],
-        prevent_initial_call=True
+        prevent_initial_call=not render_on_load
     )
     def update_charts_on_apply(n_clicks, selected_types, rating_range, selected_ratings, selected_categories):
         """
         Update all charts and summary statistics based on the selected filters 
-        when the 'Apply Filters' button is clicked.
+        when the 'Apply Filters' button is clicked, and when the page loads
+        with `render_on_load`.
         """
-        if n_clicks is None:
-            return dash.no_update
+        if n_clicks is None and not render_on_load:
+            return no_update
 
         # Store filter values
         filters_data = {
@@ -95,39 +389,106 @@ def register_charts_callbacks(app, df):
             "selected_categories": selected_categories
         }
 
-        # If any required filter is empty, return a message indicating no data
-        if not selected_types or not rating_range or not selected_ratings or not selected_categories:
-            no_data_msg = {"mark": "text", "encoding": {"text": {"value": "No data selected"}}}
-            return (
-                filters_data,
-                no_data_msg, no_data_msg, no_data_msg, {},
-                "No data", "No data", "No data", []
-            )
+        rendered = cached_outputs(filters_data, serve_stale=True)
+        if rendered is not None:
+            counter.record(filters_data)
 
-        filtered_df = filter_dataframe(selected_types, rating_range, selected_ratings, selected_categories)
-        if filtered_df.empty:
+        # If any required filter is empty, or no app matches, return a message indicating no data
+        if rendered is None:
             no_data_msg = {"mark": "text", "encoding": {"text": {"value": "No data selected"}}}
             return (
                 filters_data,
                 no_data_msg, no_data_msg, no_data_msg, {},
-                "No data", "No data", "No data", selected_categories
+                "No data", "No data", "No data"
             )
 
-        # Calculate mean statistics
-        stats = get_summary_stats(filtered_df)
+        popularity_spec, engagement_spec, density_spec, wordcloud_figure, *summary_values = rendered
 
-        # Ensure "All" is handled correctly for categories
-        updated_categories = update_category_filter(selected_categories)
+        with stage("deserialize"):
+            specs = [json.loads(spec) for spec in (popularity_spec, engagement_spec, density_spec, wordcloud_figure)]
 
         # Return updated components
         return (
             filters_data,
-            make_popularity_score(filtered_df, updated_categories).to_dict(format="vega"),
-            engagement_chart(filtered_df, updated_categories).to_dict(format="vega"),
-            make_density_plot(filtered_df, updated_categories).to_dict(format="vega"),
-            create_wordcloud(filtered_df, updated_categories),
-            f"{stats['mean_rating']:.2f}",
-            f"{stats['mean_reviews']:,.0f}",
-            f"{stats['mean_installs']:,.0f}",
-            updated_categories
-        )
\ No newline at end of file
+            *specs,
+            *summary_values
+        )
+
+    if render_on_load:
+        @app.callback(
+            Output("pie-chart", "spec"),
+            Input("pie-chart", "id")
+        )
+        def render_pie_chart(_):
+            """
+            Render the pie chart, which always shows the whole dataset, when the page loads.
+
+            The category counts are summed from the aggregate cube.
+            """
+            current = registry.current()
+
+            def compute():
+                data = current.get()
+                category_counts = data.aggregate_cube.category_counts(data.aggregate_cube.all_cells())
+                return json.dumps(vega_spec(create_pie(data.df, ["All"], category_counts=category_counts)))
+
+            if data_is_current():
+                spec = spec_cache.get_or_compute((current.version, "pie"), compute)
+            else:
+                spec = compute()
+            return json.loads(spec)
+
+    @app.server.route(f"{app.config.routes_pathname_prefix}export/apps.<file_format>")
+    def export_apps(file_format):
+        """
+        Download the apps selected by a filter state, by descending popularity_score.
+
+        The route is next to those of Dash (under `routes_pathname_prefix`),
+        and the download link in the browser is built like the URLs of Dash
+        requests (see src/assets/export.js).
+
+        The rows are those the charts show (the same FilterEngine query, with
+        at most 4 categories), streamed in chunks as CSV, Parquet or Arrow.
+        The export reads the dataset version current when it started, even
+        if a new one is swapped in meanwhile.
+
+        Query parameters:
+        state: The filter state as JSON, as stored in `filters-store`; every app by default.
+        limit: Export only the first `limit` apps.
+        """
+        if file_format not in EXPORT_FORMATS:
+            abort(404)
+        try:
+            state = {**DEFAULT_STATE, **json.loads(request.args.get("state", "{}"))}
+            # As the dropdowns send them: lists of strings, or null once cleared
+            selections = [state[name] for name in ("selected_types", "selected_ratings", "selected_categories")]
+            if not all(selection is None or (isinstance(selection, list)
+                                             and all(isinstance(value, str) for value in selection))
+                       for selection in selections):
+                raise ValueError("selections must be lists of strings")
+            selected_types, selected_ratings, selected_categories = (selection or [] for selection in selections)
+            if state["rating_range"] is not None and not isinstance(state["rating_range"], list):
+                raise ValueError("rating_range must be [min_rating, max_rating]")
+            rating_range = [float(value) for value in state["rating_range"] or []]
+            if rating_range and len(rating_range) != 2:
+                raise ValueError("rating_range must be [min_rating, max_rating]")
+        except (TypeError, ValueError) as error:
+            abort(400, description=f"Invalid filter state: {error}")
+        limit = request.args.get("limit", type=int)
+        if limit is not None and limit < 0:
+            abort(400, description="limit must not be negative")
+
+        current = registry.current()
+        data = current.get()
+        # As in the Apply callback, an empty filter selects no app
+        if not selected_types or not rating_range or not selected_ratings or not selected_categories:
+            positions = np.empty(0, dtype=np.intp)
+        else:
+            positions = filter_positions(current, selected_types, rating_range, selected_ratings, selected_categories)
+        with stage("rank"):
+            positions = data.ranking_index.ranked_rows(positions, "popularity_score")[:limit]
+
+        media_type, _ = EXPORT_FORMATS[file_format]
+        columns = [column for column in DASHBOARD_COLUMNS if column in data.df.columns]
+        return Response(export_rows(data.df, positions, file_format, columns), mimetype=media_type,
+                        headers={"Content-Disposition": f'attachment; filename="apps.{file_format}"'})
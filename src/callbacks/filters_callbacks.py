@@ -1,57 +1,51 @@
 # callbacks/filters_callbacks.py
 
-from dash import Input, Output
+from dash import ClientsideFunction, Input, Output
+
+# Dropdowns in which "All" is exclusive of the other values
+NORMALIZED_FILTERS = ("app-type-filter", "content-rating-filter", "category-filter")
+
+
+def normalize_selection(selected):
+    """
+    Ensures that selecting 'All' in a filter disables other selections and vice versa.
+
+    This is the Python version of `dash_clientside.selection.normalize` in
+    src/assets/selection.js, which normalizes the dropdowns in the browser.
+    The two must behave the same.
+
+    Parameters:
+    selected (list): Selected values, or None for a cleared dropdown.
+
+    Returns:
+    list: The selected values without 'All' if any other value is selected, otherwise ['All'].
+    """
+    values = [value for value in selected or [] if value != "All"]
+    return values if values else ["All"]
+
 
 def register_filters_callbacks(app):
     """
     Register callbacks related to updating filters.
 
+    The selections are normalized by clientside callbacks, so editing a
+    dropdown sends no request to the server. The download link follows the
+    applied filters the same way.
+
     Parameters:
     app (Dash): The Dash app instance.
     """
-        
-    @app.callback(
-        Output("app-type-filter", "value"),
-        Input("app-type-filter", "value"),
-        prevent_initial_call=True
-    )
-    def update_app_type_selection(selected_types):
-        """
-        Ensures that selecting 'All' in App Type filter disables other selections and vice versa.
-
-        Parameters:
-        selected_types (list): Selected app types.
-
-        Returns:
-        list: Updated selected app types.
-        """
-        if any(type_ != "All" for type_ in selected_types):
-            # If any type other than "All" is selected, clear "All" from the selection
-            return [type_ for type_ in selected_types if type_ != "All"]
-        else:
-            # If only "All" is selected, return ["All"]
-            return ["All"]
-        return selected_types
-
-    @app.callback(
-        Output("content-rating-filter", "value"),
-        Input("content-rating-filter", "value"),
-        prevent_initial_call=True
+    for filter_id in NORMALIZED_FILTERS:
+        app.clientside_callback(
+            ClientsideFunction(namespace="selection", function_name="normalize"),
+            Output(filter_id, "value"),
+            Input(filter_id, "value"),
+            prevent_initial_call=True
+        )
+
+    # Also when the page loads, to put the link under the path prefix of the app
+    app.clientside_callback(
+        ClientsideFunction(namespace="download", function_name="href"),
+        Output("export-link", "href"),
+        Input("filters-store", "data")
     )
-    def update_content_rating_selection(selected_ratings):
-        """
-        Ensures that selecting 'All' in Content Rating filter disables other selections and vice versa.
-
-        Parameters:
-        selected_ratings (list): Selected content ratings.
-
-        Returns:
-        list: Updated selected content ratings.
-        """
-        if any(type_ != "All" for type_ in selected_ratings):
-            # If any type other than "All" is selected, clear "All" from the selection
-            return [type_ for type_ in selected_ratings if type_ != "All"]
-        else:
-            # If only "All" is selected, return ["All"]
-            return ["All"]
-        return selected_ratings
\ No newline at end of file
@@ -0,0 +1,51 @@
+import pandas as pd
+
+def boxplot_summary(df, value, groupby, extent=1.5):
+    """
+    Pre-computes the statistics Vega-Lite's `mark_boxplot` derives client-side.
+
+    Quartiles use linear interpolation, which matches Vega's `q1`/`median`/`q3`
+    aggregates. Whiskers extend to the most extreme values within `extent`
+    times the interquartile range of the box, and values beyond them are
+    returned as outliers, de-duplicated since they are drawn at the same spot.
+
+    Parameters:
+    df (pandas.DataFrame): The input dataframe.
+    value (str): The numeric column to summarize, e.g. 'Rating'.
+    groupby (str): The column defining one box per value, e.g. 'Category'.
+    extent (float): Whisker extent as a multiple of the interquartile range.
+
+    Returns:
+    tuple: (summary, outliers) where
+        - summary (pandas.DataFrame) has one row per group with the columns
+          `groupby`, min_, lower_whisker_, lower_box_, mid_box_, upper_box_,
+          upper_whisker_ and max_ each suffixed with `value`.
+        - outliers (pandas.DataFrame) has the distinct (`groupby`, `value`)
+          pairs lying outside the whiskers.
+    """
+    df = df[[groupby, value]].dropna()
+    grouped = df.groupby(groupby, observed=True)[value]
+
+    summary = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    summary.columns = [f"lower_box_{value}", f"mid_box_{value}", f"upper_box_{value}"]
+    summary[f"min_{value}"] = grouped.min()
+    summary[f"max_{value}"] = grouped.max()
+
+    iqr = summary[f"upper_box_{value}"] - summary[f"lower_box_{value}"]
+    lower_fence = (summary[f"lower_box_{value}"] - extent * iqr).reindex(df[groupby]).to_numpy()
+    upper_fence = (summary[f"upper_box_{value}"] + extent * iqr).reindex(df[groupby]).to_numpy()
+    values = df[value].to_numpy()
+    inside = (values >= lower_fence) & (values <= upper_fence)
+
+    whiskers = df[inside].groupby(groupby, observed=True)[value].agg(["min", "max"])
+    summary[f"lower_whisker_{value}"] = whiskers["min"]
+    summary[f"upper_whisker_{value}"] = whiskers["max"]
+
+    summary = summary.reset_index()[[
+        groupby,
+        f"min_{value}", f"lower_whisker_{value}", f"lower_box_{value}", f"mid_box_{value}",
+        f"upper_box_{value}", f"upper_whisker_{value}", f"max_{value}"
+    ]]
+    outliers = df[~inside].drop_duplicates().reset_index(drop=True)
+
+    return summary, outliers
@@ -1,16 +1,19 @@
-import altair as alt
-
-def engagement_chart(df, categories):
+def engagement_chart(df, categories, server_side=False, top_apps=None):
     """
     Generate an Altair bubble chart showing reviews vs. installs with zoom functionality.
 
     Parameters:
         df (pd.DataFrame): The filtered DataFrame.
         categories (list): The categories to filter on.
+        server_side (bool): If True, only the columns the chart encodes are embedded
+                            in the spec instead of every column of the top rows.
+        top_apps (pd.DataFrame, optional): The top 50 rows by popularity score, when
+                            already known (e.g. from a RankingIndex). Skips the sort.
 
     Returns:
         alt.Chart: Altair chart with zoom functionality.
     """
+    import altair as alt
     category_to_color = {
         'GAME': "#1f77b4",
         'ENTERTAINMENT': "#ff7f0e",
@@ -24,14 +27,17 @@ def engagement_chart(df, categories):
         'EDUCATION': "#17becf"
     }
     
-    if "All" not in categories:
-        df = df[df["Category"].isin(categories)]
+    if top_apps is None:
+        if "All" not in categories:
+            df = df[df["Category"].isin(categories)]
 
-    # Select top 50 apps for better visibility
-    top_apps = df.sort_values(by="popularity_score", ascending=False).head(50)
+        # Select top 50 apps for better visibility
+        top_apps = df.sort_values(by="popularity_score", ascending=False).head(50)
+    if server_side:
+        top_apps = top_apps[["App", "Category", "Installs", "Reviews", "Rating"]]
 
-    top_apps["Installs"] = top_apps["Installs"] / 1_000  
-    top_apps["Reviews"] = top_apps["Reviews"] / 1_000  
+    top_apps = top_apps.assign(Installs=top_apps["Installs"] / 1_000,
+                               Reviews=top_apps["Reviews"] / 1_000)
 
     selection = alt.selection_point(fields=["Category"], bind="legend")
 
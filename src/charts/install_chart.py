@@ -1,7 +1,6 @@
-import altair as alt
 import pandas as pd
 
-def installs_chart(df, selected_type="Free", min_rating=4):
+def installs_chart(df, selected_type="Free", min_rating=4, category_installs=None):
     """
     Generate an interactive Altair bar chart for the Top 10 App Categories by Installs.
 
@@ -9,10 +8,13 @@ def installs_chart(df, selected_type="Free", min_rating=4):
         df (pd.DataFrame): The DataFrame containing app data.
         selected_type (str): "Free" or "Paid".
         min_rating (float): Minimum rating to filter apps.
+        category_installs (pd.DataFrame, optional): The 'Category' and total 'Installs'
+                       columns, when already aggregated (e.g. from an AggregateCube).
 
     Returns:
         object of the Altair chart
     """
+    import altair as alt
     category_to_color = {
     'GAME': "#1f77b4",
     'ENTERTAINMENT': "#ff7f0e",
@@ -26,7 +28,9 @@ def installs_chart(df, selected_type="Free", min_rating=4):
     'EDUCATION': "#17becf"
     }
     
-    top_categories = df.groupby("Category")["Installs"].sum().reset_index()
+    if category_installs is None:
+        category_installs = df.groupby("Category", observed=True)["Installs"].sum().reset_index()
+    top_categories = category_installs.copy()
     top_categories["Installs"] = top_categories["Installs"] / 1000  
     top_categories = top_categories.sort_values(by="Installs", ascending=False).head(10)
 
@@ -1,6 +1,6 @@
-import altair as alt
+from src.charts.aggregates import boxplot_summary
 
-def make_density_plot(df, categories):
+def make_density_plot(df, categories, server_side=False):
     """
     Creates a density plot for the 'Rating' column in the dataset.
 
@@ -8,6 +8,9 @@ def make_density_plot(df, categories):
     df (pandas.DataFrame): The input dataframe containing app data with a 'Rating' column.
     categories (list): A list of selected categories for filtering the data. 
                        If 'All' is included, the data will not be filtered by category.
+    server_side (bool): If True, the box plot statistics are computed in pandas and the
+                        chart only embeds one summary row per category plus the distinct
+                        outliers, instead of every row for the browser to aggregate.
 
     Returns:
     alt.Chart: An Altair chart object representing the density plot for the 'Rating' column.
@@ -18,6 +21,7 @@ def make_density_plot(df, categories):
     have its own color. If more than four categories are selected, the plot will display the density 
     for all categories together, with the density area colored in steelblue.
     """
+    import altair as alt
     # if "All" not in categories:
     #     df = df[df["Category"].isin(categories)]
 
@@ -50,10 +54,13 @@ def make_density_plot(df, categories):
     min_rating = df['Rating'].min()
     max_rating = df['Rating'].max()
 
+    if server_side:
+        return make_summarized_boxplot(df, categories, category_to_color, min_rating, max_rating)
+
     boxplot_chart = alt.Chart(df).mark_boxplot().encode(
         y=alt.Y('Category:N', axis=None),  
         x=alt.X('Rating:Q', scale=alt.Scale(domain=[min_rating, max_rating])),   
-        color=alt.Color('Category:N' if len(categories) <= 4 else alt.value('steelblue'), scale=alt.Scale(domain=list(category_to_color.keys()), range=list(category_to_color.values())),legend=None)
+        color=alt.Color('Category:N', scale=alt.Scale(domain=list(category_to_color.keys()), range=list(category_to_color.values())),legend=None) if len(categories) <= 4 else alt.value('steelblue')
     ).properties(
         height=350,
         width=400
@@ -62,4 +69,69 @@ def make_density_plot(df, categories):
 
     return boxplot_chart
 
-    #return density_chart
\ No newline at end of file
+    #return density_chart
+
+def make_summarized_boxplot(df, categories, category_to_color, min_rating, max_rating):
+    """
+    Draws the 'Rating' box plot from pre-computed statistics.
+
+    The layers reproduce what `mark_boxplot` renders: whisker rules, the
+    interquartile box, a white median tick and unfilled outlier points.
+
+    Parameters:
+    df (pandas.DataFrame): The dataframe, already filtered by category.
+    categories (list): The selected categories, used to pick the coloring.
+    category_to_color (dict): Mapping of category to color.
+    min_rating (float): Lower bound of the x axis.
+    max_rating (float): Upper bound of the x axis.
+
+    Returns:
+    alt.LayerChart: The layered box plot.
+    """
+    import altair as alt
+    summary, outliers = boxplot_summary(df, 'Rating', 'Category')
+
+    x_scale = alt.Scale(domain=[min_rating, max_rating])
+    y = alt.Y('Category:N', axis=None)
+    color_scale = alt.Scale(domain=list(category_to_color.keys()), range=list(category_to_color.values()))
+    color = alt.Color('Category:N', scale=color_scale, legend=None) if len(categories) <= 4 else alt.value('steelblue')
+    whisker_tooltip = [alt.Tooltip('upper_whisker_Rating:Q', title='Upper Whisker of Rating'),
+                       alt.Tooltip('lower_whisker_Rating:Q', title='Lower Whisker of Rating'),
+                       'Category:N']
+
+    base = alt.Chart(summary).encode(y=y)
+
+    lower_whisker = base.mark_rule(color='black').encode(
+        x=alt.X('lower_whisker_Rating:Q', scale=x_scale, title='Rating'),
+        x2='lower_box_Rating:Q',
+        tooltip=whisker_tooltip
+    )
+    upper_whisker = base.mark_rule(color='black').encode(
+        x=alt.X('upper_box_Rating:Q', scale=x_scale),
+        x2='upper_whisker_Rating:Q',
+        tooltip=whisker_tooltip
+    )
+    box = base.mark_bar(size=14).encode(
+        x=alt.X('lower_box_Rating:Q', scale=x_scale),
+        x2='upper_box_Rating:Q',
+        color=color,
+        tooltip=[alt.Tooltip('max_Rating:Q', title='Max of Rating'),
+                 alt.Tooltip('upper_box_Rating:Q', title='Q3 of Rating'),
+                 alt.Tooltip('mid_box_Rating:Q', title='Median of Rating'),
+                 alt.Tooltip('lower_box_Rating:Q', title='Q1 of Rating'),
+                 alt.Tooltip('min_Rating:Q', title='Min of Rating'),
+                 'Category:N']
+    )
+    median = base.mark_tick(color='white', size=14, thickness=1, opacity=0.7).encode(
+        x=alt.X('mid_box_Rating:Q', scale=x_scale)
+    )
+    outlier_points = alt.Chart(outliers).mark_point(opacity=0.7).encode(
+        x=alt.X('Rating:Q', scale=x_scale),
+        y=y,
+        color=color
+    )
+
+    return alt.layer(outlier_points, lower_whisker, upper_whisker, box, median).properties(
+        height=350,
+        width=400
+    )
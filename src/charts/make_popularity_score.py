@@ -1,6 +1,4 @@
-import altair as alt
-
-def make_popularity_score(df, categories):
+def make_popularity_score(df, categories, category_avg_popularity=None):
     """
     Creates a histogram for the average of popularity score for each category selected in the dataset.
 
@@ -8,6 +6,8 @@ def make_popularity_score(df, categories):
     df (pandas.DataFrame): The input dataframe containing app data with a 'Reviews' column.
     categories (list): A list of selected categories for filtering the data. 
                        If 'All' is included, the data will not be filtered by category.
+    category_avg_popularity (pandas.DataFrame, optional): The 'Category' and 'avg_popularity_score'
+                       columns, when already aggregated (e.g. from an AggregateCube).
 
     Returns:
     alt.Chart: An Altair chart object representing the popularity score for each category selected in the dataset
@@ -17,6 +17,7 @@ def make_popularity_score(df, categories):
     four categories are selected, the color of the bars is set to orange. Otherwise, the bars
     are colored by category.
     """
+    import altair as alt
     category_to_color = {
     'GAME': "#1f77b4",
     'ENTERTAINMENT': "#ff7f0e",
@@ -30,18 +31,19 @@ def make_popularity_score(df, categories):
     'EDUCATION': "#17becf"
     }
     
-    if "All" not in categories:
-        df = df[df["Category"].isin(categories)]
+    if category_avg_popularity is None:
+        if "All" not in categories:
+            df = df[df["Category"].isin(categories)]
 
-    # Aggregate the data to calculate the average popularity_score by Category
-    category_avg_popularity = df.groupby('Category')['popularity_score'].mean().reset_index(name='avg_popularity_score')
+        # Aggregate the data to calculate the average popularity_score by Category
+        category_avg_popularity = df.groupby('Category', observed=True)['popularity_score'].mean().reset_index(name='avg_popularity_score')
 
     # Create an Altair bar chart to visualize the average popularity_score by category
     avg_popularity_chart = alt.Chart(category_avg_popularity).mark_bar().encode(
         alt.Y('Category:N', title='Category', sort='-x'),  
         alt.X('avg_popularity_score:Q', title='Average Popularity Score'),  
         #color='Category:N' if len(categories) <= 4 else alt.value('orange'),  
-        color=alt.Color('Category:N' if len(categories) <= 4 else alt.value('orange'), scale=alt.Scale(domain=list(category_to_color.keys()), range=list(category_to_color.values())),legend=None),
+        color=alt.Color('Category:N', scale=alt.Scale(domain=list(category_to_color.keys()), range=list(category_to_color.values())),legend=None) if len(categories) <= 4 else alt.value('orange'),
         tooltip=["Category",  alt.Tooltip("avg_popularity_score:Q", title="Average Popularity Score")]
     ).properties(
         height=350,
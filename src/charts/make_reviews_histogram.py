@@ -1,5 +1,3 @@
-import altair as alt
-
 def make_reviews_histogram(df, categories):
     """
     Creates a histogram for the 'Reviews' column in the dataset.
@@ -17,6 +15,7 @@ def make_reviews_histogram(df, categories):
     four categories are selected, the color of the bars is set to orange. Otherwise, the bars
     are colored by category.
     """
+    import altair as alt
     if "All" not in categories:
         df = df[df["Category"].isin(categories)]
 
@@ -1,7 +1,6 @@
-import altair as alt
 import pandas as pd
 
-def create_pie(df, categories):
+def create_pie(df, categories, category_counts=None):
     """
     Generate an interactive Altair pie chart for the Top 10 App Categories by popularity score.
 
@@ -9,10 +8,13 @@ def create_pie(df, categories):
         df (pd.DataFrame): The DataFrame containing app data.
         categories (list): A list of selected categories for filtering the data. 
                        If 'All' is included, the data will not be filtered by category.
+        category_counts (pd.DataFrame, optional): The 'Category' and 'Count' columns, when
+                       already aggregated (e.g. from an AggregateCube).
 
     Returns:
         object of the Altair chart
     """
+    import altair as alt
     category_to_color = {
     'GAME': "#1f77b4",
     'ENTERTAINMENT': "#ff7f0e",
@@ -26,7 +28,8 @@ def create_pie(df, categories):
     'EDUCATION': "#17becf"
     }
     
-    category_counts = df.groupby('Category').size().reset_index(name='Count')
+    if category_counts is None:
+        category_counts = df.groupby('Category', observed=True).size().reset_index(name='Count')
     total_apps = category_counts['Count'].sum()
     category_counts['Percentage'] = (category_counts['Count'] / total_apps) * 100
 
@@ -1,40 +1,70 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from flask_caching import Cache
-from wordcloud import WordCloud
-from dash import dcc
-import plotly.graph_objects as go
+import base64
+import io
+from functools import lru_cache
 
-cache = Cache()
+# Size of the word cloud image, in pixels
+WIDTH, HEIGHT = 800, 400
 
-#@cache.memoize()
-def create_wordcloud(df, categories):
+# Colors of the PNG palette: the cloud is a few flat colors plus anti-aliasing
+PNG_COLORS = 64
+
+
+@lru_cache(maxsize=256)
+def render_wordcloud(frequencies):
+    """
+    Lay out a word cloud and encode it as a PNG data URI.
+
+    The layout uses a fixed random state, so the same words always give the
+    same image and layouts can be cached by their input. The image is stored
+    with a small palette, which makes it a few tens of kB instead of the
+    800x400x3 pixel array `go.Image(z=...)` serializes.
+
+    Parameters:
+        frequencies (tuple): (word, weight) pairs, e.g. the top 10 (app, installs).
+                             A tuple, so that layouts are cached per distinct input.
+
+    Returns:
+        str: A "data:image/png;base64,..." URI.
+    """
+    from wordcloud import WordCloud
+    from wordcloud.wordcloud import FONT_PATH
+
+    wordcloud = WordCloud(width=WIDTH, height=HEIGHT, background_color="white",
+                          font_path=FONT_PATH, random_state=0)
+    wordcloud.generate_from_frequencies(dict(frequencies))
+
+    buffer = io.BytesIO()
+    wordcloud.to_image().quantize(colors=PNG_COLORS).save(buffer, format="PNG", optimize=True)
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def create_wordcloud(df, categories, top_installs=None):
     """
-    Generate a word cloud for the Top 10 App Categories by Installs.
+    Generate a word cloud of the Top 10 Apps by Installs.
 
     Parameters:
         df (pd.DataFrame): The DataFrame containing app data.
-        selected_type (str): "Free" or "Paid".
-        min_rating (float): Minimum rating to filter apps.
+        categories (list): Selected categories, or ["All"].
+        top_installs (list, optional): The top 10 (app, total installs) pairs, when
+                                       already known (e.g. from a RankingIndex).
     """
-    if "All" not in categories:
-        df = df[df["Category"].isin(categories)]
-        
-    top_categories = df.groupby("App")["Installs"].sum().reset_index()
-
-    top_categories = top_categories.sort_values(by="Installs", ascending=False).head(10)
-    
-    # Create a dictionary for the word cloud where keys are categories and values are install counts
-    wordcloud_data = dict(zip(top_categories["App"], top_categories["Installs"]))
-    
-    wordcloud = WordCloud(width=800, height=400, background_color="white")
-    wordcloud.generate_from_frequencies(wordcloud_data)
-    
-    # generate image
-    wordcloud_img = wordcloud.to_image()
+    import plotly.graph_objects as go
+    if top_installs is None:
+        if "All" not in categories:
+            df = df[df["Category"].isin(categories)]
+
+        top_categories = df.groupby("App", observed=True)["Installs"].sum().reset_index()
+
+        top_categories = top_categories.sort_values(by="Installs", ascending=False).head(10)
+        top_installs = zip(top_categories["App"], top_categories["Installs"])
+
+    # Pairs of (app, installs), the key of the layout cache, in a canonical order so
+    # that rankings breaking ties differently share a layout
+    wordcloud_data = tuple(sorted(((str(app), int(installs)) for app, installs in top_installs),
+                                  key=lambda pair: (-pair[1], pair[0])))
 
     fig = go.Figure()
-    fig.add_trace(go.Image(z=wordcloud))
+    fig.add_trace(go.Image(source=render_wordcloud(wordcloud_data)))
     fig.update_layout(
         height=400,
         xaxis={"visible": False},
@@ -44,6 +74,7 @@ def create_wordcloud(df, categories):
         paper_bgcolor="#F9F9FA",
         plot_bgcolor="#F9F9FA",
     )
-    
+    # The default template is 7 kB of styles for traces and axes this figure does not show
+    fig.layout.template = None
+
     return fig
-    
\ No newline at end of file
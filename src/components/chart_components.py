@@ -1,14 +1,59 @@
+import json
+
 from dash import Dash, dcc, html, Input, Output, dash_table
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
 
+from src import config
 from src.charts.engagement_chart import engagement_chart
 from src.charts.make_density_plot import make_density_plot
 from src.charts.ranking_chart import create_wordcloud 
 from src.charts.make_popularity_score import make_popularity_score
 from src.charts.pie_chart import create_pie
+from src.charts.transport import compact_vega_spec
 #from src.charts.install_chart import installs_chart
 
+# Contents of the charts in a fast-start layout, rendered by the callbacks once the page loads
+EMPTY_SPEC = {"$schema": "https://vega.github.io/schema/vega/v5.json", "marks": []}
+EMPTY_FIGURE = {"layout": {"height": 400, "xaxis": {"visible": False}, "yaxis": {"visible": False},
+                           "paper_bgcolor": "#F9F9FA", "plot_bgcolor": "#F9F9FA"}}
+
+
+def vega_spec(chart):
+    """
+    Compile a chart to the Vega spec sent to the browser, compacted unless disabled in config.
+    """
+    spec = chart.to_dict(format="vega")
+    return compact_vega_spec(spec) if config.COMPACT_SPECS else spec
+
+
+# Content of each chart of the initial layout ("All" selected), by component id.
+# The Vega specs and the word cloud figure are plain JSON, so they can be snapshotted.
+DEFAULT_CHARTS = {
+    "popularity-histogram": lambda df: vega_spec(make_popularity_score(df, ["All"])),
+    "engagement-chart": lambda df: vega_spec(engagement_chart(df, ["All"], config.SERVER_SIDE_AGGREGATION)),
+    "density-plot": lambda df: vega_spec(make_density_plot(df, ["All"], config.SERVER_SIDE_AGGREGATION)),
+    "pie-chart": lambda df: vega_spec(create_pie(df, ["All"])),
+    "wordcloud": lambda df: json.loads(create_wordcloud(df, ["All"]).to_json()),
+}
+
+
+def initial_content(chart_id, df, charts, empty=EMPTY_SPEC):
+    """
+    Content of a chart in the initial layout.
+
+    Parameters:
+    chart_id (str): The component id, a key of DEFAULT_CHARTS.
+    df (pd.DataFrame or None): The dataset the chart is rendered from.
+    charts (dict or None): Prerendered contents by component id (e.g. from a snapshot),
+                           used instead of rendering from `df`.
+    empty: The content without `charts` nor `df`.
+    """
+    if charts is not None:
+        return charts[chart_id]
+    return empty if df is None else DEFAULT_CHARTS[chart_id](df)
+
+
 # def install_chart_component(df):
 #     # Make charts
 #     install_chart = dbc.Card([
@@ -30,7 +75,7 @@ from src.charts.pie_chart import create_pie
 
 #     return install_chart
 
-def engagement_chart_component(df):
+def engagement_chart_component(df, charts=None):
     """
     Creates a Dash Bootstrap Card component displaying the 'Reviews vs. Installs' engagement chart.
 
@@ -40,8 +85,12 @@ def engagement_chart_component(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or None
         The dataset containing app-related information, including installs, reviews, and categories.
+        None leaves the chart empty, for the callbacks to render (fast-start layout).
+    charts : dict, optional
+        Prerendered chart contents by component id (see `src.components.snapshot`),
+        used instead of rendering from `df`.
 
     Returns:
     --------
@@ -68,7 +117,7 @@ def engagement_chart_component(df):
                 children=[
                     dvc.Vega(
                         id="engagement-chart",
-                        spec=engagement_chart(df, ["All"]).to_dict(format="vega"),
+                        spec=initial_content("engagement-chart", df, charts),
                         style={'width': '100%', 'height': '100%'}
                     )
                 ]
@@ -77,7 +126,7 @@ def engagement_chart_component(df):
         )
     ], className="shadow-sm h-100 border-0 rounded")
 
-def density_plot_component(df):
+def density_plot_component(df, charts=None):
     """
     Creates a Dash Bootstrap Card component displaying the 'Density Plot for Ratings'.
 
@@ -87,8 +136,12 @@ def density_plot_component(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or None
         The dataset containing app-related information, including ratings, installs, and reviews.
+        None leaves the chart empty, for the callbacks to render (fast-start layout).
+    charts : dict, optional
+        Prerendered chart contents by component id (see `src.components.snapshot`),
+        used instead of rendering from `df`.
 
     Returns:
     --------
@@ -115,7 +168,7 @@ def density_plot_component(df):
                 children=[
                     dvc.Vega(
                         id="density-plot",
-                        spec=make_density_plot(df, ["All"]).to_dict(format="vega"),
+                        spec=initial_content("density-plot", df, charts),
                         style={'width': '100%',
                             'height': '100%' 
                             }
@@ -129,7 +182,7 @@ def density_plot_component(df):
     
     
 
-def popularity_histogram_component(df):
+def popularity_histogram_component(df, charts=None):
     """
     Creates a Dash Bootstrap Card component displaying the 'Average Popularity Score by Categories' histogram.
 
@@ -139,8 +192,12 @@ def popularity_histogram_component(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or None
         The dataset containing app-related information, including categories, installs, and ratings.
+        None leaves the chart empty, for the callbacks to render (fast-start layout).
+    charts : dict, optional
+        Prerendered chart contents by component id (see `src.components.snapshot`),
+        used instead of rendering from `df`.
 
     Returns:
     --------
@@ -168,7 +225,7 @@ def popularity_histogram_component(df):
                 children=[
                     dvc.Vega(
                         id="popularity-histogram",
-                        spec=make_popularity_score(df, ["All"]).to_dict(format="vega"),
+                        spec=initial_content("popularity-histogram", df, charts),
                         style={
                             "width": "100%",
                             "height": "100%" 
@@ -184,7 +241,7 @@ def popularity_histogram_component(df):
 
     
 
-def wordcloud_component(df):
+def wordcloud_component(df, charts=None):
     """
     Creates a Dash Bootstrap Card component displaying a 'Word Cloud of Top Apps'.
 
@@ -194,8 +251,12 @@ def wordcloud_component(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or None
         The dataset containing app-related information, including names, installs, and reviews.
+        None leaves the chart empty, for the callbacks to render (fast-start layout).
+    charts : dict, optional
+        Prerendered chart contents by component id (see `src.components.snapshot`),
+        used instead of rendering from `df`.
 
     Returns:
     --------
@@ -220,7 +281,7 @@ def wordcloud_component(df):
                 children=[
                     dcc.Graph(
                         id="wordcloud",
-                        figure=create_wordcloud(df, ["All"]),
+                        figure=initial_content("wordcloud", df, charts, EMPTY_FIGURE),
                         config={"displayModeBar": False},
                         style={'width': '100%', 
                             'height': '100%'}
@@ -235,7 +296,7 @@ def wordcloud_component(df):
 
     
 
-def pie_chart_component(df):
+def pie_chart_component(df, charts=None):
     """
     Creates a Dash Bootstrap Card component displaying a 'Pie Chart for Top Apps'.
 
@@ -245,9 +306,13 @@ def pie_chart_component(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame or None
         The dataset containing app-related information, including categories, installs, 
         and ratings.
+        None leaves the chart empty, for the callbacks to render (fast-start layout).
+    charts : dict, optional
+        Prerendered chart contents by component id (see `src.components.snapshot`),
+        used instead of rendering from `df`.
 
     Returns:
     --------
@@ -272,7 +337,7 @@ def pie_chart_component(df):
                 children=[
                     dvc.Vega(
                     id="pie-chart",
-                    spec=create_pie(df, ["All"]).to_dict(format="vega"),
+                    spec=initial_content("pie-chart", df, charts),
                     style={'width': '100%',
                         'height': '100%' 
                         }
@@ -1,8 +1,7 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from src.data.data_import import get_dropdown_options
 
-def create_global_filters(df):
+def create_global_filters(metadata):
     """
     Creates a set of global filter components for the dashboard.
 
@@ -12,9 +11,9 @@ def create_global_filters(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
-        The dataset containing app-related information, including type, rating, 
-        content rating, and categories.
+    metadata : dict
+        The dataset metadata from `src.data.metadata.build_metadata`, holding the
+        options of the dropdowns.
 
     Returns:
     --------
@@ -24,12 +23,13 @@ def create_global_filters(df):
         - A slider for filtering by rating.
         - A dropdown for selecting content rating.
         - A multi-select dropdown for filtering by app category.
+        - A button downloading the apps selected by the applied filters.
         - Proper layout and styling for ease of use.
 
     Example Usage:
     --------------
     app.layout = dbc.Container([
-        create_global_filters(df)
+        create_global_filters(build_metadata(df))
     ])
     """
     return [
@@ -51,7 +51,7 @@ def create_global_filters(df):
             dbc.Label("Select Category:"),
             dcc.Dropdown(
                 id="category-filter",
-                options=get_dropdown_options(df, "Category"),
+                options=metadata["options"]["Category"],
                 value=["All"],
                 multi=True,
                 maxHeight=200
@@ -73,7 +73,7 @@ def create_global_filters(df):
 
             dbc.Label("Select App Type:"),
             dcc.Dropdown(id="app-type-filter", 
-                         options=get_dropdown_options(df, "Type"),
+                         options=metadata["options"]["Type"],
                          value=["All"], 
                          multi=True),
             html.Br(),
@@ -81,13 +81,17 @@ def create_global_filters(df):
             dbc.Label("Select Content Rating:"),
             dcc.Dropdown(
                 id="content-rating-filter",
-                options=get_dropdown_options(df, "Content Rating"),
+                options=metadata["options"]["Content Rating"],
                 value=["All"], 
                 multi=True
             ),
             html.Br(),
 
-            dbc.Button("Apply Filters", id="apply-filters", color="primary", style={'width': '100%'}, className="mt-3")
+            dbc.Button("Apply Filters", id="apply-filters", color="primary", style={'width': '100%'}, className="mt-3"),
+
+            # Ranked list of the apps selected by the applied filters, see src/assets/export.js
+            dbc.Button("Download Apps (CSV)", id="export-link", href="export/apps.csv", external_link=True,
+                       download="apps.csv", color="primary", outline=True, style={'width': '100%'}, className="mt-2")
         ],
         className="filter-80",
         style={
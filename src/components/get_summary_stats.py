@@ -1,6 +1,6 @@
 import pandas as pd
 
-def get_summary_stats(filtered_df):
+def get_summary_stats(filtered_df, cube=None, cells=None):
     """
     Calculates summary statistics for the filtered DataFrame, including mean, min, and max values 
     for the 'Rating', 'Installs', and 'Reviews' columns.
@@ -8,6 +8,9 @@ def get_summary_stats(filtered_df):
     Args:
         filtered_df (pandas.DataFrame): The filtered DataFrame containing app data with columns 'Rating', 
                                          'Installs', and 'Reviews'.
+        cube (AggregateCube, optional): Pre-aggregated table. When given, the means are
+                                        summed from its cells instead of `filtered_df`.
+        cells (numpy.ndarray, optional): The cells of the filter state, from `cube.select`.
 
     Returns:
         dict: A dictionary containing the calculated summary statistics:
@@ -26,11 +29,16 @@ def get_summary_stats(filtered_df):
         stats = get_summary_stats(filtered_df)
         print(stats)
     """
-    mean_rating = filtered_df['Rating'].mean()
+    if cube is not None:
+        mean_rating = cube.mean(cells, 'Rating')
+        mean_installs = cube.mean(cells, 'Installs')
+        mean_reviews = cube.mean(cells, 'Reviews')
+    else:
+        mean_rating = filtered_df['Rating'].mean()
 
-    mean_installs = filtered_df['Installs'].mean()
+        mean_installs = filtered_df['Installs'].mean()
 
-    mean_reviews = filtered_df['Reviews'].mean()
+        mean_reviews = filtered_df['Reviews'].mean()
 
     return {
         "mean_rating": round(mean_rating, 2),
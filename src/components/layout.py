@@ -3,16 +3,16 @@ from dash import Dash, dcc, html, Input, Output, dash_table
 import dash_bootstrap_components as dbc
 import dash_vega_components as dvc
 from src.components.filters import create_global_filters
-from src.components.get_summary_stats import get_summary_stats
 from src.components.chart_components import (engagement_chart_component, 
                                              density_plot_component, 
                                              popularity_histogram_component, 
                                              wordcloud_component,
                                              pie_chart_component)
 from src.components.footer_components import footer_component
+from src.data.metadata import build_metadata
 
 
-def create_layout(df):
+def create_layout(df=None, metadata=None, snapshot=None):
     """
     Generates the complete layout for the Sales Analytics Dashboard.
 
@@ -24,9 +24,16 @@ def create_layout(df):
 
     Parameters:
     -----------
-    df : pandas.DataFrame
+    df : pandas.DataFrame, optional
         The dataset containing app-related information, including installs, 
-        ratings, categories, and customer engagement data.
+        ratings, categories, and customer engagement data. Without it, the
+        charts are left empty for the callbacks to render (fast-start layout).
+    metadata : dict, optional
+        The filter options and summary statistics of the dataset, as built by
+        `src.data.metadata.build_metadata`; computed from `df` when omitted.
+    snapshot : dict, optional
+        The prerendered charts and summary statistics of the initial state, from
+        `src.components.snapshot.read_snapshot`, used instead of rendering them.
 
     Returns:
     --------
@@ -45,19 +52,24 @@ def create_layout(df):
     Example Usage:
     --------------
     app.layout = create_layout(df)
+    app.layout = create_layout(metadata=read_metadata(data_path))
+    app.layout = create_layout(df, snapshot=read_snapshot(data_path))
     """
+    if metadata is None:
+        metadata = build_metadata(df)
 
-    global_filters = create_global_filters(df)
+    global_filters = create_global_filters(metadata)
 
     # Summary cards
-    summary_stats = get_summary_stats(df)
+    summary_stats = snapshot["summary"] if snapshot else metadata["summary"]
 
     # Charts
-    popularity_histogram = popularity_histogram_component(df)
-    make_engagement_chart = engagement_chart_component(df)
-    density_plot = density_plot_component(df)
-    wordcloud_chart = wordcloud_component(df)
-    pie_chart = pie_chart_component(df)
+    charts = snapshot["charts"] if snapshot else None
+    popularity_histogram = popularity_histogram_component(df, charts)
+    make_engagement_chart = engagement_chart_component(df, charts)
+    density_plot = density_plot_component(df, charts)
+    wordcloud_chart = wordcloud_component(df, charts)
+    pie_chart = pie_chart_component(df, charts)
 
     # Footers
     footer = footer_component()
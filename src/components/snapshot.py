@@ -0,0 +1,94 @@
+# snapshot.py
+import argparse
+import os
+
+from src import config
+from src.components.chart_components import DEFAULT_CHARTS
+from src.components.get_summary_stats import get_summary_stats
+from src.data.data_import import dataset_version, load_dashboard_data
+from src.data.metadata import read_sidecar, sidecar_fingerprint, write_sidecar
+
+# Version of the snapshot format; snapshots of another format are ignored
+SNAPSHOT_FORMAT = 1
+
+
+def snapshot_path(data_path):
+    """
+    Path of the layout snapshot of a dataset: next to the data file or dataset directory.
+    """
+    return data_path.rstrip("/" + os.sep) + ".snapshot.json"
+
+
+def render_settings():
+    """
+    The settings the rendered charts depend on, recorded in snapshots.
+    """
+    return {"server_side_aggregation": config.SERVER_SIDE_AGGREGATION,
+            "compact_specs": config.COMPACT_SPECS,
+            "compact_data": config.COMPACT_DATA}
+
+
+def build_snapshot(df, data_path=None):
+    """
+    Render the initial state of the dashboard ("All" selected).
+
+    Parameters:
+    df (pd.DataFrame): The app table, as loaded by `load_dashboard_data`.
+    data_path (str, optional): The file or directory `df` was loaded from, whose
+                               version and fingerprint identify the data.
+
+    Returns:
+    dict: The dataset version and fingerprint, the render settings, the summary
+          statistics of the KPI cards and the content of every chart of
+          DEFAULT_CHARTS (Vega specs and the word cloud figure).
+    """
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": dataset_version(data_path) if data_path else None,
+        "fingerprint": sidecar_fingerprint(data_path) if data_path else None,
+        "settings": render_settings(),
+        "summary": {key: float(value) for key, value in get_summary_stats(df).items()},
+        "charts": {chart_id: render(df) for chart_id, render in DEFAULT_CHARTS.items()},
+    }
+
+
+def write_snapshot(data_path, df=None):
+    """
+    Write the layout snapshot of a dataset, atomically.
+
+    Parameters:
+    data_path (str): The data file or dataset directory.
+    df (pd.DataFrame, optional): The table stored at `data_path`, as loaded by
+                                 `load_dashboard_data` with the current settings.
+
+    Returns:
+    str: The path of the snapshot.
+    """
+    if df is None:
+        df = load_dashboard_data(data_path, config.COMPACT_DATA, config.ARROW_STRINGS)
+    return write_sidecar(snapshot_path(data_path), build_snapshot(df, data_path))
+
+
+def read_snapshot(data_path, version=None):
+    """
+    Read the layout snapshot of a dataset, if it matches the data on disk and the current settings.
+
+    Parameters:
+    data_path (str): The data file or dataset directory.
+    version (str, optional): The content hash of the data, if known (see `read_sidecar`).
+
+    Returns:
+    dict or None: The snapshot, or None if it is missing, stale or was rendered
+                  with other settings (the layout is then rendered live).
+    """
+    snapshot = read_sidecar(snapshot_path(data_path), data_path, version)
+    if snapshot is None or snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("settings") != render_settings():
+        return None
+    return snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the snapshot of the initial dashboard layout.")
+    parser.add_argument("data", nargs="?", default="data/preprocessed/clean_data_score_1000.parquet")
+    args = parser.parse_args()
+    print(f"Snapshot written to {write_snapshot(args.data)}")
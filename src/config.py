@@ -0,0 +1,84 @@
+# config.py
+import os
+import tempfile
+
+# Preprocessed dataset served by the dashboard
+DATA_PATH = os.environ.get("ADS_DATA_PATH", "data/preprocessed/clean_data_score_1000.parquet")
+
+# Byte budget of the in-process cache of filter results (0 disables it)
+RESULT_CACHE_BYTES = int(os.environ.get("ADS_RESULT_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Flask-Caching backend shared by gunicorn workers, used as a second tier behind
+# the in-process caches. 'NullCache' disables it; 'FileSystemCache' or
+# 'RedisCache' share results between workers (FileSystemCache writes to the
+# system temporary directory by default).
+SHARED_CACHE_CONFIG = {
+    "CACHE_TYPE": os.environ.get("ADS_SHARED_CACHE_TYPE", "NullCache"),
+    "CACHE_DIR": os.environ.get("ADS_SHARED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ads-analytics-cache")),
+    "CACHE_REDIS_URL": os.environ.get("ADS_SHARED_CACHE_REDIS_URL"),
+    "CACHE_NO_NULL_WARNING": True,
+}
+
+# Byte budget of the in-process cache of rendered chart specs (0 disables it)
+SPEC_CACHE_BYTES = int(os.environ.get("ADS_SPEC_CACHE_BYTES", 256 * 1024 * 1024))
+
+# Pre-aggregate chart data in pandas so specs embed summary rows instead of
+# every filtered app ('0' restores client-side aggregation by Vega)
+SERVER_SIDE_AGGREGATION = os.environ.get("ADS_SERVER_SIDE_AGGREGATION", "1") == "1"
+
+# Keep only the columns the dashboard reads, with categorical and downcast
+# dtypes ('0' keeps the table exactly as stored)
+COMPACT_DATA = os.environ.get("ADS_COMPACT_DATA", "1") == "1"
+
+# In compact mode, back the 'App' strings with Arrow memory instead of Python objects
+ARROW_STRINGS = os.environ.get("ADS_ARROW_STRINGS", "0") == "1"
+
+# Threads building the charts of one Apply click concurrently (0 builds them in turn)
+RENDER_WORKERS = int(os.environ.get("ADS_RENDER_WORKERS", 0))
+
+# Print the time taken by each chart of every render
+LOG_RENDER_TIMINGS = os.environ.get("ADS_LOG_RENDER_TIMINGS", "0") == "1"
+
+# Time callbacks, send Server-Timing headers and serve Prometheus metrics at /metrics
+METRICS_ENABLED = os.environ.get("ADS_METRICS", "1") == "1"
+
+# Fraction of callback requests profiled with cProfile (0 disables profiling); the
+# PROFILE_KEEP slowest profiles are kept in PROFILE_DIR (by default in the
+# system temporary directory, outside the source tree)
+PROFILE_SAMPLE_RATE = float(os.environ.get("ADS_PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.environ.get("ADS_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "ads-analytics-profiles"))
+PROFILE_KEEP = int(os.environ.get("ADS_PROFILE_KEEP", 10))
+
+# Send the data of Vega specs as CSV with only the columns the chart reads
+# ('0' sends the rows as Altair embeds them)
+COMPACT_SPECS = os.environ.get("ADS_COMPACT_SPECS", "1") == "1"
+
+# Start without loading the data: build the layout from the metadata sidecar of
+# DATA_PATH (see src/data/metadata.py), load the data and its indexes in a
+# background thread, and render the charts when the page loads. In either mode,
+# the chart functions of src/charts import the chart libraries (altair, plotly,
+# wordcloud and its matplotlib) when first called, so that importing the app
+# does not pay for them before it can serve the layout.
+FAST_START = os.environ.get("ADS_FAST_START", "0") == "1"
+
+# Serve the initial charts and KPIs from the layout snapshot of DATA_PATH (see
+# src/components/snapshot.py) when it matches the data and the settings above
+USE_SNAPSHOT = os.environ.get("ADS_USE_SNAPSHOT", "1") == "1"
+
+# Precompute the outputs of popular filter states in a background thread: the
+# initial state, the states listed in the JSON file WARM_STATES_PATH and the
+# WARM_TOP_N states applied most often, counted across restarts and workers in
+# the JSON file WARM_HISTORY_PATH (by default empty: counts are not kept, and
+# each worker only counts the states it served). Cycles run at startup, after a
+# dataset refresh and every WARM_INTERVAL seconds (0: never periodically).
+CACHE_WARMING = os.environ.get("ADS_CACHE_WARMING", "1") == "1"
+WARM_TOP_N = int(os.environ.get("ADS_WARM_TOP_N", 20))
+WARM_STATES_PATH = os.environ.get("ADS_WARM_STATES", "")
+WARM_HISTORY_PATH = os.environ.get("ADS_WARM_HISTORY", "")
+WARM_INTERVAL = float(os.environ.get("ADS_WARM_INTERVAL", 300))
+
+# Seconds between checks of DATA_PATH for a new dataset version, which is then
+# loaded and indexed in the background and served without restarting the
+# workers (0 disables reloading; results are then no longer cached once the
+# data on disk changes)
+RELOAD_INTERVAL = float(os.environ.get("ADS_RELOAD_INTERVAL", 10))
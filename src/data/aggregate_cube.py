@@ -0,0 +1,170 @@
+# aggregate_cube.py
+import numpy as np
+import pandas as pd
+
+
+class AggregateCube:
+    """
+    Pre-aggregated counts and sums of the app table, built once at load time.
+
+    The table is grouped by ('Category', 'Type', 'Content Rating', rating
+    bucket) and each cell keeps, for every measure, the count of non-null
+    values, their sum and their sum of squares. A dashboard filter selects
+    whole cells, so category-level aggregates and means are answered by
+    summing cells, in time proportional to the number of cells rather than
+    the number of apps.
+
+    Rating buckets are `Rating` rounded to RATING_DECIMALS. When every rating
+    already has that precision (as preprocessing guarantees), selecting the
+    buckets inside a rating range selects exactly the rows inside it; `exact`
+    is False otherwise, and callers should aggregate the rows instead. Rows
+    without a rating are in cells with a NaN bucket, which no rating range
+    selects but `all_cells` does.
+
+    Parameters:
+    df (pd.DataFrame): The app table.
+
+    Example:
+        cube = AggregateCube(df)
+        cells = cube.select(["Free"], [4, 5], ["All"], ["GAME", "SOCIAL"])
+        cube.category_means(cells, "popularity_score")
+    """
+
+    DIMENSIONS = ("Category", "Type", "Content Rating")
+    MEASURES = ("popularity_score", "Rating", "Installs", "Reviews")
+    RATING_DECIMALS = 1
+
+    def __init__(self, df):
+        ratings = df["Rating"].to_numpy(dtype="float64")
+        buckets = np.round(ratings, self.RATING_DECIMALS)
+        self.exact = bool(np.array_equal(ratings, buckets, equal_nan=True))
+
+        keys = {"Rating bucket": buckets, "count": np.ones(len(buckets), dtype="int64")}
+        for dimension in self.DIMENSIONS:
+            keys[dimension] = df[dimension].to_numpy(dtype=object)
+        for measure in self.MEASURES:
+            if pd.api.types.is_integer_dtype(df[measure]):
+                # Integer sums stay exact (installs totals exceed the 2**53 of float64 at scale)
+                values = df[measure].to_numpy(dtype="int64")
+                keys[f"{measure}_count"] = np.ones(len(values), dtype="int64")
+                keys[f"{measure}_sum"] = values
+            else:
+                values = df[measure].to_numpy(dtype="float64")
+                keys[f"{measure}_count"] = (~np.isnan(values)).astype("int64")
+                keys[f"{measure}_sum"] = values = np.nan_to_num(values)
+            keys[f"{measure}_sumsq"] = values.astype("float64") ** 2
+
+        cells = pd.DataFrame(keys).groupby([*self.DIMENSIONS, "Rating bucket"], sort=True, dropna=False).sum()
+        self.n_cells = len(cells)
+        self.rating_buckets = cells.index.get_level_values("Rating bucket").to_numpy()
+        # Dimension values of each cell, as codes into `values`; a missing value has the code -1
+        self.values = {}
+        self.codes = {}
+        for dimension in self.DIMENSIONS:
+            codes, uniques = pd.factorize(cells.index.get_level_values(dimension))
+            self.codes[dimension] = codes
+            self.values[dimension] = list(uniques)
+        self.measures = {column: cells[column].to_numpy() for column in cells.columns}
+
+    def _dimension_mask(self, dimension, selected):
+        if selected is None or "All" in selected:
+            return np.ones(self.n_cells, dtype=bool)
+        selected = set(selected)
+        wanted = [code for code, value in enumerate(self.values[dimension]) if value in selected]
+        if None in selected:
+            # Missing values, kept by "All" as FilterEngine.normalize expands it
+            wanted.append(-1)
+        return np.isin(self.codes[dimension], wanted)
+
+    def all_cells(self):
+        """
+        Select every cell: the whole table, including rows without a rating.
+        """
+        return np.ones(self.n_cells, dtype=bool)
+
+    def select(self, selected_types, rating_range, selected_ratings, selected_categories):
+        """
+        Select the cells of a filter state, with the semantics of FilterEngine.query.
+
+        The selections may also be those of FilterEngine.normalize, in which
+        None stands for the missing values that "All" keeps.
+
+        Parameters:
+        selected_types (list): Selected app types, "All" or None for no constraint.
+        rating_range (list): [min_rating, max_rating], inclusive.
+        selected_ratings (list): Selected content ratings, "All" or None for no constraint.
+        selected_categories (list): Selected categories, "All" or None for no constraint.
+
+        Returns:
+        np.ndarray: Boolean mask over the cells.
+        """
+        min_rating, max_rating = rating_range
+        return (self._dimension_mask("Type", selected_types)
+                & self._dimension_mask("Content Rating", selected_ratings)
+                & self._dimension_mask("Category", selected_categories)
+                & (self.rating_buckets >= min_rating) & (self.rating_buckets <= max_rating))
+
+    def _by_category(self, cells, column):
+        """
+        Sum a cell column per category over the selected cells.
+
+        Categories without selected cells are left out, and so are the cells
+        without a category, as `groupby` does.
+        """
+        categories = np.array(self.values["Category"], dtype=object)
+        codes = self.codes["Category"][cells]
+        values = self.measures[column][cells]
+        categorized = codes >= 0
+        codes, values = codes[categorized], values[categorized]
+        totals = np.zeros(len(categories), dtype=self.measures[column].dtype)
+        np.add.at(totals, codes, values)
+        present = np.bincount(codes, minlength=len(categories)) > 0
+        return pd.Series(totals[present], index=pd.Index(categories[present], name="Category"))
+
+    def category_counts(self, cells):
+        """
+        Number of apps per category in the selected cells, like `df.groupby('Category').size()`.
+
+        Returns:
+        pd.DataFrame: Columns 'Category' and 'Count', sorted by category.
+        """
+        counts = self._by_category(cells, "count")
+        return counts.sort_index().reset_index(name="Count")
+
+    def category_sums(self, cells, measure):
+        """
+        Sum of a measure per category, like `df.groupby('Category')[measure].sum()`.
+
+        Returns:
+        pd.DataFrame: Columns 'Category' and `measure`, sorted by category.
+        """
+        return self._by_category(cells, f"{measure}_sum").sort_index().reset_index(name=measure)
+
+    def category_means(self, cells, measure):
+        """
+        Mean of a measure per category, like `df.groupby('Category')[measure].mean()`.
+
+        Returns:
+        pd.Series: Means indexed by category, sorted by category.
+        """
+        sums = self._by_category(cells, f"{measure}_sum")
+        counts = self._by_category(cells, f"{measure}_count")
+        return (sums / counts.where(counts > 0)).sort_index()
+
+    def mean(self, cells, measure):
+        """
+        Mean of a measure over the selected cells, NaN if they hold no value.
+        """
+        count = self.measures[f"{measure}_count"][cells].sum()
+        return self.measures[f"{measure}_sum"][cells].sum() / count if count else float("nan")
+
+    def std(self, cells, measure):
+        """
+        Sample standard deviation of a measure over the selected cells, like `Series.std()`.
+        """
+        count = self.measures[f"{measure}_count"][cells].sum()
+        if count < 2:
+            return float("nan")
+        total = self.measures[f"{measure}_sum"][cells].sum()
+        squares = self.measures[f"{measure}_sumsq"][cells].sum()
+        return float(np.sqrt(max(squares - total * total / count, 0.0) / (count - 1)))
@@ -1,19 +1,175 @@
 # data_preprocessing.py
+import hashlib
+import os
+
 import pandas as pd
+import pyarrow as pa
+
+from src.data.mapped import MAPPED_EXTENSIONS, read_mapped_dataset
+from src.data.partitioned import query_dataset, resolve_dataset_dir
+
+# Columns read by the filters, charts and summary statistics of the dashboard
+DASHBOARD_COLUMNS = ["App", "Category", "Rating", "Reviews", "Installs", "Type", "Content Rating", "popularity_score"]
+
+# Low-cardinality string columns stored as categoricals in compact mode
+CATEGORICAL_COLUMNS = ["Category", "Type", "Content Rating"]
 
-def load_data(filepath):
+def load_data(filepath, columns=None, filters=None):
     """
     Load the dataset from the specified filepath.
     
     Parameters:
-    filepath (str): The path to the data file (csv or parquet).
+    filepath (str): The path to the data file (csv, parquet, or a memory-mapped
+                    .arrow file), or to a Category-partitioned parquet dataset directory.
+    columns (list, optional): Only load these columns.
+    filters (pyarrow.dataset.Expression, optional): Only load the matching rows,
+                    e.g. from `src.data.partitioned.filter_expression`. The
+                    predicate is pushed down to pyarrow for parquet sources.
     
     Returns:
     pd.DataFrame: The loaded DataFrame.
     """
+    if os.path.isdir(filepath):
+        return query_dataset(filepath, columns=columns, filter=filters)
+    if filepath.endswith(MAPPED_EXTENSIONS):
+        if filters is not None:
+            raise ValueError("Row filters are only supported for parquet sources")
+        return read_mapped_dataset(filepath, columns=columns)
     if ".csv" in filepath:
-        return pd.read_csv(filepath)
-    return pd.read_parquet(filepath)
+        df = pd.read_csv(filepath, usecols=columns)
+        if filters is not None:
+            raise ValueError("Row filters are only supported for parquet sources")
+        return df
+    return pd.read_parquet(filepath, columns=columns, filters=filters)
+
+def compact_dataframe(df, arrow_strings=False):
+    """
+    Shrink the in-memory footprint of the app table.
+
+    - Drops the columns no callback reads (see DASHBOARD_COLUMNS).
+    - Stores 'Category', 'Type' and 'Content Rating' as categoricals.
+    - Downcasts integer columns to the smallest type holding their range.
+
+    Float columns are kept as float64: their values end up in the chart specs,
+    and float32 would change them (4.1 would be sent as 4.099999904632568).
+
+    Parameters:
+    df (pd.DataFrame): The DataFrame returned by `load_data`.
+    arrow_strings (bool): Back the remaining string columns ('App') with Arrow
+                          memory instead of one Python object per row.
+
+    Returns:
+    pd.DataFrame: The compacted DataFrame, with the same rows and values.
+    """
+    df = df[[column for column in DASHBOARD_COLUMNS if column in df.columns]]
+    columns = {}
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = df[column].astype("category")
+        elif pd.api.types.is_integer_dtype(df[column]):
+            columns[column] = pd.to_numeric(df[column], downcast="integer")
+        elif arrow_strings and df[column].dtype == object:
+            columns[column] = df[column].astype(pd.ArrowDtype(pa.string()))
+    return df.assign(**columns)
+
+def load_dashboard_data(filepath, compact=True, arrow_strings=False):
+    """
+    Load a dataset as the dashboard holds it in memory.
+
+    Parameters:
+    filepath (str): The path to the data file or dataset directory.
+    compact (bool): Compact the table with `compact_dataframe`.
+    arrow_strings (bool): See `compact_dataframe`.
+
+    Returns:
+    pd.DataFrame: The loaded DataFrame.
+    """
+    if filepath.endswith(MAPPED_EXTENSIONS):
+        # Already compacted by src/data/mapped.py; compacting again would copy the mapped columns
+        return load_data(filepath)
+    if compact:
+        return compact_dataframe(load_data(filepath, columns=DASHBOARD_COLUMNS), arrow_strings)
+    return load_data(filepath)
+
+def memory_report(df):
+    """
+    Describe the memory held by the app table and by the current process.
+
+    Parameters:
+    df (pd.DataFrame): The app table.
+
+    Returns:
+    str: The DataFrame size and the resident set size of the process, in MB.
+    """
+    frame_bytes = df.memory_usage(deep=True).sum()
+    try:
+        with open("/proc/self/statm") as file:
+            rss_bytes = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # No procfs (e.g. macOS): fall back to the peak RSS, reported in bytes there
+        import resource
+        rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return f"pid {os.getpid()}: DataFrame {frame_bytes / 2**20:.1f} MB, RSS {rss_bytes / 2**20:.1f} MB"
+
+def data_files(filepath):
+    """
+    List the files holding a dataset, in a stable order.
+
+    Parameters:
+    filepath (str): A data file, a partitioned dataset directory or a versions directory.
+
+    Returns:
+    list: Paths of the data files (only the latest version of a versions directory).
+    """
+    if not os.path.isdir(filepath):
+        return [filepath]
+    dataset_dir, _ = resolve_dataset_dir(filepath)
+    files = []
+    for root, dirs, names in os.walk(dataset_dir):
+        dirs.sort()
+        files.extend(os.path.join(root, name) for name in sorted(names))
+    return files
+
+def file_fingerprint(filepath):
+    """
+    Cheap identity of a dataset, used to notice that it changed on disk.
+
+    Parameters:
+    filepath (str): The path to the data file or dataset directory.
+
+    Returns:
+    tuple: (path, size in bytes, modification time in ns) of every data file,
+           or None if the dataset is missing.
+    """
+    try:
+        return tuple((path, stat.st_size, stat.st_mtime_ns)
+                     for path, stat in ((path, os.stat(path)) for path in data_files(filepath)))
+    except FileNotFoundError:
+        return None
+
+def dataset_version(filepath, chunk_size=1 << 20):
+    """
+    Content hash of a dataset, used to key caches of derived results.
+
+    The hash only depends on the bytes of the data files (and their paths
+    within a dataset directory), so every worker (and every machine sharing
+    a cache backend) computes the same version for the same data.
+
+    Parameters:
+    filepath (str): The path to the data file or dataset directory.
+    chunk_size (int): Number of bytes hashed at a time.
+
+    Returns:
+    str: The first 16 hex digits of the SHA-1 of the data.
+    """
+    digest = hashlib.sha1()
+    for path in data_files(filepath):
+        if os.path.isdir(filepath):
+            digest.update(os.path.relpath(path, filepath).encode("utf-8"))
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
 
 def get_dropdown_options(df, column):
     """
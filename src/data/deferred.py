@@ -0,0 +1,92 @@
+# deferred.py
+import os
+import threading
+import weakref
+
+# Deferred values still being computed, restarted in the child after a fork
+_running = weakref.WeakSet()
+
+
+class Deferred:
+    """
+    A value computed in a background thread, such as the dataset and its indexes.
+
+    The thread starts immediately, so the app can serve requests that do not
+    need the value (e.g. its layout) while it is computed. `get` waits for it.
+    If the process forks before the thread finished (a gunicorn master
+    importing the app with --preload), the thread does not exist in the
+    child, and its locks may be held forever: the child starts the
+    computation again, with new locks.
+
+    Parameters:
+    compute (callable): Function returning the value.
+    name (str): Name of the background thread.
+
+    Example:
+        data = Deferred(lambda: load_data(path), name="load-data")
+        ...
+        df = data.get()
+    """
+
+    def __init__(self, compute, name="deferred"):
+        self._compute = compute
+        self._name = name
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+        if compute is not None:
+            self._start()
+
+    @classmethod
+    def of(cls, value):
+        """
+        A Deferred holding an already computed value.
+        """
+        deferred = cls(None)
+        deferred._value = value
+        deferred._done.set()
+        return deferred
+
+    def _start(self):
+        _running.add(self)
+        threading.Thread(target=self._run, name=self._name, daemon=True).start()
+
+    def _run(self):
+        done = self._done
+        try:
+            value, error = self._compute(), None
+        except BaseException as exception:
+            value, error = None, exception
+        if done is self._done:
+            # Not restarted by a fork in the meantime
+            self._value, self._error = value, error
+            _running.discard(self)
+            done.set()
+
+    def _restart_after_fork(self):
+        self._done = threading.Event()
+        self._start()
+
+    def ready(self):
+        """
+        Whether the value (or its error) is available.
+        """
+        return self._done.is_set()
+
+    def get(self):
+        """
+        Return the value, waiting for it; re-raise the error if computing it failed.
+        """
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+def _restart_all_after_fork():
+    for deferred in list(_running):
+        if not deferred.ready():
+            deferred._restart_after_fork()
+
+
+os.register_at_fork(after_in_child=_restart_all_after_fork)
@@ -0,0 +1,91 @@
+# export.py
+import io
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+# Rows converted and sent at a time, which bounds the memory of an export
+CHUNK_ROWS = 64 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file collecting what a pyarrow writer wrote since the last `drain`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _write_chunks(writer, sink, tables):
+    with writer:
+        for table in tables:
+            writer.write_table(table)
+            yield sink.drain()
+    yield sink.drain()
+
+
+# Export formats: (media type, function of a sink and a schema returning a pyarrow writer)
+EXPORT_FORMATS = {
+    # Strings are always quoted, and whole floats written without decimals (4.0 as 4)
+    "csv": ("text/csv", pa_csv.CSVWriter),
+    # A row group per chunk
+    "parquet": ("application/vnd.apache.parquet",
+                lambda sink, schema: pq.ParquetWriter(sink, schema, compression="snappy")),
+    "arrow": ("application/vnd.apache.arrow.stream", pa.ipc.new_stream),
+}
+
+
+def export_rows(df, positions, file_format, columns=None, chunk_rows=CHUNK_ROWS):
+    """
+    Write rows of a DataFrame in an export format, chunk by chunk.
+
+    Only `chunk_rows` rows of the exported columns are copied and converted
+    at a time, so exporting millions of rows never holds a copy of the
+    selection, and the first bytes are ready as soon as the first chunk is
+    written. The files are written by pyarrow.
+
+    Parameters:
+    df (pd.DataFrame): The app table.
+    positions (np.ndarray): Row positions to export, in order.
+    file_format (str): One of EXPORT_FORMATS: CSV with a header, a Parquet file
+                       or an Arrow IPC stream.
+    columns (list, optional): Columns to export, by default all of them.
+    chunk_rows (int): Number of rows per chunk.
+
+    Returns:
+    Iterator[bytes]: The successive parts of the file, e.g. the body of a streamed response.
+    """
+    _, make_writer = EXPORT_FORMATS[file_format]
+    columns = list(columns or df.columns)
+    schema = pa.Schema.from_pandas(df.iloc[:0][columns], preserve_index=False)
+    # Without rows, the type of object columns is unknown: they hold strings (e.g. 'App')
+    for index, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(index, field.with_type(pa.string()))
+
+    # An empty selection is one empty chunk: a CSV header, a file without rows
+    tables = (pa.Table.from_arrays([pa.Array.from_pandas(df[column].take(rows), type=field.type)
+                                    for column, field in zip(columns, schema)], schema=schema)
+              for rows in (positions[start:start + chunk_rows]
+                           for start in range(0, max(len(positions), 1), chunk_rows)))
+    sink = _ChunkSink()
+    return _write_chunks(make_writer(sink, schema), sink, tables)
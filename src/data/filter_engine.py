@@ -0,0 +1,175 @@
+# filter_engine.py
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+
+class FilterEngine:
+    """
+    Columnar filter engine built once over the app table.
+
+    The engine keeps a packed bitmap per distinct value of the 'Type',
+    'Content Rating' and 'Category' columns, and a sorted index on 'Rating'.
+    A filter is then a few bitmap ORs/ANDs plus a binary-searched rating
+    range, and the result is an array of row positions rather than a copy
+    of the DataFrame.
+
+    Parameters:
+    df (pd.DataFrame): The DataFrame to index. It is not copied; the engine
+                       only keeps the bitmaps and the rating index.
+
+    Example:
+        engine = FilterEngine(df)
+        positions = engine.query(["Free"], [4, 5], ["All"], ["GAME", "SOCIAL"])
+        filtered_df = df.take(positions)
+    """
+
+    INDEXED_COLUMNS = ("Type", "Content Rating", "Category")
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.bitmaps = {column: self._build_bitmaps(df[column]) for column in self.INDEXED_COLUMNS}
+        self.nullable_columns = {column for column in self.INDEXED_COLUMNS if df[column].isna().any()}
+        # Positions are stored in caches, so keep them as small as the table allows
+        self.position_dtype = np.int32 if self.n_rows < 2**31 else np.int64
+
+        ratings = df["Rating"].to_numpy(dtype="float64")
+        # NaN ratings sort to the end and never fall inside a searched range,
+        # which matches the `>=`/`<=` comparisons of the mask path.
+        self.rating_order = np.argsort(ratings, kind="stable")
+        self.sorted_ratings = ratings[self.rating_order]
+
+    def _build_bitmaps(self, column):
+        """
+        Build one packed bitmap per distinct non-null value of a column.
+
+        Parameters:
+        column (pd.Series): The column to index.
+
+        Returns:
+        dict: Mapping of value to a packed (np.packbits) uint8 bitmap.
+        """
+        codes, uniques = pd.factorize(column, sort=False)
+        return {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+
+    def _column_bitmap(self, column, values):
+        """
+        OR together the bitmaps of the selected values of one column.
+
+        Parameters:
+        column (str): One of INDEXED_COLUMNS.
+        values (list): Selected values. Values absent from the table match no rows.
+
+        Returns:
+        np.ndarray: Packed uint8 bitmap of the rows matching any of the values.
+        """
+        bitmaps = self.bitmaps[column]
+        empty = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        selected = [bitmaps[value] for value in set(values) if value in bitmaps]
+        if not selected:
+            return empty
+        return reduce(np.bitwise_or, selected, empty)
+
+    def rating_positions(self, min_rating, max_rating):
+        """
+        Binary-search the sorted rating index for a closed rating range.
+
+        Parameters:
+        min_rating (float): Lower bound (inclusive).
+        max_rating (float): Upper bound (inclusive).
+
+        Returns:
+        np.ndarray: Unsorted row positions whose rating is within the range.
+        """
+        lo = np.searchsorted(self.sorted_ratings, min_rating, side="left")
+        hi = np.searchsorted(self.sorted_ratings, max_rating, side="right")
+        return self.rating_order[lo:hi]
+
+    def _normalize_selection(self, column, values):
+        if values is None or "All" in values:
+            # "All" also keeps null rows, so it only equals the full value list without nulls
+            values = list(self.bitmaps[column])
+            if column in self.nullable_columns:
+                return tuple(sorted(values)) + (None,)
+        return tuple(sorted(value for value in set(values) if value in self.bitmaps[column]))
+
+    def normalize(self, selected_types, rating_range, selected_ratings, selected_categories):
+        """
+        Build a canonical, hashable key for a filter state.
+
+        Selections are de-duplicated and sorted, "All" is expanded to every
+        value of the column, values absent from the table are dropped and the
+        rating range is replaced by the span of the sorted rating index it
+        covers. Filter states with equal keys therefore select the same rows.
+
+        Parameters:
+        selected_types (list): Selected app types.
+        rating_range (list): [min_rating, max_rating], inclusive.
+        selected_ratings (list): Selected content ratings.
+        selected_categories (list): Selected categories.
+
+        Returns:
+        tuple: (types, (lo, hi), content ratings, categories).
+        """
+        min_rating, max_rating = rating_range
+        lo = int(np.searchsorted(self.sorted_ratings, min_rating, side="left"))
+        hi = int(np.searchsorted(self.sorted_ratings, max_rating, side="right"))
+        return (
+            self._normalize_selection("Type", selected_types),
+            (lo, max(lo, hi)),
+            self._normalize_selection("Content Rating", selected_ratings),
+            self._normalize_selection("Category", selected_categories),
+        )
+
+    def query(self, selected_types, rating_range, selected_ratings, selected_categories):
+        """
+        Return the positions of the rows matching the given filters.
+
+        A selection containing "All" (or None) leaves that column
+        unconstrained, including rows where the column is null.
+
+        Parameters:
+        selected_types (list): Selected app types.
+        rating_range (list): [min_rating, max_rating], inclusive.
+        selected_ratings (list): Selected content ratings.
+        selected_categories (list): Selected categories.
+
+        Returns:
+        np.ndarray: Ascending row positions, suitable for `df.take`. They are
+                    int32 unless the table has 2**31 rows or more.
+        """
+        selections = zip(self.INDEXED_COLUMNS, (selected_types, selected_ratings, selected_categories))
+        column_bitmaps = [
+            self._column_bitmap(column, values)
+            for column, values in selections
+            if values is not None and "All" not in values
+        ]
+
+        if column_bitmaps:
+            packed = reduce(np.bitwise_and, column_bitmaps)
+            mask = np.unpackbits(packed, count=self.n_rows).view(bool)
+        else:
+            mask = None
+
+        min_rating, max_rating = rating_range
+        candidates = self.rating_positions(min_rating, max_rating)
+
+        if len(candidates) == self.n_rows:
+            # The rating range does not exclude anything
+            if mask is None:
+                return np.arange(self.n_rows, dtype=self.position_dtype)
+            return np.flatnonzero(mask).astype(self.position_dtype)
+
+        if len(candidates) * 8 < self.n_rows:
+            # Narrow range: gather the bitmap at the candidates and sort the survivors
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            return np.sort(candidates).astype(self.position_dtype)
+
+        # Wide range: scatter it into a row mask, which avoids sorting most of the table
+        in_range = np.zeros(self.n_rows, dtype=bool)
+        in_range[candidates] = True
+        if mask is not None:
+            in_range &= mask
+        return np.flatnonzero(in_range).astype(self.position_dtype)
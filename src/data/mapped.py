@@ -0,0 +1,65 @@
+# mapped.py
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+# File extensions load_data reads as memory-mapped Arrow IPC files
+MAPPED_EXTENSIONS = (".arrow", ".feather")
+
+
+def write_mapped_dataset(df, path):
+    """
+    Write the app table as an uncompressed Arrow IPC (Feather v2) file.
+
+    The file is meant to be written once and memory-mapped by every worker, so
+    it is stored exactly as the workers use it: categorical columns as Arrow
+    dictionaries and no compression, which would force each worker to decode
+    its own copy. It is written next to the target and renamed into place, so
+    running workers never map a partial file.
+
+    Parameters:
+    df (pd.DataFrame): The app table, typically from `compact_dataframe`.
+    path (str): Path of the file to write.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partial_path = path + ".partial"
+    with pa.OSFile(partial_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(partial_path, path)
+
+
+def read_mapped_dataset(path, columns=None):
+    """
+    Memory-map an Arrow IPC file as a DataFrame without copying its columns.
+
+    Numeric columns become numpy arrays viewing the mapped pages and string
+    columns are backed by the mapped Arrow buffers (pd.ArrowDtype), so workers
+    mapping the same file share one physical copy through the page cache and
+    start without parsing anything. Dictionary columns become categoricals,
+    which only copies their small integer codes.
+
+    Parameters:
+    path (str): Path of a file written by `write_mapped_dataset`.
+    columns (list, optional): Only expose these columns.
+
+    Returns:
+    pd.DataFrame: The mapped table. Its arrays are read-only.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    string_types = {pa.string(): pd.ArrowDtype(pa.string()), pa.large_string(): pd.ArrowDtype(pa.large_string())}
+    return table.to_pandas(split_blocks=True, types_mapper=string_types.get)
+
+
+if __name__ == "__main__":
+    from src.data.data_import import compact_dataframe, load_data
+
+    parser = argparse.ArgumentParser(description="Write the compacted app table as a memory-mappable Arrow file.")
+    parser.add_argument("source", nargs="?", default="data/preprocessed/clean_data_score.parquet")
+    parser.add_argument("target", nargs="?", default="data/preprocessed/clean_data_score.arrow")
+    args = parser.parse_args()
+    write_mapped_dataset(compact_dataframe(load_data(args.source)), args.target)
+    print(f"Memory-mappable dataset saved to {args.target}")
@@ -0,0 +1,137 @@
+# metadata.py
+import argparse
+import json
+import os
+
+from src.components.get_summary_stats import get_summary_stats
+from src.data.data_import import (DASHBOARD_COLUMNS, dataset_version, file_fingerprint,
+                                  get_dropdown_options, load_data)
+
+# Columns with a dropdown filter in the layout
+FILTER_COLUMNS = ("Category", "Type", "Content Rating")
+
+
+def metadata_path(data_path):
+    """
+    Path of the metadata sidecar of a dataset: next to the data file or dataset directory.
+    """
+    return data_path.rstrip("/" + os.sep) + ".meta.json"
+
+
+def build_metadata(df, data_path=None):
+    """
+    Summarize what the layout needs from a dataset.
+
+    Parameters:
+    df (pd.DataFrame): The app table.
+    data_path (str, optional): The file or directory `df` was loaded from, whose
+                               version and fingerprint identify the data.
+
+    Returns:
+    dict: The dataset version and fingerprint, the row count, the dropdown options
+          of FILTER_COLUMNS and the summary statistics.
+    """
+    return {
+        "version": dataset_version(data_path) if data_path else None,
+        "fingerprint": sidecar_fingerprint(data_path) if data_path else None,
+        "rows": len(df),
+        "options": {column: get_dropdown_options(df, column) for column in FILTER_COLUMNS},
+        "summary": {key: float(value) for key, value in get_summary_stats(df).items()},
+    }
+
+
+def sidecar_fingerprint(data_path):
+    """
+    Cheap identity of a dataset recorded in its sidecars: the size of every
+    data file, by path within the dataset.
+
+    Unlike `file_fingerprint`, it leaves out modification times and where the
+    dataset is, which a checkout or a copy change, so sidecars committed with
+    the data stay valid without hashing it.
+
+    Returns:
+    list or None: [path, size in bytes] of every data file, or None if the dataset is missing.
+    """
+    fingerprint = file_fingerprint(data_path)
+    if fingerprint is None:
+        return None
+    base = data_path if os.path.isdir(data_path) else os.path.dirname(data_path)
+    return [[os.path.relpath(path, base), size] for path, size, _ in fingerprint]
+
+
+def write_sidecar(path, content):
+    """
+    Write a JSON sidecar file atomically, so readers never see a partial file.
+    """
+    partial_path = path + ".partial"
+    with open(partial_path, "w") as file:
+        json.dump(content, file, indent=2)
+    os.replace(partial_path, path)
+    return path
+
+
+def read_sidecar(path, data_path, version=None):
+    """
+    Read a JSON sidecar file, if it describes the data on disk.
+
+    Without `version`, the sidecar is trusted when the data files have the
+    sizes it recorded, so reading it never hashes the data: an edit keeping
+    the sizes goes unnoticed until the recorded version is compared with
+    the content hash, once known (see `src.app.check_layout_version`).
+
+    Parameters:
+    path (str): The sidecar file.
+    data_path (str): The data file or dataset directory it describes.
+    version (str, optional): The content hash of the data, if known, compared
+                             with the recorded version instead of the sizes.
+
+    Returns:
+    dict or None: The content, or None if the sidecar is missing, unreadable or stale.
+    """
+    try:
+        with open(path) as file:
+            content = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if version is not None:
+        return content if content.get("version") == version else None
+    fingerprint = sidecar_fingerprint(data_path)
+    return content if fingerprint is not None and content.get("fingerprint") == fingerprint else None
+
+
+def write_metadata(data_path, df=None):
+    """
+    Write the metadata sidecar of a dataset, atomically.
+
+    Parameters:
+    data_path (str): The data file or dataset directory.
+    df (pd.DataFrame, optional): The table stored at `data_path`, if already in memory.
+
+    Returns:
+    str: The path of the sidecar.
+    """
+    if df is None:
+        df = load_data(data_path, columns=DASHBOARD_COLUMNS)
+    return write_sidecar(metadata_path(data_path), build_metadata(df, data_path))
+
+
+def read_metadata(data_path, version=None):
+    """
+    Read the metadata sidecar of a dataset, if it describes the data on disk.
+
+    Parameters:
+    data_path (str): The data file or dataset directory.
+    version (str, optional): The content hash of the data, if known (see `read_sidecar`).
+
+    Returns:
+    dict or None: The metadata, or None if the sidecar is missing, unreadable or stale.
+    """
+    return read_sidecar(metadata_path(data_path), data_path, version)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the metadata sidecar used by the fast-start layout.")
+    parser.add_argument("data", nargs="?", default="data/preprocessed/clean_data_score_1000.parquet")
+    args = parser.parse_args()
+    print(f"Metadata written to {write_metadata(args.data)}")
@@ -0,0 +1,165 @@
+# partitioned.py
+import argparse
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.data.schema import SCORE_SCHEMA
+
+# Pointer file and statistics written by src/utils/incremental_preprocess.py
+LATEST_FILE = "LATEST"
+STATS_FILE = "_stats.json"
+
+PARTITIONING = ds.partitioning(pa.schema([("Category", pa.string())]), flavor="hive")
+
+
+def write_partitioned_dataset(df, base_dir, row_group_size=64 * 1024):
+    """
+    Write the app table as a Hive-partitioned parquet dataset, one directory per Category.
+
+    Rows are sorted by 'Rating' within each partition, so the min/max statistics
+    parquet keeps for every row group let rating predicates skip row groups.
+
+    Parameters:
+    df (pd.DataFrame): The app table, with a 'Category' column.
+    base_dir (str): Directory of the dataset. Existing partitions are replaced.
+    row_group_size (int): Maximum number of rows per row group.
+    """
+    table = pa.Table.from_pandas(df.sort_values(["Category", "Rating"]), preserve_index=False)
+    ds.write_dataset(
+        table,
+        base_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024),
+        file_options=ds.ParquetFileFormat().make_write_options(compression="snappy", write_statistics=True),
+        existing_data_behavior="delete_matching",
+    )
+
+
+def resolve_dataset_dir(path):
+    """
+    Resolve a dataset directory, following the LATEST pointer of a versions directory.
+
+    Parameters:
+    path (str): A partitioned dataset directory, or a directory of versions
+                written by incremental preprocessing.
+
+    Returns:
+    tuple: (dataset directory, version statistics or None)
+    """
+    latest = os.path.join(path, LATEST_FILE)
+    if not os.path.exists(latest):
+        return path, None
+    with open(latest) as file:
+        version_dir = os.path.join(path, file.read().strip())
+    with open(os.path.join(version_dir, STATS_FILE)) as file:
+        return version_dir, json.load(file)
+
+
+def filter_expression(types=None, rating_range=None, content_ratings=None, categories=None):
+    """
+    Build a pyarrow predicate from a dashboard filter state.
+
+    A selection that is None or contains "All" adds no predicate.
+
+    Parameters:
+    types (list, optional): Selected app types.
+    rating_range (list, optional): [min_rating, max_rating], inclusive.
+    content_ratings (list, optional): Selected content ratings.
+    categories (list, optional): Selected categories.
+
+    Returns:
+    pyarrow.dataset.Expression or None: The conjunction of the predicates.
+    """
+    predicates = [
+        ds.field(column).isin(values)
+        for column, values in (("Type", types), ("Content Rating", content_ratings), ("Category", categories))
+        if values is not None and "All" not in values
+    ]
+    if rating_range is not None:
+        min_rating, max_rating = rating_range
+        predicates.append((ds.field("Rating") >= min_rating) & (ds.field("Rating") <= max_rating))
+
+    expression = None
+    for predicate in predicates:
+        expression = predicate if expression is None else expression & predicate
+    return expression
+
+
+def query_dataset(path, columns=None, filter=None):
+    """
+    Read a partitioned dataset, pushing projection and predicates down to pyarrow.
+
+    Only the requested columns are decoded. Category predicates prune whole
+    partitions and Rating predicates skip row groups using their statistics.
+    For a versions directory, the latest version is read, restricted to its top
+    categories and scored columns (the table the dashboard shows).
+
+    Parameters:
+    path (str): A dataset directory or a versions directory.
+    columns (list, optional): Columns to read. Defaults to every column not starting with "_".
+    filter (pyarrow.dataset.Expression, optional): Predicate, e.g. from `filter_expression`.
+
+    Returns:
+    pd.DataFrame: The matching rows.
+
+    Example:
+        df = query_dataset("data/preprocessed/clean_data_score_dataset",
+                           columns=["App", "Category", "Rating"],
+                           filter=filter_expression(categories=["GAME"], rating_range=[4, 5]))
+    """
+    dataset_dir, stats = resolve_dataset_dir(path)
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning=PARTITIONING)
+
+    if stats is not None:
+        top_categories = ds.field("Category").isin(stats["top_categories"])
+        filter = top_categories if filter is None else filter & top_categories
+
+    if columns is None and stats is not None:
+        columns = SCORE_SCHEMA.names
+    elif columns is None:
+        # Keep the stored column order, with the partition column in second position like the flat files
+        names = [name for name in dataset.schema.names if not name.startswith("_") and name != "Category"]
+        columns = names[:1] + ["Category"] + names[1:]
+
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+
+def count_scanned_fragments(path, filter=None):
+    """
+    Count the files and row groups a predicate leaves to scan, to check pushdown.
+
+    Parameters:
+    path (str): A dataset directory or a versions directory.
+    filter (pyarrow.dataset.Expression, optional): The predicate.
+
+    Returns:
+    tuple: (files scanned, total files, row groups scanned, total row groups)
+    """
+    dataset_dir, _ = resolve_dataset_dir(path)
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning=PARTITIONING)
+    all_fragments = list(dataset.get_fragments())
+    fragments = list(dataset.get_fragments(filter=filter)) if filter is not None else all_fragments
+
+    def row_groups(fragment):
+        return fragment.subset(filter, schema=dataset.schema).num_row_groups if filter is not None else fragment.num_row_groups
+
+    return (len(fragments), len(all_fragments),
+            sum(row_groups(fragment) for fragment in fragments),
+            sum(fragment.num_row_groups for fragment in all_fragments))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a flat parquet/CSV table into a Category-partitioned dataset.")
+    parser.add_argument("source", nargs="?", default="data/preprocessed/clean_data_score.parquet")
+    parser.add_argument("target", nargs="?", default="data/preprocessed/clean_data_score_dataset")
+    parser.add_argument("--row-group-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+    source = pd.read_csv(args.source) if args.source.endswith(".csv") else pd.read_parquet(args.source)
+    write_partitioned_dataset(source, args.target, args.row_group_size)
+    print(f"Partitioned dataset saved to {args.target}")
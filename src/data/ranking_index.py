@@ -0,0 +1,209 @@
+# ranking_index.py
+import heapq
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+
+class RankingIndex:
+    """
+    Per-category ranked indexes for the top-N queries of the dashboard.
+
+    For every category, the row positions are kept sorted by 'popularity_score'
+    and by 'Installs' (descending, ties by position). A top-K query over a
+    filter result scans each selected category from the top, skipping rows
+    outside the filter, and merges the C per-category streams with a heap,
+    so it reads about K rows per category instead of sorting the filtered
+    table.
+
+    - `top_rows` returns the K rows with the highest value of a column, as
+      `df.sort_values(column, ascending=False, kind="stable").head(K)` does.
+    - `top_apps` returns the K apps with the highest total installs, as
+      `df.groupby("App")["Installs"].sum()` followed by a stable sort does.
+      Apps can have several rows, so the scan stops once the K-th best exact
+      total exceeds the largest total an app not seen yet could reach: the
+      next unscanned installs value times the most rows any app has.
+
+    Parameters:
+    df (pd.DataFrame): The DataFrame to index, the same one the FilterEngine
+                       positions refer to. It is not copied.
+
+    Example:
+        index = RankingIndex(df)
+        positions = engine.query(["Free"], [4, 5], ["All"], ["GAME", "SOCIAL"])
+        top_rows = df.take(index.top_rows(positions, ["GAME", "SOCIAL"], "popularity_score", 50))
+        top_apps = index.top_apps(positions, ["GAME", "SOCIAL"], 10)
+    """
+
+    RANKED_COLUMNS = ("popularity_score", "Installs")
+
+    # Filter results up to this size, or keeping under 1/DIRECT_FRACTION of the rows, are
+    # ranked directly: scanning would mostly read rows outside the filter
+    DIRECT_LIMIT = 4096
+    DIRECT_FRACTION = 64
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        # Ascending sort keys of each ranked column: the negated values, with NaN last as in pandas
+        self.keys = {}
+        for column in self.RANKED_COLUMNS:
+            values = df[column].to_numpy(dtype="float64")
+            self.keys[column] = np.where(np.isnan(values), np.inf, -values)
+        self.installs = df["Installs"].to_numpy(dtype="int64")
+
+        # Apps as codes in name order (-1 for a missing name, never ranked, as in groupby),
+        # with the positions of each app grouped together
+        self.app_codes, self.app_names = pd.factorize(df["App"], sort=True)
+        self.app_order = np.argsort(self.app_codes, kind="stable")
+        self.app_starts = np.searchsorted(self.app_codes[self.app_order], np.arange(len(self.app_names) + 1))
+        self.max_app_rows = int(np.diff(self.app_starts).max()) if len(self.app_names) else 0
+
+        # Rows tie by position for `top_rows`, and by app name for the installs scan of `top_apps`
+        category_codes, self.categories = pd.factorize(df["Category"], use_na_sentinel=False)
+        self.ranked = {column: self._rank_by_category(category_codes, self.keys[column], np.arange(self.n_rows))
+                       for column in self.RANKED_COLUMNS}
+        self.ranked_installs = self._rank_by_category(category_codes, self.keys["Installs"], self.app_codes)
+
+    def _rank_by_category(self, category_codes, keys, ties):
+        """
+        Sort the row positions of each category by ascending key.
+
+        Parameters:
+        category_codes (np.ndarray): Category code of every row.
+        keys (np.ndarray): Sort key of every row.
+        ties (np.ndarray): Secondary sort key of every row.
+
+        Returns:
+        dict: Mapping of category to an array of row positions.
+        """
+        order = np.lexsort((ties, keys, category_codes))
+        bounds = np.searchsorted(category_codes[order], np.arange(len(self.categories) + 1))
+        # Null categories are keyed None, like in FilterEngine.normalize
+        return {None if pd.isna(category) else category: order[bounds[code]:bounds[code + 1]]
+                for code, category in enumerate(self.categories)}
+
+    def _rank_directly(self, positions):
+        return len(positions) <= max(self.DIRECT_LIMIT, self.n_rows // self.DIRECT_FRACTION)
+
+    def _mask(self, positions):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        return mask
+
+    def _scan(self, ranked, mask, start, size):
+        """
+        Read the next block of a ranked category and keep the rows inside the filter.
+
+        Returns:
+        tuple: (row positions within the filter, position of the next block)
+        """
+        block = ranked[start:start + size]
+        return block[mask[block]], start + len(block)
+
+    def top_rows(self, positions, categories, column, k):
+        """
+        Positions of the K rows of a filter result with the highest value of a column.
+
+        Parameters:
+        positions (np.ndarray): Row positions of the filter result, e.g. from FilterEngine.query.
+        categories (iterable): The categories the filter selects. Categories outside it can be
+                               listed; their rows are skipped.
+        column (str): One of RANKED_COLUMNS.
+        k (int): Number of rows.
+
+        Returns:
+        np.ndarray: Up to K row positions, in descending order of the column.
+        """
+        keys = self.keys[column]
+        if self._rank_directly(positions):
+            return positions[np.lexsort((positions, keys[positions]))][:k]
+
+        mask = self._mask(positions)
+        streams = []
+        for category in set(categories):
+            ranked = self.ranked[column].get(category)
+            if ranked is None:
+                continue
+            found, start, size = [], 0, 4 * k
+            while sum(map(len, found)) < k and start < len(ranked):
+                rows, start = self._scan(ranked, mask, start, size)
+                found.append(rows)
+                size *= 2
+            top = np.concatenate(found)[:k] if found else np.empty(0, dtype=np.intp)
+            streams.append(zip(keys[top].tolist(), top.tolist()))
+
+        merged = [position for _, position in islice(heapq.merge(*streams), k)]
+        return np.array(merged, dtype=positions.dtype)
+
+    def ranked_rows(self, positions, column):
+        """
+        Every position of a filter result, by descending value of a column.
+
+        Parameters:
+        positions (np.ndarray): Row positions of the filter result.
+        column (str): One of RANKED_COLUMNS.
+
+        Returns:
+        np.ndarray: The positions in the order of
+                    `df.sort_values(column, ascending=False, kind="stable")`.
+        """
+        return positions[np.lexsort((positions, self.keys[column][positions]))]
+
+    def _direct_top_apps(self, positions, k):
+        positions = positions[self.app_codes[positions] >= 0]
+        codes, inverse = np.unique(self.app_codes[positions], return_inverse=True)
+        totals = np.bincount(inverse, weights=self.installs[positions]).astype("int64")
+        order = np.lexsort((codes, -totals))[:k]
+        return [(self.app_names[code], int(total)) for code, total in zip(codes[order], totals[order])]
+
+    def _app_total(self, code, mask):
+        rows = self.app_order[self.app_starts[code]:self.app_starts[code + 1]]
+        return int(self.installs[rows[mask[rows]]].sum())
+
+    def top_apps(self, positions, categories, k):
+        """
+        The K apps of a filter result with the highest total installs.
+
+        Parameters:
+        positions (np.ndarray): Row positions of the filter result.
+        categories (iterable): The categories the filter selects.
+        k (int): Number of apps.
+
+        Returns:
+        list: Up to K (app, total installs) pairs, by descending total, ties by app name.
+        """
+        if self._rank_directly(positions):
+            return self._direct_top_apps(positions, k)
+
+        mask = self._mask(positions)
+        cursors = {category: 0 for category in set(categories) if category in self.ranked_installs}
+        totals = {}
+        size = 4 * k
+        while cursors:
+            for category, start in list(cursors.items()):
+                ranked = self.ranked_installs[category]
+                rows, cursors[category] = self._scan(ranked, mask, start, size)
+                for code in np.unique(self.app_codes[rows]).tolist():
+                    if code >= 0 and code not in totals:
+                        totals[code] = self._app_total(code, mask)
+                if cursors[category] >= len(ranked):
+                    del cursors[category]
+
+            if len(totals) > self.DIRECT_LIMIT:
+                # Many apps tie near the top (e.g. one app repeated in many rows): rank them all
+                return self._direct_top_apps(positions, k)
+            if len(totals) >= k and cursors:
+                kth_code, kth_total = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[k - 1]
+                heads = [self.ranked_installs[category][start] for category, start in cursors.items()]
+                head_installs = max(self.installs[row] for row in heads)
+                # An app without a scanned row totals at most `bound`, and only reaches it with
+                # rows all equal to `head_installs`, ranked after a head of no smaller app name
+                bound = self.max_app_rows * head_installs
+                tie_code = min(self.app_codes[row] for row in heads if self.installs[row] == head_installs)
+                if kth_total > bound or (kth_total == bound and kth_code < tie_code):
+                    break
+            size *= 2
+
+        ranking = sorted(totals.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(self.app_names[code], total) for code, total in ranking]
@@ -0,0 +1,199 @@
+# registry.py
+import os
+import threading
+import time
+import weakref
+from types import SimpleNamespace
+
+from src.data.aggregate_cube import AggregateCube
+from src.data.data_import import dataset_version, file_fingerprint
+from src.data.deferred import Deferred
+from src.data.filter_engine import FilterEngine
+from src.data.ranking_index import RankingIndex
+
+# Registries with a watcher thread, restarted in the child after a fork
+_watching = weakref.WeakSet()
+
+
+def prepare_dataset(df):
+    """
+    Build the bitmap, rating and ranking indexes and the aggregate cube of a dataset.
+
+    Parameters:
+    df (pd.DataFrame): The DataFrame containing the data.
+
+    Returns:
+    SimpleNamespace: `df`, `filter_engine`, `ranking_index` and `aggregate_cube`.
+    """
+    return SimpleNamespace(df=df,
+                           filter_engine=FilterEngine(df),
+                           ranking_index=RankingIndex(df),
+                           aggregate_cube=AggregateCube(df))
+
+
+class DatasetVersion:
+    """
+    One version of the dataset, with its indexes.
+
+    Parameters:
+    version (str or Deferred): Content hash of the data (`dataset_version`), which keys cached results.
+    data (Deferred): The prepared dataset (see `prepare_dataset`).
+    fingerprint (tuple, optional): The `file_fingerprint` of the files it was loaded from.
+    """
+
+    def __init__(self, version, data, fingerprint=None):
+        self._version = version if isinstance(version, Deferred) else Deferred.of(version)
+        self.data = data
+        self.fingerprint = fingerprint
+
+    @property
+    def version(self):
+        """
+        The content hash of the data, waiting for it if it is still being computed.
+        """
+        return self._version.get()
+
+    def get(self):
+        """
+        Return the prepared dataset, waiting for it if it is still being loaded.
+        """
+        return self.data.get()
+
+
+class DatasetRegistry:
+    """
+    The dataset served by the callbacks, replaced atomically when the data on disk changes.
+
+    A callback takes `current()` once and uses that version throughout, so a
+    request never mixes two versions. With `interval` > 0, a watcher thread
+    polls the fingerprint of `data_path` (following the LATEST pointer of a
+    versions directory). Once it changed and stayed the same for a whole
+    interval (the writer is done), the thread loads and prepares the new
+    version and hands it to the `on_load` listeners (e.g. to warm caches or
+    build a layout); only then does it become current, and the `on_swap`
+    listeners receive the old and new versions (e.g. to drop the results of
+    the old one). Requests keep being served by the old version meanwhile;
+    a version that fails to load is reported and the old one kept.
+
+    Parameters:
+    df (pd.DataFrame, optional): The initial data; None loads `data_path` with
+                                 `load` in a background thread.
+    data_path (str, optional): The data file or dataset directory.
+    load (callable, optional): Function of a path returning the DataFrame,
+                               needed to load in the background or to reload.
+    interval (float): Seconds between polls of `data_path`; 0 never reloads.
+    """
+
+    def __init__(self, df=None, data_path=None, load=None, interval=0):
+        self.data_path = data_path
+        self.load = load
+        self.interval = interval
+        self._on_load = []
+        self._on_swap = []
+        self._failed = None
+        self.reloads = 0
+
+        # The content hash reads the whole data: computed in the background, like the load
+        fingerprint = file_fingerprint(data_path) if data_path else None
+        version = Deferred(lambda: dataset_version(data_path), name="dataset-version") if data_path else "in-memory"
+        if df is None:
+            data = Deferred(lambda: prepare_dataset(load(data_path)), name="load-data")
+        else:
+            data = Deferred.of(prepare_dataset(df))
+        self._current = DatasetVersion(version, data, fingerprint)
+        self._seen = fingerprint
+
+    @property
+    def watching(self):
+        """
+        Whether the registry follows the data on disk.
+        """
+        return self.interval > 0 and self.data_path is not None and self.load is not None
+
+    def current(self):
+        """
+        The version currently served.
+        """
+        return self._current
+
+    def on_load(self, listener):
+        """
+        Call `listener(new)` with every loaded version, before it becomes current.
+        """
+        self._on_load.append(listener)
+
+    def on_swap(self, listener):
+        """
+        Call `listener(old, new)` every time a new version became current.
+        """
+        self._on_swap.append(listener)
+
+    def start(self):
+        """
+        Start the watcher thread, if the registry follows the data on disk.
+        """
+        if self.watching:
+            _watching.add(self)
+            threading.Thread(target=self._watch, name="dataset-watcher", daemon=True).start()
+        return self
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as error:
+                print(f"Dataset watcher: {error!r}", flush=True)
+
+    def poll(self):
+        """
+        Check the data on disk once, and switch to a new version if it changed and is complete.
+
+        Returns:
+        bool: Whether a new version became current.
+        """
+        fingerprint = file_fingerprint(self.data_path)
+        previous, self._seen = self._seen, fingerprint
+        current = self._current
+        if fingerprint is None or fingerprint == current.fingerprint or fingerprint == self._failed:
+            return False
+        if fingerprint != previous:
+            # Still being written, or just written: wait for it to settle
+            return False
+
+        version = dataset_version(self.data_path)
+        if version == current.version:
+            # Same content (e.g. the file was copied or touched)
+            current.fingerprint = fingerprint
+            return False
+
+        start = time.perf_counter()
+        try:
+            new = DatasetVersion(version, Deferred.of(prepare_dataset(self.load(self.data_path))), fingerprint)
+            if file_fingerprint(self.data_path) != fingerprint:
+                # Replaced again while loading: the next polls pick up the newest data
+                return False
+            for listener in self._on_load:
+                listener(new)
+        except Exception as error:
+            self._failed = fingerprint
+            print(f"Dataset version {version} of {self.data_path} not loaded, "
+                  f"still serving {current.version}: {error!r}", flush=True)
+            return False
+
+        # A single assignment: every request sees either the old or the new version
+        self._current = new
+        self.reloads += 1
+        for listener in self._on_swap:
+            listener(current, new)
+        print(f"Dataset reloaded: version {current.version} replaced by {version} "
+              f"in {time.perf_counter() - start:.1f} s", flush=True)
+        return True
+
+
+def _restart_watchers_after_fork():
+    for registry in list(_watching):
+        threading.Thread(target=registry._watch, name="dataset-watcher", daemon=True).start()
+
+
+os.register_at_fork(after_in_child=_restart_watchers_after_fork)
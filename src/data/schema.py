@@ -0,0 +1,31 @@
+# schema.py
+import pyarrow as pa
+
+# Columns of data/raw/googleplaystore.csv dropped during cleaning
+DROPPED_RAW_COLUMNS = ["Current Ver", "Last Updated", "Android Ver"]
+
+# Columns of the cleaned table that are not kept in the scored dataset
+UNSCORED_COLUMNS = ["Size", "Price", "Genres"]
+
+# Output of the cleaning step (clean_data), in column order
+CLEAN_SCHEMA = pa.schema([
+    ("App", pa.string()),
+    ("Category", pa.string()),
+    ("Rating", pa.float64()),
+    ("Reviews", pa.int64()),
+    ("Size", pa.string()),
+    ("Installs", pa.int64()),
+    ("Type", pa.string()),
+    ("Price", pa.string()),
+    ("Content Rating", pa.string()),
+    ("Genres", pa.string()),
+    ("Reviews_log", pa.float64()),
+    ("Installs_log", pa.float64()),
+    ("Rating_normalized", pa.float64()),
+    ("Reviews_normalized", pa.float64()),
+    ("Installs_normalized", pa.float64()),
+    ("popularity_score", pa.float64()),
+])
+
+# Dataset served by the dashboard (clean_data_score), in column order
+SCORE_SCHEMA = pa.schema([field for field in CLEAN_SCHEMA if field.name not in UNSCORED_COLUMNS])
@@ -0,0 +1,158 @@
+# scoring.py
+import argparse
+import os
+
+import numpy as np
+
+from src.data.data_import import dataset_version, load_data
+from src.data.metadata import read_sidecar, sidecar_fingerprint, write_sidecar
+
+# Min-max bounds popularity_score is normalized with, as computed by the preprocessing steps
+STAT_KEYS = ("rating_min", "rating_max", "reviews_log_min", "reviews_log_max",
+             "installs_log_min", "installs_log_max")
+
+
+def score_stats_path(data_path):
+    """
+    Path of the scoring statistics of a dataset: next to the data file or dataset directory.
+    """
+    return data_path.rstrip("/" + os.sep) + ".score.json"
+
+
+class PopularityScorer:
+    """
+    Compute popularity_score: the average of min-max normalized Rating,
+    log1p(Reviews) and log1p(Installs), rounded to 5 decimals.
+
+    The bounds are fitted once, on the whole cleaned dataset, and stored with
+    it (see `write_score_stats`), so rows scored later (a new batch, a list of
+    apps) are on the scale of the stored scores. Scoring works on NumPy arrays,
+    in place on two buffers, without DataFrame columns; the preprocessing
+    steps score with it too, so the scores are identical. Values outside the
+    bounds score outside [0, 1] unless clipped.
+
+    Parameters:
+    stats (dict): The bounds of STAT_KEYS (other keys are ignored), e.g. from
+                  `collect_statistics` or `global_statistics`.
+
+    Example:
+        scorer = read_score_stats("data/preprocessed/clean_data_score.parquet")
+        scores = scorer.score(apps["Rating"], apps["Reviews"], apps["Installs"])
+    """
+
+    def __init__(self, stats):
+        self.stats = {key: float(stats[key]) for key in STAT_KEYS}
+
+    @classmethod
+    def fit(cls, rating, reviews, installs):
+        """
+        Fit the bounds on cleaned columns: the rounded, imputed Rating (NaN are
+        ignored), Reviews and Installs.
+        """
+        rating = np.asarray(rating, dtype="float64")
+        return cls({
+            "rating_min": np.nanmin(rating),
+            "rating_max": np.nanmax(rating),
+            "reviews_log_min": np.log1p(np.min(reviews)),
+            "reviews_log_max": np.log1p(np.max(reviews)),
+            "installs_log_min": np.log1p(np.min(installs)),
+            "installs_log_max": np.log1p(np.max(installs)),
+        })
+
+    def _normalize(self, values, name, out=None):
+        # (values - min) / (max - min) with the bounds of `name`, in `out` when given
+        low, high = self.stats[f"{name}_min"], self.stats[f"{name}_max"]
+        normalized = np.subtract(values, low, out=out)
+        normalized /= high - low
+        return normalized
+
+    def score(self, rating, reviews, installs, clip=False):
+        """
+        Score apps.
+
+        Parameters:
+        rating (array-like): Ratings, rounded to 1 decimal.
+        reviews (array-like): Numbers of reviews.
+        installs (array-like): Numbers of installs.
+        clip (bool): Clip the scores to [0, 1], for values outside the bounds.
+
+        Returns:
+        np.ndarray: The popularity_score of every app, as float64.
+        """
+        score = self._normalize(np.asarray(rating, dtype="float64"), "rating")
+        term = np.log1p(np.asarray(reviews), dtype="float64")
+        score += self._normalize(term, "reviews_log", out=term)
+        np.log1p(np.asarray(installs), out=term, dtype="float64")
+        score += self._normalize(term, "installs_log", out=term)
+        score /= 3
+        if clip:
+            np.clip(score, 0, 1, out=score)
+        return np.round(score, 5, out=score)
+
+    def score_frame(self, df, clip=False):
+        """
+        Score the rows of a DataFrame with 'Rating', 'Reviews' and 'Installs' columns.
+        """
+        return self.score(df["Rating"].to_numpy(), df["Reviews"].to_numpy(), df["Installs"].to_numpy(), clip)
+
+    def features(self, rating, reviews, installs):
+        """
+        The columns of the cleaned dataset (CLEAN_SCHEMA) stored along with
+        popularity_score (see `score`): the logs and the normalized terms it averages.
+
+        Returns:
+        dict: Reviews_log, Installs_log, Rating_normalized, Reviews_normalized
+              and Installs_normalized arrays.
+        """
+        reviews_log = np.log1p(np.asarray(reviews), dtype="float64")
+        installs_log = np.log1p(np.asarray(installs), dtype="float64")
+        return {
+            "Reviews_log": reviews_log,
+            "Installs_log": installs_log,
+            "Rating_normalized": self._normalize(np.asarray(rating, dtype="float64"), "rating"),
+            "Reviews_normalized": self._normalize(reviews_log, "reviews_log"),
+            "Installs_normalized": self._normalize(installs_log, "installs_log"),
+        }
+
+
+def write_score_stats(data_path, scorer):
+    """
+    Write the scoring statistics of a dataset, atomically.
+
+    Parameters:
+    data_path (str): The data file or dataset directory scored with `scorer`.
+    scorer (PopularityScorer): Its scorer.
+
+    Returns:
+    str: The path of the sidecar.
+    """
+    return write_sidecar(score_stats_path(data_path), {
+        "version": dataset_version(data_path),
+        "fingerprint": sidecar_fingerprint(data_path),
+        "stats": scorer.stats,
+    })
+
+
+def read_score_stats(data_path):
+    """
+    Read the scorer of a dataset, if its statistics describe the data on disk.
+
+    Parameters:
+    data_path (str): The data file or dataset directory.
+
+    Returns:
+    PopularityScorer or None: The scorer, or None if the sidecar is missing, unreadable or stale.
+    """
+    content = read_sidecar(score_stats_path(data_path), data_path)
+    return PopularityScorer(content["stats"]) if content is not None else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the scoring statistics of a dataset.")
+    parser.add_argument("data", nargs="?", default="data/preprocessed/clean_data_score_1000.parquet")
+    parser.add_argument("--fit", default="data/preprocessed/clean_data.csv",
+                        help="Cleaned dataset the bounds are fitted on (the whole table the scores were normalized over)")
+    args = parser.parse_args()
+    fitted = load_data(args.fit, columns=["Rating", "Reviews", "Installs"])
+    scorer = PopularityScorer.fit(fitted["Rating"], fitted["Reviews"], fitted["Installs"])
+    print(f"Scoring statistics written to {write_score_stats(args.data, scorer)}")
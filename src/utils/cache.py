@@ -1,3 +1,11 @@
 from flask_caching import Cache
 
-cache = Cache()
\ No newline at end of file
+from src.utils.result_cache import ResultCache
+
+cache = Cache()
+
+# Row positions selected by each normalized filter state
+filter_cache = ResultCache("filter")
+
+# Serialized chart specs and summary values for each rendered filter state
+spec_cache = ResultCache("spec")
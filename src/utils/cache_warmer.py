@@ -0,0 +1,275 @@
+# cache_warmer.py
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where the app runs in a single process
+    fcntl = None
+
+# Filter state of the initial layout, always warmed
+DEFAULT_STATE = {"selected_types": ["All"], "rating_range": [1, 5],
+                 "selected_ratings": ["All"], "selected_categories": ["All"]}
+
+
+def state_key(state):
+    """
+    Canonical string of a filter state, as stored in `filters-store`.
+    """
+    return json.dumps({name: state.get(name) for name in DEFAULT_STATE}, sort_keys=True)
+
+
+@contextmanager
+def _file_lock(path):
+    # Exclusive lock on `path`.lock, held against the other processes (workers)
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def _read_counts(path):
+    # The counts saved in a file, empty if it is missing or unreadable
+    try:
+        with open(path) as file:
+            return Counter({state_key(entry["state"]): entry["count"] for entry in json.load(file)})
+    except (OSError, ValueError, KeyError, TypeError):
+        return Counter()
+
+
+def load_states(path):
+    """
+    Read a JSON list of filter states (`filters-store` dicts) to warm, or [] without a path.
+    """
+    if not path:
+        return []
+    with open(path) as file:
+        return json.load(file)
+
+
+class FilterStateCounter:
+    """
+    Count how often each filter state is applied.
+
+    The counts can be saved to and loaded from a JSON file, so a restarted
+    worker knows which states are popular before any user applies them.
+    Workers share the file: each adds the states it counted since its last
+    save to those of the file, and reads back the totals. Only the
+    `max_states` most frequent states are kept.
+
+    Parameters:
+    max_states (int): Number of distinct states kept.
+    """
+
+    def __init__(self, max_states=1000):
+        self.max_states = max_states
+        self._counts = Counter()
+        # Counts recorded since the last save, not in the file yet
+        self._unsaved = Counter()
+        self._lock = threading.Lock()
+
+    def _trim(self, counts):
+        if len(counts) > 2 * self.max_states:
+            return Counter(dict(counts.most_common(self.max_states)))
+        return counts
+
+    def record(self, state, count=1):
+        """
+        Count an applied filter state (the `filters-store` data).
+        """
+        key = state_key(state)
+        with self._lock:
+            self._counts[key] += count
+            self._unsaved[key] += count
+            self._counts = self._trim(self._counts)
+            self._unsaved = self._trim(self._unsaved)
+
+    def most_common(self, n):
+        """
+        The `n` most frequent states, most frequent first, as `filters-store` dicts.
+        """
+        with self._lock:
+            return [json.loads(key) for key, _ in self._counts.most_common(n)]
+
+    def load(self, path):
+        """
+        Add the counts saved in a file by `save`; a missing or unreadable file is ignored.
+        """
+        saved = _read_counts(path)
+        with self._lock:
+            self._counts = self._trim(self._counts + saved)
+
+    def save(self, path):
+        """
+        Add the counts recorded since the last save to those of a file, and
+        read back the totals, which include the counts of the other workers.
+
+        The file is read, merged and replaced under a lock, so concurrent
+        saves never lose counts, and replaced atomically, so `load` never
+        reads a partial file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _file_lock(path):
+            totals = _read_counts(path)
+            with self._lock:
+                unsaved, self._unsaved = self._unsaved, Counter()
+            totals.update(unsaved)
+            entries = [{"state": json.loads(key), "count": count}
+                       for key, count in totals.most_common(self.max_states)]
+            partial_path = f"{path}.{os.getpid()}.partial"
+            try:
+                with open(partial_path, "w") as file:
+                    json.dump(entries, file)
+                os.replace(partial_path, path)
+            except OSError:
+                with self._lock:
+                    # Saved with the next cycle
+                    self._unsaved.update(unsaved)
+                raise
+        with self._lock:
+            # With the states recorded while saving
+            self._counts = self._trim(totals + self._unsaved)
+
+
+class CacheWarmer:
+    """
+    Precompute the results of popular filter states in a background thread.
+
+    A warm cycle computes, in order, DEFAULT_STATE, the configured states and
+    the `top_n` most frequent states of `counter`; `warm` skips those
+    already cached. A cycle runs when the thread starts, every `interval` seconds, and
+    when `schedule` is called (e.g. after a dataset refresh).
+
+    `revalidate` queues a single state, for a caller that served a stale
+    result and wants a fresh one computed off the request path.
+
+    Parameters:
+    warm (callable): Function of a filter state bringing its result into the
+                     cache. Returns False if it was already there.
+    counter (FilterStateCounter): The observed frequencies of filter states.
+    top_n (int): Number of observed states warmed per cycle.
+    states (list): Configured states, warmed in every cycle.
+    interval (float): Seconds between cycles; 0 only runs scheduled cycles.
+    history_path (str, optional): File the counts are loaded from at start
+                                  and merged into after every cycle (see
+                                  `FilterStateCounter.save`).
+    """
+
+    def __init__(self, warm, counter, top_n=20, states=(), interval=0, history_path=None):
+        self.warm = warm
+        self.counter = counter
+        self.top_n = top_n
+        self.states = list(states)
+        self.interval = interval
+        self.history_path = history_path
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._cycle_requested = True
+        self._after_cycle = []
+        self._thread = None
+        self.cycles = 0
+        self.computed = 0
+        self.revalidated = 0
+        self.errors = 0
+
+    def start(self):
+        """
+        Start the background thread, which runs a first cycle right away.
+        """
+        if self.history_path:
+            self.counter.load(self.history_path)
+        self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self._thread.start()
+        self._wakeup.set()
+        return self
+
+    def schedule(self, after_cycle=None):
+        """
+        Request a warm cycle.
+
+        Parameters:
+        after_cycle (callable, optional): Function called once the cycle is done,
+                                          e.g. to drop the results it replaced.
+        """
+        with self._lock:
+            self._cycle_requested = True
+            if after_cycle is not None:
+                self._after_cycle.append(after_cycle)
+        self._wakeup.set()
+
+    def revalidate(self, state):
+        """
+        Queue a filter state to be computed before the next cycle.
+        """
+        with self._lock:
+            self._pending[state_key(state)] = state
+        self._wakeup.set()
+
+    def popular_states(self):
+        """
+        The states of a cycle, in order and without duplicates.
+        """
+        states = {}
+        for state in (DEFAULT_STATE, *self.states, *self.counter.most_common(self.top_n)):
+            states.setdefault(state_key(state), state)
+        return list(states.values())
+
+    def _warm_all(self, states):
+        computed = 0
+        for state in states:
+            try:
+                computed += bool(self.warm(state))
+            except Exception as error:
+                self.errors += 1
+                print(f"Cache warmer: {state_key(state)} failed: {error!r}", flush=True)
+        return computed
+
+    def _run(self):
+        while True:
+            woken = self._wakeup.wait(self.interval if self.interval > 0 else None)
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = list(self._pending.values()), {}
+                cycle = self._cycle_requested or not woken
+                self._cycle_requested = False
+                after_cycle, self._after_cycle = (self._after_cycle, []) if cycle else ([], self._after_cycle)
+
+            if pending:
+                self.revalidated += self._warm_all(pending)
+            if not cycle:
+                continue
+
+            start = time.perf_counter()
+            states = self.popular_states()
+            computed = self._warm_all(states)
+            self.computed += computed
+            self.cycles += 1
+            if computed:
+                print(f"Cache warmer: warmed {computed} of {len(states)} filter states "
+                      f"in {time.perf_counter() - start:.1f} s", flush=True)
+            if self.history_path:
+                try:
+                    self.counter.save(self.history_path)
+                except OSError as error:
+                    print(f"Cache warmer: cannot save {self.history_path}: {error!r}", flush=True)
+            for callback in after_cycle:
+                callback()
+
+    def stats(self):
+        """
+        Report the warmer counters.
+
+        Returns:
+        dict: cycles, computed (states brought into the cache by cycles),
+              revalidated (stale states computed again) and errors.
+        """
+        return {"cycles": self.cycles, "computed": self.computed,
+                "revalidated": self.revalidated, "errors": self.errors}
@@ -1,24 +1,126 @@
-# csv_to_parquet.py
+# data_to_binary.py
+import argparse
+import os
+import time
 
-import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pv
 import pyarrow.parquet as pq
 
-csv_file = '../../data/preprocessed/clean_data_score_1000.csv'
-parquet_file = '../../data/preprocessed/clean_data_score_1000.parquet'
-chunksize = 100_000
+from src.data.schema import CLEAN_SCHEMA, SCORE_SCHEMA
 
-csv_stream = pd.read_csv(csv_file, chunksize=chunksize, low_memory=False)
+# Low-cardinality string columns, stored with parquet dictionary encoding
+DICTIONARY_COLUMNS = ["Category", "Type", "Content Rating", "Genres"]
 
-for i, chunk in enumerate(csv_stream):
-    print("Chunk", i)
-    if i == 0:
-        # Guess the schema of the CSV file from the first chunk
-        parquet_schema = pa.Table.from_pandas(df=chunk).schema
-        # Open a Parquet file for writing
-        parquet_writer = pq.ParquetWriter(parquet_file, parquet_schema, compression='snappy')
-    # Write CSV chunk to the parquet file
-    table = pa.Table.from_pandas(chunk, schema=parquet_schema)
-    parquet_writer.write_table(table)
 
-parquet_writer.close()
\ No newline at end of file
+def schema_for_header(header):
+    """
+    Pick the pinned schema matching a CSV header.
+
+    Parameters:
+    header (list): Column names of the CSV file.
+
+    Returns:
+    pa.Schema: SCORE_SCHEMA or CLEAN_SCHEMA, whichever has exactly these columns.
+
+    Raises:
+    ValueError: If the header matches neither preprocessing output.
+    """
+    for schema in (SCORE_SCHEMA, CLEAN_SCHEMA):
+        if sorted(header) == sorted(schema.names):
+            return schema
+    raise ValueError(f"CSV columns {header} match neither the clean nor the scored schema; pass a schema explicitly")
+
+
+def read_header(csv_path):
+    """
+    Read the column names of a CSV file without parsing its rows.
+    """
+    with pv.open_csv(csv_path, read_options=pv.ReadOptions(block_size=1 << 16)) as reader:
+        return reader.schema.names
+
+
+def convert_csv_to_parquet(csv_path, parquet_path, schema=None, block_size=64 << 20,
+                           row_group_size=256 * 1024, compression="snappy", use_threads=True):
+    """
+    Stream a CSV file into a parquet file with a pinned schema.
+
+    The CSV is parsed block by block by pyarrow's multithreaded reader, so
+    memory stays bounded by `block_size` and every block is converted to the
+    same explicit schema. A value that does not fit its column type raises
+    instead of silently changing the type of the file. Categorical string
+    columns use parquet dictionary encoding.
+
+    Parameters:
+    csv_path (str): Path of the CSV file.
+    parquet_path (str): Path of the parquet file to write.
+    schema (pa.Schema, optional): Schema to pin. By default it is picked from
+                                  the CSV header with `schema_for_header`.
+    block_size (int): Bytes of CSV parsed per block.
+    row_group_size (int): Maximum number of rows per parquet row group.
+    compression (str): Parquet compression codec.
+    use_threads (bool): Parse and convert blocks on multiple threads.
+
+    Returns:
+    dict: rows, seconds, rows_per_second, csv_bytes and parquet_bytes.
+
+    Example:
+        convert_csv_to_parquet("data/preprocessed/clean_data_score.csv",
+                               "data/preprocessed/clean_data_score.parquet")
+    """
+    if schema is None:
+        schema = schema_for_header(read_header(csv_path))
+
+    read_options = pv.ReadOptions(block_size=block_size, use_threads=use_threads)
+    convert_options = pv.ConvertOptions(
+        column_types={field.name: field.type for field in schema},
+        include_columns=schema.names,
+        strings_can_be_null=True,
+    )
+    dictionary_columns = [name for name in DICTIONARY_COLUMNS if name in schema.names]
+
+    # Written next to the target and swapped in, so a conversion error never leaves a truncated file
+    partial_path = parquet_path + ".partial"
+    start = time.perf_counter()
+    rows = 0
+    try:
+        with pv.open_csv(csv_path, read_options=read_options, convert_options=convert_options) as reader, \
+                pq.ParquetWriter(partial_path, schema, compression=compression,
+                                 use_dictionary=dictionary_columns, write_statistics=True) as writer:
+            for batch in reader:
+                writer.write_batch(batch, row_group_size=row_group_size)
+                rows += batch.num_rows
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, parquet_path)
+    seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else float("inf"),
+        "csv_bytes": os.path.getsize(csv_path),
+        "parquet_bytes": os.path.getsize(parquet_path),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a preprocessed CSV file to parquet with a pinned schema.")
+    parser.add_argument("csv", nargs="?", default="data/preprocessed/clean_data_score_1000.csv")
+    parser.add_argument("parquet", nargs="?", help="Output path (default: the CSV path with a .parquet suffix)")
+    parser.add_argument("--schema", choices=["auto", "clean", "score"], default="auto")
+    parser.add_argument("--block-size", type=int, default=64 << 20, help="Bytes of CSV parsed per block")
+    parser.add_argument("--row-group-size", type=int, default=256 * 1024, help="Maximum rows per row group")
+    parser.add_argument("--compression", default="snappy")
+    parser.add_argument("--single-thread", action="store_true", help="Disable multithreaded parsing")
+    args = parser.parse_args()
+
+    parquet_path = args.parquet or os.path.splitext(args.csv)[0] + ".parquet"
+    schema = {"auto": None, "clean": CLEAN_SCHEMA, "score": SCORE_SCHEMA}[args.schema]
+    report = convert_csv_to_parquet(args.csv, parquet_path, schema, args.block_size, args.row_group_size,
+                                    args.compression, not args.single_thread)
+    print(f"Converted {report['rows']:,} rows in {report['seconds']:.2f}s "
+          f"({report['rows_per_second']:,.0f} rows/s): {report['csv_bytes']:,} B of CSV -> "
+          f"{report['parquet_bytes']:,} B of parquet, saved to {parquet_path}")
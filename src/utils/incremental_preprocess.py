@@ -0,0 +1,388 @@
+import argparse
+import json
+import os
+import shutil
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.components.snapshot import write_snapshot
+from src.data.metadata import write_metadata
+from src.data.partitioned import LATEST_FILE, STATS_FILE
+from src.data.schema import CLEAN_SCHEMA
+from src.data.scoring import PopularityScorer, write_score_stats
+from src.utils.stream_preprocess import parse_chunk, read_raw_chunks, transform_chunk
+
+# Columns of a parsed row that identify its content
+HASHED_COLUMNS = ["App", "Category", "Rating", "Reviews", "Size", "Installs",
+                  "Type", "Price", "Content Rating", "Genres"]
+
+# Schema of one Category partition: the clean columns, the rating before
+# imputation (so imputed values can be recomputed) and the content hash
+PARTITION_SCHEMA = pa.schema(
+    [field for field in CLEAN_SCHEMA if field.name != "Category"]
+    + [("_rating_observed", pa.float64()), ("_row_hash", pa.uint64())]
+)
+
+
+def row_hashes(parsed):
+    """
+    Hash the content of parsed rows.
+
+    Parameters
+    ----------
+    parsed : pd.DataFrame
+        Rows returned by `parse_chunk`.
+
+    Returns
+    -------
+    np.ndarray
+        One uint64 hash per row.
+    """
+    return pd.util.hash_pandas_object(parsed[HASHED_COLUMNS], index=False).to_numpy()
+
+
+def latest_version(versions_dir):
+    """
+    Name of the latest dataset version, or None if nothing was written yet.
+    """
+    try:
+        with open(os.path.join(versions_dir, LATEST_FILE)) as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_version_stats(versions_dir, version):
+    """
+    Load the statistics stored with a dataset version.
+
+    Returns
+    -------
+    dict
+        The content of its `_stats.json`, see `incremental_clean_and_save_data`.
+    """
+    with open(os.path.join(versions_dir, version, STATS_FILE)) as file:
+        return json.load(file)
+
+
+def partition_path(version_dir, category):
+    """
+    Path of the parquet file holding one category, in Hive layout.
+    """
+    return os.path.join(version_dir, f"Category={quote(category, safe='')}", "part-0.parquet")
+
+
+def read_partition(version_dir, category, columns=None):
+    """
+    Read a Category partition back as parsed rows plus their '_row_hash'.
+
+    Parameters
+    ----------
+    version_dir : str
+        Directory of the dataset version.
+    category : str
+        The category to read.
+    columns : list, optional
+        Partition columns to read. By default, everything needed to rebuild the rows.
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows with 'Category' restored and, unless `columns` is given,
+        'Rating' holding the rating before imputation.
+    """
+    if columns is not None:
+        return pq.read_table(partition_path(version_dir, category), columns=columns).to_pandas().assign(Category=category)
+
+    rows = pq.read_table(partition_path(version_dir, category)).to_pandas()
+    rows["Category"] = category
+    rows["Rating"] = rows.pop("_rating_observed")
+    return rows[HASHED_COLUMNS + ["_row_hash"]]
+
+
+def category_statistics(rows):
+    """
+    Compute the statistics of one category from its parsed rows.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        Parsed rows of a single category.
+
+    Returns
+    -------
+    dict
+        Row count, sum and count of observed ratings, number of missing ratings,
+        the mean used for imputation and the bounds of the final Rating, of
+        Reviews and of Installs.
+    """
+    observed = rows["Rating"].dropna()
+    mean = float(observed.mean()) if len(observed) else None
+    rating = rows["Rating"].fillna(mean if mean is not None else np.nan).round(1).dropna()
+    return {
+        "rows": int(len(rows)),
+        "rating_sum": float(observed.sum()),
+        "rating_count": int(len(observed)),
+        "rating_missing": int(rows["Rating"].isna().sum()),
+        "rating_mean": mean,
+        "rating_min": float(rating.min()) if len(rating) else None,
+        "rating_max": float(rating.max()) if len(rating) else None,
+        "reviews_min": int(rows["Reviews"].min()),
+        "reviews_max": int(rows["Reviews"].max()),
+        "installs_min": int(rows["Installs"].min()),
+        "installs_max": int(rows["Installs"].max()),
+    }
+
+
+def global_statistics(categories):
+    """
+    Combine per-category statistics into the normalization statistics used by `transform_chunk`.
+
+    Parameters
+    ----------
+    categories : dict
+        Mapping of category to the output of `category_statistics`.
+
+    Returns
+    -------
+    dict
+        category_means plus the rating, reviews_log and installs_log bounds.
+    """
+    stats = list(categories.values())
+    return {
+        "category_means": {category: s["rating_mean"] for category, s in categories.items()
+                           if s["rating_mean"] is not None},
+        "rating_min": min(s["rating_min"] for s in stats if s["rating_min"] is not None),
+        "rating_max": max(s["rating_max"] for s in stats if s["rating_max"] is not None),
+        "reviews_log_min": float(np.log1p(min(s["reviews_min"] for s in stats))),
+        "reviews_log_max": float(np.log1p(max(s["reviews_max"] for s in stats))),
+        "installs_log_min": float(np.log1p(min(s["installs_min"] for s in stats))),
+        "installs_log_max": float(np.log1p(max(s["installs_max"] for s in stats))),
+    }
+
+
+def diff_apps(old_keys, new_keys):
+    """
+    Compare two snapshots keyed on 'App'.
+
+    An app is updated when the multiset of its row hashes changed, which is
+    detected by comparing the row count and the (wrapping) sum of the hashes.
+
+    Parameters
+    ----------
+    old_keys, new_keys : pd.DataFrame
+        'App' and '_row_hash' of every row of each snapshot.
+
+    Returns
+    -------
+    tuple
+        (inserted, updated, deleted) sets of app names.
+    """
+    def signature(keys):
+        return keys.groupby("App")["_row_hash"].agg(["sum", "count"])
+
+    old, new = signature(old_keys), signature(new_keys)
+    inserted = set(new.index.difference(old.index))
+    deleted = set(old.index.difference(new.index))
+    common = new.index.intersection(old.index)
+    changed = (old.loc[common] != new.loc[common]).any(axis=1)
+    updated = set(common[changed.to_numpy()])
+    return inserted, updated, deleted
+
+
+def write_partition(version_dir, category, rows, stats):
+    """
+    Normalize and score the parsed rows of a category and write its partition.
+
+    Parameters
+    ----------
+    version_dir : str
+        Directory of the new dataset version.
+    category : str
+        The category of the rows.
+    rows : pd.DataFrame
+        Parsed rows of the category with their '_row_hash'.
+    stats : dict
+        Normalization statistics from `global_statistics`.
+
+    Returns
+    -------
+    float
+        Sum of the popularity_score of the rows, used to rank categories.
+    """
+    rows = rows.reset_index(drop=True)
+    clean = transform_chunk(rows, stats).drop(columns="Category")
+    clean["_rating_observed"] = rows["Rating"].to_numpy()
+    clean["_row_hash"] = rows["_row_hash"].to_numpy()
+
+    path = partition_path(version_dir, category)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(pa.Table.from_pandas(clean, schema=PARTITION_SCHEMA, preserve_index=False), path)
+    return float(clean["popularity_score"].sum())
+
+
+def link_partition(previous_dir, version_dir, category):
+    """
+    Reuse an unchanged partition of the previous version, hard-linking it when possible.
+    """
+    source, target = partition_path(previous_dir, category), partition_path(version_dir, category)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def incremental_clean_and_save_data(raw_path="data/raw/googleplaystore.csv",
+                                    versions_dir="data/preprocessed/versions",
+                                    chunksize=100_000, top_n=10):
+    """
+    Clean a new snapshot of the raw feed, reprocessing only the apps that changed.
+
+    Each run writes a new version of the cleaned dataset as a Hive-partitioned
+    parquet directory (one `Category=<name>` partition per category) under
+    `versions_dir`, next to a `_stats.json` holding per-category statistics.
+    `versions_dir/LATEST` names the current version. Previous versions are left
+    untouched, so readers of an older version are never disturbed.
+
+    The new snapshot is compared with the latest version, keyed on 'App':
+    - inserted, updated and deleted apps are found from per-app row hashes;
+    - only the categories containing changed rows get their rating mean,
+      bounds and popularity recomputed, and only their partitions are rewritten;
+      the other partitions are hard-linked from the previous version;
+    - when the global Rating, Reviews or Installs bounds shift, every partition
+      is re-normalized, since min-max normalization depends on them.
+
+    The first run, with no previous version, processes every app.
+
+    Parameters
+    ----------
+    raw_path : str
+        Path of the raw CSV snapshot.
+    versions_dir : str
+        Directory holding the dataset versions.
+    chunksize : int
+        Number of raw rows parsed at a time.
+    top_n : int
+        Number of categories, by average popularity_score, listed in
+        'top_categories' (the categories shown by the dashboard).
+
+    Returns
+    -------
+    dict
+        The statistics of the latest version, including a 'changes' summary.
+        If nothing changed, no version is written and the latest one is returned.
+    """
+    os.makedirs(versions_dir, exist_ok=True)
+    previous = latest_version(versions_dir)
+    previous_dir = os.path.join(versions_dir, previous) if previous else None
+    previous_stats = read_version_stats(versions_dir, previous) if previous else {"categories": {}}
+    previous_categories = previous_stats["categories"]
+
+    # Hash every row of the new snapshot, one chunk at a time
+    new_keys = []
+    for chunk in read_raw_chunks(raw_path, chunksize):
+        parsed = parse_chunk(chunk)
+        new_keys.append(parsed[["App", "Category"]].assign(_row_hash=row_hashes(parsed)))
+    new_keys = pd.concat(new_keys, ignore_index=True)
+
+    old_keys = pd.concat(
+        [read_partition(previous_dir, category, columns=["App", "_row_hash"]) for category in previous_categories]
+        or [pd.DataFrame({"App": pd.Series(dtype=object), "_row_hash": pd.Series(dtype="uint64"),
+                          "Category": pd.Series(dtype=object)})],
+        ignore_index=True
+    )
+
+    inserted, updated, deleted = diff_apps(old_keys, new_keys)
+    changed = inserted | updated | deleted
+    if not changed:
+        print(f"No changes against version {previous}")
+        return previous_stats
+
+    # Parsed rows of the changed apps, from a second pass over the snapshot
+    new_rows = []
+    for chunk in read_raw_chunks(raw_path, chunksize):
+        parsed = parse_chunk(chunk)
+        parsed = parsed[parsed["App"].isin(changed)]
+        new_rows.append(parsed.assign(_row_hash=row_hashes(parsed)))
+    new_rows = pd.concat(new_rows, ignore_index=True)
+
+    affected = set(old_keys.loc[old_keys["App"].isin(changed), "Category"]) | set(new_rows["Category"])
+
+    # Rebuild the affected categories and recompute their statistics
+    affected_rows, categories = {}, dict(previous_categories)
+    for category in affected:
+        rows = new_rows[new_rows["Category"] == category]
+        if category in previous_categories:
+            kept = read_partition(previous_dir, category)
+            rows = pd.concat([kept[~kept["App"].isin(changed)], rows], ignore_index=True)
+        if rows.empty:
+            categories.pop(category, None)
+        else:
+            affected_rows[category] = rows
+            categories[category] = category_statistics(rows)
+
+    stats = global_statistics(categories)
+    bounds = ["rating_min", "rating_max", "reviews_log_min", "reviews_log_max", "installs_log_min", "installs_log_max"]
+    renormalize = previous is None or any(stats[key] != previous_stats["bounds"][key] for key in bounds)
+
+    version = f"v{int(previous[1:]) + 1 if previous else 1:04d}"
+    version_dir = os.path.join(versions_dir, version)
+    os.makedirs(version_dir)
+
+    rewritten = []
+    for category in sorted(categories):
+        if category in affected_rows:
+            rows = affected_rows[category]
+        elif renormalize:
+            rows = read_partition(previous_dir, category)
+        else:
+            link_partition(previous_dir, version_dir, category)
+            continue
+        categories[category]["popularity_sum"] = write_partition(version_dir, category, rows, stats)
+        rewritten.append(category)
+
+    popularity_avg = pd.Series({category: s["popularity_sum"] / s["rows"] for category, s in categories.items()})
+    version_stats = {
+        "version": version,
+        "parent": previous,
+        "n_rows": sum(s["rows"] for s in categories.values()),
+        "bounds": {key: stats[key] for key in bounds},
+        "top_categories": popularity_avg.sort_values(ascending=False).head(top_n).index.tolist(),
+        "categories": categories,
+        "changes": {
+            "inserted": len(inserted),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "renormalized": renormalize,
+            "rewritten_categories": rewritten,
+        },
+    }
+    with open(os.path.join(version_dir, STATS_FILE), "w") as file:
+        json.dump(version_stats, file, indent=2)
+
+    # Publish the version atomically
+    latest_tmp = os.path.join(versions_dir, LATEST_FILE + ".tmp")
+    with open(latest_tmp, "w") as file:
+        file.write(version)
+    os.replace(latest_tmp, os.path.join(versions_dir, LATEST_FILE))
+
+    print(f"Version {version} saved to {version_dir}: {len(inserted)} inserted, {len(updated)} updated, "
+          f"{len(deleted)} deleted apps; {len(rewritten)} of {len(categories)} partitions rewritten")
+    print(f"Scoring statistics saved to {write_score_stats(versions_dir, PopularityScorer(stats))}")
+    print(f"Metadata saved to {write_metadata(versions_dir)}")
+    print(f"Layout snapshot saved to {write_snapshot(versions_dir)}")
+    return version_stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally clean a raw Play Store snapshot into a new dataset version.")
+    parser.add_argument("--raw", default="data/raw/googleplaystore.csv")
+    parser.add_argument("--versions-dir", default="data/preprocessed/versions")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+    incremental_clean_and_save_data(args.raw, args.versions_dir, args.chunksize)
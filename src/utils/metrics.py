@@ -0,0 +1,210 @@
+# metrics.py
+import contextvars
+import cProfile
+import glob
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Upper bounds of the histogram buckets of durations (seconds) and payload sizes (bytes)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7)
+
+# Stages timed during the current request, as a list of (stage, seconds)
+_trace = contextvars.ContextVar("trace", default=None)
+
+
+class Histogram:
+    """
+    Cumulative Prometheus histogram, one series per label set.
+
+    Parameters:
+    name (str): Metric name.
+    help (str): Description shown by the metrics endpoint.
+    buckets (tuple): Upper bounds of the buckets, ascending.
+    """
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self._series[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                for bound, count in zip((*self.buckets, "+Inf"), counts):
+                    lines.append(f"{self.name}_bucket{format_labels(key + (('le', bound),))} {count}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(key)} {counts[-1]}")
+        return lines
+
+
+def format_labels(items):
+    """
+    Format (name, value) pairs as a Prometheus label set.
+    """
+    if not items:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+
+STAGE_SECONDS = Histogram("ads_stage_seconds", "Time spent in each stage of a callback.", DURATION_BUCKETS)
+CALLBACK_SECONDS = Histogram("ads_callback_seconds", "Time to answer a callback request.", DURATION_BUCKETS)
+RESPONSE_BYTES = Histogram("ads_callback_response_bytes", "Size of callback responses.", SIZE_BUCKETS)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a stage of the current callback.
+
+    The duration is added to the `ads_stage_seconds` histogram and to the
+    Server-Timing header of the response. Stages can run in other threads, as
+    long as they run in a copy of the request context (`contextvars.copy_context`).
+
+    Parameters:
+    name (str): Name of the stage, e.g. "filter" or "vega.density".
+
+    Example:
+        with stage("filter"):
+            positions = engine.query(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        trace = _trace.get()
+        if trace is not None:
+            trace["stages"].append((name, elapsed))
+        STAGE_SECONDS.observe(elapsed, callback=trace["callback"] if trace else "", stage=name)
+
+
+def render_metrics(caches=()):
+    """
+    Render every metric in the Prometheus text exposition format.
+
+    Parameters:
+    caches (iterable): ResultCache instances whose counters are exported.
+
+    Returns:
+    str: The metrics page.
+    """
+    lines = []
+    for histogram in (CALLBACK_SECONDS, STAGE_SECONDS, RESPONSE_BYTES):
+        lines.extend(histogram.render())
+    counters = (("hits", "counter"), ("second_tier_hits", "counter"), ("misses", "counter"),
+                ("evictions", "counter"), ("entries", "gauge"), ("bytes", "gauge"))
+    stats = {cache.name: cache.stats() for cache in caches}
+    for counter, kind in counters:
+        name = f"ads_cache_{counter}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{format_labels((('cache', cache),))} {values[counter]}" for cache, values in stats.items())
+    return "\n".join(lines) + "\n"
+
+
+class SlowRequestProfiler:
+    """
+    Profile a random sample of callback requests and keep the slowest profiles.
+
+    Parameters:
+    directory (str): Directory the .prof files are written to (open them with pstats or snakeviz).
+    sample_rate (float): Fraction of requests profiled, between 0 and 1.
+    keep (int): Number of profiles kept; faster ones are deleted.
+
+    Only the request thread is profiled: work submitted to the render pool
+    shows up as time spent waiting on its futures.
+    """
+
+    def __init__(self, directory, sample_rate, keep=10):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def start(self):
+        if random.random() >= self.sample_rate:
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile, callback, elapsed):
+        profile.disable()
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # Milliseconds first and zero-padded, so file names sort by duration
+            profile.dump_stats(os.path.join(self.directory, f"{elapsed * 1000:09.0f}ms-{callback}-{time.time_ns()}.prof"))
+            for path in sorted(glob.glob(os.path.join(self.directory, "*.prof")), reverse=True)[self.keep:]:
+                os.remove(path)
+
+
+def init_app(app, caches=(), profiler=None):
+    """
+    Instrument the callbacks of a Dash app.
+
+    - Every callback request is timed, and so is the size of its response.
+    - The stages timed with `stage` are sent back in a Server-Timing header,
+      which browser dev tools show in the network panel.
+    - GET /metrics serves the histograms and the cache counters in the
+      Prometheus text format.
+
+    Parameters:
+    app (Dash): The Dash app.
+    caches (iterable): ResultCache instances whose counters are exported.
+    profiler (SlowRequestProfiler, optional): Profiles a sample of the callbacks.
+    """
+    server = app.server
+
+    def callback_name():
+        output = (request.get_json(silent=True) or {}).get("output", "")
+        callback = app.callback_map.get(output, {}).get("callback")
+        return getattr(callback, "__name__", output)
+
+    @server.before_request
+    def start_trace():
+        if request.path.endswith("/_dash-update-component"):
+            g.metrics_trace = {"callback": callback_name(), "stages": [], "start": time.perf_counter()}
+            g.metrics_token = _trace.set(g.metrics_trace)
+            g.metrics_profile = profiler.start() if profiler is not None else None
+
+    @server.after_request
+    def finish_trace(response):
+        trace = g.pop("metrics_trace", None)
+        if trace is None:
+            return response
+        _trace.reset(g.pop("metrics_token"))
+        elapsed = time.perf_counter() - trace["start"]
+        profile = g.pop("metrics_profile", None)
+        if profile is not None:
+            profiler.stop(profile, trace["callback"], elapsed)
+
+        CALLBACK_SECONDS.observe(elapsed, callback=trace["callback"])
+        size = response.calculate_content_length()
+        if size is not None:
+            RESPONSE_BYTES.observe(size, callback=trace["callback"])
+        timings = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in trace["stages"]]
+        response.headers["Server-Timing"] = ", ".join(timings + [f"total;dur={elapsed * 1000:.1f}"])
+        return response
+
+    @server.route("/metrics")
+    def metrics():
+        return Response(render_metrics(caches), mimetype="text/plain; version=0.0.4")
@@ -1,6 +1,32 @@
 import pandas as pd
 import os
-import numpy as np
+
+from src.components.snapshot import write_snapshot
+from src.data.metadata import write_metadata
+from src.data.scoring import PopularityScorer, write_score_stats
+
+def derive_type(types, prices):
+    """
+    Derive the 'Type' column from the raw 'Type' and 'Price' columns.
+
+    Apps priced 0 are 'Free', whatever their recorded type; other apps keep
+    their type, and a missing type is imputed as 'Paid'. Prices are parsed
+    as numbers (without the leading "$"), so "0" and 0 both count as free.
+
+    Parameters
+    ----------
+    types : pd.Series
+        The raw 'Type' column.
+    prices : pd.Series
+        The raw 'Price' column, as strings or numbers.
+
+    Returns
+    -------
+    pd.Series
+        The derived 'Type' column, with the index of `types`.
+    """
+    price = pd.to_numeric(prices.astype(str).str.lstrip("$"), errors="coerce")
+    return types.fillna("Paid").mask(price == 0, "Free")
 
 def clean_and_save_data():
     """
@@ -37,8 +63,9 @@ def clean_and_save_data():
 
     Notes
     -----
-    This function MUST be ran from the project directory.
-    e.g. python src/utils/prepreocess_data.py
+    This function MUST be ran from the project directory, as a module so
+    that the `src` package can be imported.
+    e.g. python -m src.utils.preprocess_data
     The cleaned data is saved as "clean_data.csv" in the relative path:
     "data/preprocessed". The 'preprocessed' directory will be created
     if it does not already exist.
@@ -62,25 +89,18 @@ def clean_and_save_data():
 
         df.drop(['Current Ver', 'Last Updated', 'Android Ver'], axis=1, inplace=True)
 
-        df['Type'] = df.apply(lambda row: 'Free' if row['Price'] == 0 else 'Paid' if pd.isna(row['Type']) else row['Type'], axis=1)
+        df['Type'] = derive_type(df['Type'], df['Price'])
 
         df['Installs'] = df['Installs'].str.replace(',', '').str.replace('+', '').astype(int)
 
         df['Reviews'] = df['Reviews'].astype(int)
 
         df['Rating'] = df['Rating'].round(1)
-        
-        df['Reviews_log'] = np.log1p(df['Reviews'])
-    
-        df['Installs_log'] = np.log1p(df['Installs'])
-        
-        df['Rating_normalized'] = (df['Rating'] - df['Rating'].min()) / (df['Rating'].max() - df['Rating'].min())
-    
-        df['Reviews_normalized'] = (df['Reviews_log'] - df['Reviews_log'].min()) / (df['Reviews_log'].max() - df['Reviews_log'].min())
-    
-        df['Installs_normalized'] = (df['Installs_log'] - df['Installs_log'].min()) / (df['Installs_log'].max() - df['Installs_log'].min())
 
-        df['popularity_score'] = round((df['Rating_normalized'] + df['Reviews_normalized'] + df['Installs_normalized']) / 3, 5)
+        # Normalization bounds of the whole table, stored with the scored dataset
+        scorer = PopularityScorer.fit(df['Rating'], df['Reviews'], df['Installs'])
+        df = df.assign(**scorer.features(df['Rating'], df['Reviews'], df['Installs']),
+                       popularity_score=scorer.score_frame(df))
         
         category_popularity_avg = df.groupby('Category')['popularity_score'].mean().reset_index(name='avg_popularity_score')
 
@@ -102,6 +122,9 @@ def clean_and_save_data():
         cleaned_file_path_score = os.path.join(output_dir, "clean_data_score.csv")
         df_score.to_csv(cleaned_file_path_score, index=False)
         print(f"Cleaned data score saved to {cleaned_file_path_score}")
+        print(f"Scoring statistics saved to {write_score_stats(cleaned_file_path_score, scorer)}")
+        print(f"Metadata saved to {write_metadata(cleaned_file_path_score)}")
+        print(f"Layout snapshot saved to {write_snapshot(cleaned_file_path_score)}")
 
     except FileNotFoundError:
         print("Error: Raw data file not found at the specified path.")
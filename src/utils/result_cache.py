@@ -0,0 +1,204 @@
+# result_cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def estimate_nbytes(value):
+    """
+    Estimate the memory held by a cached value.
+
+    Parameters:
+    value: The cached value. NumPy arrays, str/bytes and tuples/lists of them
+           are measured; anything else falls back to `sys.getsizeof`.
+
+    Returns:
+    int: Estimated size in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    In-process LRU cache bounded by the total byte size of its values.
+
+    The cache is meant for compact results such as the row positions returned
+    by the FilterEngine. Entries are evicted least-recently-used first once
+    `max_bytes` is exceeded. A Flask-Caching object can be attached as an
+    optional second tier, so gunicorn workers can share results: a local miss
+    falls through to it, and new results are written to both tiers.
+
+    Like `flask_caching.Cache`, the object is created empty at import time and
+    configured later with `init_app`.
+
+    Parameters:
+    name (str): Namespace used for the keys of the second tier.
+    max_bytes (int): Byte budget of the in-process tier. 0 disables it.
+    """
+
+    def __init__(self, name, max_bytes=0):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.second_tier = None
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.second_tier_hits = 0
+        self.evictions = 0
+
+    def init_app(self, max_bytes, second_tier=None):
+        """
+        Configure the cache budget and the optional second tier.
+
+        Parameters:
+        max_bytes (int): Byte budget of the in-process tier. 0 disables it.
+        second_tier (flask_caching.Cache, optional): Shared cache used behind
+                                                     the in-process tier.
+        """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.second_tier = second_tier
+            self._evict()
+
+    def _second_tier_key(self, key):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return f"{self.name}:{digest}"
+
+    def _evict(self):
+        while self._entries and self._nbytes > self.max_bytes:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+            self.evictions += 1
+
+    def _store(self, key, value):
+        nbytes = estimate_nbytes(value) + estimate_nbytes(key)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+
+    def get(self, key, default=None):
+        """
+        Look up a key, promoting it to most-recently-used.
+
+        Parameters:
+        key (hashable): The normalized cache key.
+        default: Value returned on a miss.
+
+        Returns:
+        The cached value, or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if self.second_tier is not None:
+            value = self.second_tier.get(self._second_tier_key(key))
+            if value is not None:
+                self._store(key, value)
+                with self._lock:
+                    self.second_tier_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def __contains__(self, key):
+        """
+        Whether the in-process tier holds a key, without counting a hit or a miss.
+        """
+        with self._lock:
+            return key in self._entries
+
+    def set(self, key, value):
+        """
+        Store a value in both tiers.
+
+        Parameters:
+        key (hashable): The normalized cache key.
+        value: The value to store. Values larger than `max_bytes` are only
+               written to the second tier.
+        """
+        self._store(key, value)
+        if self.second_tier is not None:
+            self.second_tier.set(self._second_tier_key(key), value)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        Parameters:
+        key (hashable): The normalized cache key.
+        compute (callable): Zero-argument function producing the value.
+
+        Returns:
+        The cached or freshly computed value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def purge(self, predicate):
+        """
+        Drop the in-process entries whose key matches a predicate.
+
+        Parameters:
+        predicate (callable): Function of the key returning True for entries to drop.
+
+        Returns:
+        int: Number of entries dropped.
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self._nbytes -= self._entries.pop(key)[1]
+        return len(stale)
+
+    def clear(self):
+        """
+        Drop every entry of the in-process tier. The counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+        dict: entries, bytes, max_bytes, hits, second_tier_hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "second_tier_hits": self.second_tier_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,231 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.components.snapshot import write_snapshot
+from src.data.metadata import write_metadata
+from src.data.scoring import PopularityScorer, write_score_stats
+from src.data.schema import CLEAN_SCHEMA, DROPPED_RAW_COLUMNS, SCORE_SCHEMA
+from src.utils.preprocess_data import derive_type
+
+
+def read_raw_chunks(raw_path, chunksize):
+    """
+    Read the raw Play Store CSV in chunks, every column as a string.
+
+    Reading everything as strings keeps the dtypes identical across chunks;
+    the columns are parsed explicitly by `parse_chunk`.
+
+    Parameters
+    ----------
+    raw_path : str
+        Path of the raw CSV file.
+    chunksize : int
+        Number of rows per chunk.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        The raw chunks.
+    """
+    return pd.read_csv(raw_path, dtype=str, chunksize=chunksize)
+
+
+def parse_chunk(chunk):
+    """
+    Apply the row-level cleaning steps to a raw chunk, fully vectorized.
+
+    This function:
+    - Removes rows with ratings greater than 5.
+    - Drops the columns 'Current Ver', 'Last Updated', and 'Android Ver'.
+    - Derives 'Type' from 'Type' and 'Price', as `clean_and_save_data` does (`derive_type`).
+    - Converts 'Installs' (removing commas and plus signs) and 'Reviews' to integers.
+
+    Missing ratings are left as NaN: they are imputed with category means,
+    which are only known once the whole file has been read.
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        A chunk from `read_raw_chunks`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The parsed chunk.
+    """
+    rating = pd.to_numeric(chunk["Rating"], errors="coerce")
+    chunk = chunk[~(rating > 5)].drop(columns=DROPPED_RAW_COLUMNS)
+    rating = rating[chunk.index]
+
+    return chunk.assign(
+        Rating=rating,
+        Reviews=chunk["Reviews"].astype("int64"),
+        Installs=chunk["Installs"].str.replace(",", "").str.replace("+", "").astype("int64"),
+        Type=derive_type(chunk["Type"], chunk["Price"]),
+    ).reset_index(drop=True)
+
+
+def collect_statistics(raw_path, chunksize):
+    """
+    First pass: compute the statistics needed to impute and normalize.
+
+    Parameters
+    ----------
+    raw_path : str
+        Path of the raw CSV file.
+    chunksize : int
+        Number of rows per chunk.
+
+    Returns
+    -------
+    dict
+        - category_means (dict): mean observed rating per category, used for imputation.
+        - rating_min, rating_max (float): bounds of the rounded, imputed ratings.
+        - reviews_log_min, reviews_log_max (float): bounds of log1p(Reviews).
+        - installs_log_min, installs_log_max (float): bounds of log1p(Installs).
+        - n_rows (int): number of rows kept after cleaning.
+    """
+    rating_sums, rating_counts, missing_counts = [], [], []
+    rating_min = reviews_min = installs_min = np.inf
+    rating_max = reviews_max = installs_max = -np.inf
+    n_rows = 0
+
+    for chunk in read_raw_chunks(raw_path, chunksize):
+        chunk = parse_chunk(chunk)
+        n_rows += len(chunk)
+        by_category = chunk["Rating"].groupby(chunk["Category"])
+        rating_sums.append(by_category.sum())
+        rating_counts.append(by_category.count())
+        missing_counts.append(chunk["Rating"].isna().groupby(chunk["Category"]).sum())
+
+        rounded = chunk["Rating"].round(1)
+        rating_min = min(rating_min, rounded.min())
+        rating_max = max(rating_max, rounded.max())
+        reviews_min = min(reviews_min, chunk["Reviews"].min())
+        reviews_max = max(reviews_max, chunk["Reviews"].max())
+        installs_min = min(installs_min, chunk["Installs"].min())
+        installs_max = max(installs_max, chunk["Installs"].max())
+
+    rating_sum = pd.concat(rating_sums).groupby(level=0).sum()
+    rating_count = pd.concat(rating_counts).groupby(level=0).sum()
+    missing = pd.concat(missing_counts).groupby(level=0).sum()
+    category_means = (rating_sum / rating_count.where(rating_count > 0)).dropna()
+
+    # Imputed ratings are rounded too, so they can move the rating bounds
+    imputed = category_means[missing.reindex(category_means.index) > 0].round(1)
+    if not imputed.empty:
+        rating_min = min(rating_min, imputed.min())
+        rating_max = max(rating_max, imputed.max())
+
+    return {
+        "category_means": category_means.to_dict(),
+        "rating_min": float(rating_min),
+        "rating_max": float(rating_max),
+        "reviews_log_min": float(np.log1p(reviews_min)),
+        "reviews_log_max": float(np.log1p(reviews_max)),
+        "installs_log_min": float(np.log1p(installs_min)),
+        "installs_log_max": float(np.log1p(installs_max)),
+        "n_rows": n_rows,
+    }
+
+
+def transform_chunk(chunk, stats):
+    """
+    Second pass: impute, round, normalize and score a parsed chunk.
+
+    Parameters
+    ----------
+    chunk : pd.DataFrame
+        A chunk returned by `parse_chunk`.
+    stats : dict
+        The statistics returned by `collect_statistics`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The chunk with the columns of `CLEAN_SCHEMA`.
+    """
+    imputed = chunk["Category"].map(stats["category_means"])
+    rating = chunk["Rating"].fillna(imputed).round(1).to_numpy(dtype="float64")
+    reviews, installs = chunk["Reviews"].to_numpy(), chunk["Installs"].to_numpy()
+    scorer = PopularityScorer(stats)
+    return chunk.assign(Rating=rating, **scorer.features(rating, reviews, installs),
+                        popularity_score=scorer.score(rating, reviews, installs))[CLEAN_SCHEMA.names]
+
+
+def stream_clean_and_save_data(raw_path="data/raw/googleplaystore.csv", output_dir="data/preprocessed",
+                               chunksize=100_000, top_n=10):
+    """
+    Clean the Google Play Store dataset in bounded memory and save it as parquet.
+
+    This is the streaming counterpart of `clean_and_save_data`, for raw dumps
+    that do not fit in memory. Only one chunk is held at a time:
+    - Pass 1 reads the raw CSV and computes the per-category rating means and
+      the global bounds used for normalization (`collect_statistics`).
+    - Pass 2 reads it again, applies the vectorized transforms and appends each
+      chunk to "clean_data.parquet", tracking the popularity of each category.
+    - Pass 3 streams "clean_data.parquet" and keeps the `top_n` categories by
+      average popularity_score in "clean_data_score.parquet".
+
+    Parameters
+    ----------
+    raw_path : str
+        Path of the raw CSV file.
+    output_dir : str
+        Directory the parquet files are written to. It is created if needed.
+    chunksize : int
+        Number of rows per chunk, which bounds peak memory.
+    top_n : int
+        Number of categories kept in the scored dataset.
+
+    Returns
+    -------
+    dict
+        The statistics from pass 1 plus 'top_categories'.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    clean_path = os.path.join(output_dir, "clean_data.parquet")
+    score_path = os.path.join(output_dir, "clean_data_score.parquet")
+
+    stats = collect_statistics(raw_path, chunksize)
+
+    popularity_sums, popularity_counts = [], []
+    with pq.ParquetWriter(clean_path, CLEAN_SCHEMA, compression="snappy") as writer:
+        for chunk in read_raw_chunks(raw_path, chunksize):
+            chunk = transform_chunk(parse_chunk(chunk), stats)
+            by_category = chunk["popularity_score"].groupby(chunk["Category"])
+            popularity_sums.append(by_category.sum())
+            popularity_counts.append(by_category.count())
+            writer.write_table(pa.Table.from_pandas(chunk, schema=CLEAN_SCHEMA, preserve_index=False))
+    print(f"Cleaned data saved to {clean_path}")
+
+    category_popularity_avg = (pd.concat(popularity_sums).groupby(level=0).sum()
+                               / pd.concat(popularity_counts).groupby(level=0).sum())
+    top_categories = category_popularity_avg.sort_values(ascending=False).head(top_n).index.tolist()
+
+    with pq.ParquetWriter(score_path, SCORE_SCHEMA, compression="snappy") as writer:
+        for batch in pq.ParquetFile(clean_path).iter_batches(batch_size=chunksize, columns=SCORE_SCHEMA.names):
+            table = pa.Table.from_batches([batch])
+            table = table.filter(pc.is_in(table["Category"], value_set=pa.array(top_categories)))
+            writer.write_table(table.cast(SCORE_SCHEMA))
+    print(f"Cleaned data score saved to {score_path}")
+    print(f"Scoring statistics saved to {write_score_stats(score_path, PopularityScorer(stats))}")
+    print(f"Metadata saved to {write_metadata(score_path)}")
+    print(f"Layout snapshot saved to {write_snapshot(score_path)}")
+
+    return {**stats, "top_categories": top_categories}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the raw Play Store CSV in chunks and write parquet.")
+    parser.add_argument("--raw", default="data/raw/googleplaystore.csv")
+    parser.add_argument("--output-dir", default="data/preprocessed")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+    stream_clean_and_save_data(args.raw, args.output_dir, args.chunksize)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.aggregate_cube import AggregateCube
+from src.data.filter_engine import FilterEngine
+
+
+@pytest.fixture
+def apps():
+    rng = np.random.default_rng(0)
+    n_rows = 500
+    df = pd.DataFrame({
+        "Category": rng.choice(["GAME", "SOCIAL", "WEATHER"], n_rows).astype(object),
+        "Type": rng.choice(["Free", "Paid"], n_rows),
+        "Content Rating": rng.choice(["Everyone", "Teen"], n_rows),
+        "Rating": rng.integers(10, 51, n_rows) / 10,
+        "Installs": rng.integers(0, 10**9, n_rows),
+        "Reviews": rng.integers(0, 10**6, n_rows),
+        "popularity_score": rng.random(n_rows),
+    })
+    df.loc[[3, 50, 400], "Category"] = None
+    df.loc[[7, 50], "Rating"] = np.nan
+    return df
+
+
+def test_category_aggregates_skip_missing_categories(apps):
+    cube = AggregateCube(apps)
+    cells = cube.all_cells()
+    by_category = apps.groupby("Category")
+
+    pd.testing.assert_frame_equal(cube.category_counts(cells),
+                                  by_category.size().reset_index(name="Count"))
+    pd.testing.assert_frame_equal(cube.category_sums(cells, "Installs"),
+                                  by_category["Installs"].sum().reset_index())
+    pd.testing.assert_series_equal(cube.category_means(cells, "Rating"),
+                                   by_category["Rating"].mean(), check_names=False)
+
+
+def test_select_matches_rows(apps):
+    cube = AggregateCube(apps)
+    cells = cube.select(["Free"], [3, 4.5], ["All"], ["GAME", "WEATHER"])
+    rows = apps[(apps["Type"] == "Free") & apps["Rating"].between(3, 4.5)
+                & apps["Category"].isin(["GAME", "WEATHER"])]
+
+    pd.testing.assert_frame_equal(cube.category_counts(cells),
+                                  rows.groupby("Category").size().reset_index(name="Count"))
+    assert cube.mean(cells, "Reviews") == pytest.approx(rows["Reviews"].mean())
+
+
+@pytest.mark.parametrize("state", [
+    (["All"], [1, 5], ["All"], ["All"]),
+    (["Free"], [3, 4.5], ["All"], ["All"]),
+    (["All"], [1, 5], ["Teen"], ["GAME", "SOCIAL"]),
+])
+def test_select_normalized_state_matches_filter_engine(apps, state):
+    apps.loc[[1, 2], "Type"] = None
+    apps.loc[[5], "Content Rating"] = None
+    cube, engine = AggregateCube(apps), FilterEngine(apps)
+    # As render_outputs does: the normalized selections, with the selected rating range
+    selected_types, _, selected_ratings, selected_categories = engine.normalize(*state)
+    cells = cube.select(selected_types, state[1], selected_ratings, selected_categories)
+    rows = apps.take(engine.query(*state))
+
+    assert cube.measures["count"][cells].sum() == len(rows)
+    assert cube.mean(cells, "Installs") == pytest.approx(rows["Installs"].mean())
+    pd.testing.assert_frame_equal(cube.category_counts(cells),
+                                  rows.groupby("Category").size().reset_index(name="Count"))
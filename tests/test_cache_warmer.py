@@ -0,0 +1,50 @@
+import json
+import multiprocessing
+
+from src.utils.cache_warmer import DEFAULT_STATE, FilterStateCounter
+
+GAMES = {**DEFAULT_STATE, "selected_categories": ["GAME"]}
+SOCIAL = {**DEFAULT_STATE, "selected_categories": ["SOCIAL"]}
+
+
+def saved_counts(path):
+    # Saved counts by selected category
+    with open(path) as file:
+        return {entry["state"]["selected_categories"][0]: entry["count"] for entry in json.load(file)}
+
+
+def test_workers_merge_their_counts(tmp_path):
+    path = str(tmp_path / "filter_states.json")
+    first, second = FilterStateCounter(), FilterStateCounter()
+    first.record(GAMES, 3)
+    second.record(SOCIAL, 2)
+    second.record(GAMES)
+
+    first.save(path)
+    second.save(path)
+    # A save only adds what was recorded since the previous one
+    first.save(path)
+
+    assert saved_counts(path) == {"GAME": 4, "SOCIAL": 2}
+    # The totals are read back, with the states of the other worker
+    first.save(path)
+    assert first.most_common(2) == [GAMES, SOCIAL]
+
+
+def record_and_save(path, state, saves):
+    counter = FilterStateCounter()
+    for _ in range(saves):
+        counter.record(state)
+        counter.save(path)
+
+
+def test_concurrent_saves_lose_no_count(tmp_path):
+    path = str(tmp_path / "filter_states.json")
+    workers = [multiprocessing.Process(target=record_and_save, args=(path, state, 50))
+               for state in (GAMES, SOCIAL, GAMES)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert saved_counts(path) == {"GAME": 100, "SOCIAL": 50}
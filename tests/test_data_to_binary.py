@@ -0,0 +1,33 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.data_to_binary import convert_csv_to_parquet
+
+SCHEMA = pa.schema([("App", pa.string()), ("Rating", pa.float64())])
+
+
+def test_convert_csv_to_parquet(tmp_path):
+    csv_path = tmp_path / "apps.csv"
+    csv_path.write_text("App,Rating\nA,4.5\nB,\n")
+    parquet_path = str(tmp_path / "apps.parquet")
+
+    stats = convert_csv_to_parquet(str(csv_path), parquet_path, schema=SCHEMA)
+
+    assert stats["rows"] == 2
+    assert pq.read_table(parquet_path).to_pydict() == {"App": ["A", "B"], "Rating": [4.5, None]}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["apps.csv", "apps.parquet"]
+
+
+def test_convert_csv_to_parquet_removes_partial_file_on_error(tmp_path):
+    csv_path = tmp_path / "apps.csv"
+    # Small blocks so the bad row is parsed after the first batch was written
+    csv_path.write_text("App,Rating\n" + "A,4.5\n" * 1000 + "B,not a rating\n")
+    parquet_path = tmp_path / "apps.parquet"
+    parquet_path.write_bytes(b"previous")
+
+    with pytest.raises(pa.ArrowInvalid):
+        convert_csv_to_parquet(str(csv_path), str(parquet_path), schema=SCHEMA, block_size=1024)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["apps.csv", "apps.parquet"]
+    assert parquet_path.read_bytes() == b"previous"
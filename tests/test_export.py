@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+
+import pandas as pd
+import pytest
+from dash import Dash, html
+
+from src.callbacks.callbacks import register_callbacks
+
+DATA_PATH = "data/preprocessed/clean_data_score_1000.parquet"
+EXPORT_JS = os.path.join(os.path.dirname(__file__), os.pardir, "src", "assets", "export.js")
+
+
+def export_client(**dash_options):
+    app = Dash(__name__, **dash_options)
+    app.layout = html.Div()
+    register_callbacks(app, pd.read_parquet(DATA_PATH))
+    return app.server.test_client()
+
+
+def export(client, state, url="/export/apps.csv"):
+    return client.get(url, query_string={"state": json.dumps(state)})
+
+
+def test_export_ranks_the_selected_apps():
+    response = export(export_client(), {"selected_types": ["Free"], "selected_categories": ["GAME"]})
+
+    assert response.status_code == 200
+    apps = pd.read_csv(io.BytesIO(response.data))
+    assert len(apps) > 0
+    assert set(apps["Type"]) == {"Free"} and set(apps["Category"]) == {"GAME"}
+    assert apps["popularity_score"].is_monotonic_decreasing
+
+
+@pytest.mark.parametrize("state", [
+    {"selected_types": "Free"},
+    {"selected_categories": ["GAME", 1]},
+    {"selected_ratings": {"Everyone": True}},
+    {"rating_range": "45"},
+    {"rating_range": [1, 2, 3]},
+    ["All"],
+])
+def test_export_rejects_invalid_states(state):
+    assert export(export_client(), state).status_code == 400
+
+
+def test_export_route_follows_the_routes_prefix():
+    client = export_client(url_base_pathname="/dash/")
+
+    assert export(client, {}, "/dash/export/apps.csv").status_code == 200
+    assert export(client, {}, "/export/apps.csv").status_code == 404
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is needed to run the clientside callbacks")
+def test_download_link_uses_the_requests_prefix():
+    # The Dash config of a page served behind a proxy adding "/proxy/"
+    script = """
+    globalThis.window = globalThis;
+    globalThis.document = {getElementById: () => ({textContent: '{"requests_pathname_prefix": "/proxy/"}'})};
+    require(process.argv[1]);
+    const href = window.dash_clientside.download.href;
+    process.stdout.write(JSON.stringify([href(null), href({"selected_types": ["Free"]})]));
+    """
+    result = subprocess.run(["node", "-e", script, os.path.abspath(EXPORT_JS)],
+                            capture_output=True, text=True, check=True)
+
+    every_app, free_apps = json.loads(result.stdout)
+    assert every_app == "/proxy/export/apps.csv"
+    assert free_apps == "/proxy/export/apps.csv?state=" + "%7B%22selected_types%22%3A%5B%22Free%22%5D%7D"
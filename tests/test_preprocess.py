@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from src.utils.preprocess_data import clean_and_save_data, derive_type
+from src.utils.stream_preprocess import stream_clean_and_save_data
+
+RAW_PATH = "data/raw/googleplaystore.csv"
+
+
+@pytest.mark.parametrize("raw_type, price, expected", [
+    ("Free", "0", "Free"),
+    ("Paid", "$4.99", "Paid"),
+    ("Paid", "0", "Free"),
+    ("Free", "$1.99", "Free"),
+    (None, "0", "Free"),
+    (None, "$1.99", "Paid"),
+    (None, 0, "Free"),
+])
+def test_derive_type(raw_type, price, expected):
+    assert derive_type(pd.Series([raw_type]), pd.Series([price])).tolist() == [expected]
+
+
+@pytest.fixture
+def raw_sample():
+    """
+    Raw rows covering the cleaning edge cases: missing ratings, a rating above
+    5, and Price and Type disagreeing or missing.
+    """
+    raw = pd.read_csv(RAW_PATH, dtype=str)
+    price = pd.to_numeric(raw["Price"].str.lstrip("$"), errors="coerce")
+    edge_cases = raw[raw["Type"].isna() | (price > 0) | (pd.to_numeric(raw["Rating"], errors="coerce") > 5)]
+    sample = pd.concat([raw.head(300), edge_cases.head(50)])
+    disagreeing = sample.head(2).assign(Type=["Paid", None], Price=["0", "$2.99"])
+    return pd.concat([sample, disagreeing], ignore_index=True)
+
+
+def test_streaming_matches_clean_and_save_data(raw_sample, tmp_path, monkeypatch):
+    # clean_and_save_data reads and writes relative to the project directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    raw_sample.to_csv(tmp_path / RAW_PATH, index=False)
+
+    clean_and_save_data()
+    stream_clean_and_save_data(RAW_PATH, "streamed", chunksize=64)
+
+    expected = pd.read_csv(tmp_path / "data" / "preprocessed" / "clean_data.csv")
+    streamed = pd.read_parquet(tmp_path / "streamed" / "clean_data.parquet")
+    assert (streamed["Type"] == "Free").sum() > 0 and (streamed["Type"] == "Paid").sum() > 0
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from src.callbacks.filters_callbacks import normalize_selection
+
+SELECTION_JS = os.path.join(os.path.dirname(__file__), os.pardir, "src", "assets", "selection.js")
+
+# Dropdown values as Dash sends them, including a cleared dropdown (None)
+SELECTIONS = [
+    None,
+    [],
+    ["All"],
+    ["All", "X"],
+    ["X", "All"],
+    ["X"],
+    ["X", "Y"],
+    ["All", "All"],
+    ["X", "All", "Y"],
+    ["X", "X"],
+]
+
+# Loads selection.js as the browser does (as a script, with `window`) and applies
+# dash_clientside.selection.normalize to the JSON array of selections on stdin
+NODE_SCRIPT = """
+globalThis.window = globalThis;
+require(process.argv[1]);
+let input = "";
+process.stdin.on("data", chunk => input += chunk);
+process.stdin.on("end", () => {
+    const normalize = window.dash_clientside.selection.normalize;
+    process.stdout.write(JSON.stringify(JSON.parse(input).map(selected => normalize(selected))));
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="Node.js is needed to run the clientside callbacks")
+def test_clientside_normalize_matches_normalize_selection():
+    result = subprocess.run(["node", "-e", NODE_SCRIPT, os.path.abspath(SELECTION_JS)],
+                            input=json.dumps(SELECTIONS), capture_output=True, text=True, check=True)
+
+    assert json.loads(result.stdout) == [normalize_selection(selected) for selected in SELECTIONS]
+
+
+@pytest.mark.parametrize("selected, expected", [
+    (None, ["All"]),
+    ([], ["All"]),
+    (["All"], ["All"]),
+    (["All", "X"], ["X"]),
+    (["X", "All"], ["X"]),
+])
+def test_normalize_selection(selected, expected):
+    assert normalize_selection(selected) == expected